@@ -1,20 +1,227 @@
 import argparse
+import cProfile
+from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
 
-from player_ranking import player_ranking, logging_config
+from player_ranking import backfill, player_ranking, logging_config, metrics, tenure
+from player_ranking.daemon import Daemon, PresenceSampler
+
+DEFAULT_INTERVAL = 60
+# options that only have an effect in daemon mode
+DAEMON_OPTIONS = {
+    "interval": "--interval",
+    "metrics_port": "--metrics-port",
+    "api_port": "--api-port",
+    "adaptive_polling": "--adaptive-polling",
+}
+
+
+def parse_utc_timestamp(value: str) -> datetime:
+    # fromisoformat only accepts a trailing Z from Python 3.11 on
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    ts = datetime.fromisoformat(value)
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
 
 ARGUMENT_PARSER = argparse.ArgumentParser()
 ARGUMENT_PARSER.add_argument(
     "-p", "--plot", help="Plot the rating history to a file", action="store_true"
 )
+ARGUMENT_PARSER.add_argument(
+    "-f",
+    "--force",
+    help="Evaluate even if the inputs have not changed since the last evaluation",
+    action="store_true",
+)
+ARGUMENT_PARSER.add_argument(
+    "-d",
+    "--daemon",
+    help="Keep running and schedule evaluations in-process instead of evaluating once",
+    action="store_true",
+)
+ARGUMENT_PARSER.add_argument(
+    "-i",
+    "--interval",
+    help=f"Minutes between two evaluations in daemon mode (default: {DEFAULT_INTERVAL})",
+    type=int,
+)
+ARGUMENT_PARSER.add_argument(
+    "--profile",
+    help="Write a cProfile of the run to the given file (inspect it with e.g. snakeviz or pstats)",
+    metavar="FILE",
+)
+ARGUMENT_PARSER.add_argument(
+    "--metrics-file",
+    help="Write Prometheus metrics to the given file after each run (textfile collector)",
+    metavar="FILE",
+)
+ARGUMENT_PARSER.add_argument(
+    "--metrics-port",
+    help="Serve Prometheus metrics at http://localhost:PORT/metrics in daemon mode",
+    metavar="PORT",
+    type=int,
+)
+ARGUMENT_PARSER.add_argument(
+    "--api-port",
+    help="Serve the latest ranking, rating histories and pending promotions at "
+    "http://localhost:PORT in daemon mode",
+    metavar="PORT",
+    type=int,
+)
+ARGUMENT_PARSER.add_argument(
+    "--adaptive-polling",
+    help="Reuse API responses in daemon mode as long as the clan war and season calendar "
+    "suggests that they did not change",
+    action="store_true",
+)
+
+SUBPARSERS = ARGUMENT_PARSER.add_subparsers(
+    dest="command", metavar="COMMAND", help="Run a command instead of the evaluation"
+)
+SUBPARSERS.add_parser(
+    "tenure",
+    help="Report the first and last sighting of the current members in the rating history "
+    "and the number of members that joined per month",
+)
+PRESENCE_PARSER = SUBPARSERS.add_parser(
+    "presence",
+    help="Report the hours per week in which members were online and which members are inactive",
+)
+PRESENCE_PARSER.add_argument(
+    "--sample",
+    help="Keep running and only record the online times of the members at a short interval",
+    action="store_true",
+)
+PRESENCE_PARSER.add_argument(
+    "--sample-interval",
+    help="Minutes between two samples (default: 10)",
+    type=int,
+    default=10,
+)
+PRESENCE_PARSER.add_argument(
+    "--weeks", help="Number of weeks to report (default: 4)", type=int, default=4
+)
+PRESENCE_PARSER.add_argument(
+    "--inactive-hours",
+    help="Report members that have not been online for this many hours (default: 72)",
+    type=int,
+    default=72,
+)
+BACKFILL_PARSER = SUBPARSERS.add_parser(
+    "backfill",
+    help="Evaluate archived inputs again (see archiveInputSnapshots) and write the ratings "
+    "into the rating history, e.g. after changing the rating formula",
+)
+
+
+BACKFILL_PARSER.add_argument(
+    "--at",
+    help="Evaluate at these points in time (ISO 8601, UTC) using the latest inputs archived before "
+    "each of them instead of every archived run",
+    metavar="TIMESTAMP",
+    nargs="+",
+    type=parse_utc_timestamp,
+)
+BACKFILL_PARSER.add_argument(
+    "--since", help="Only evaluate runs from this point in time on", type=parse_utc_timestamp
+)
+BACKFILL_PARSER.add_argument(
+    "--until", help="Only evaluate runs up to this point in time", type=parse_utc_timestamp
+)
+BACKFILL_PARSER.add_argument(
+    "--max-age",
+    help="With --at, skip points in time whose latest archived inputs are older than this many "
+    f"hours (default: {backfill.MAX_SNAPSHOT_AGE // timedelta(hours=1)})",
+    metavar="HOURS",
+    type=int,
+    default=backfill.MAX_SNAPSHOT_AGE // timedelta(hours=1),
+)
+BACKFILL_PARSER.add_argument(
+    "--replace",
+    help="Overwrite runs that already are in the rating history",
+    action="store_true",
+)
+BACKFILL_PARSER.add_argument(
+    "--workers",
+    help="Number of worker processes (default: number of CPUs)",
+    type=int,
+)
 
 
 def run():
     load_dotenv()
     logging_config.setup_logging()
     args = ARGUMENT_PARSER.parse_args()
-    player_ranking.perform_evaluation(plot=args.plot)
+    if not args.daemon:
+        for name, option in DAEMON_OPTIONS.items():
+            if getattr(args, name) not in (None, False):
+                ARGUMENT_PARSER.error(f"{option} requires --daemon")
+    if args.interval is not None and args.interval <= 0:
+        ARGUMENT_PARSER.error("--interval must be a positive number of minutes")
+    if args.command == "backfill" and args.max_age < 0:
+        ARGUMENT_PARSER.error("--max-age must not be negative")
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        if args.command == "tenure":
+            tenure.perform_tenure_report()
+        elif args.command == "presence":
+            presence(args)
+        elif args.command == "backfill":
+            backfill.perform_backfill(
+                timestamps=args.at,
+                since=args.since,
+                until=args.until,
+                replace=args.replace,
+                max_workers=args.workers,
+                max_age=timedelta(hours=args.max_age),
+            )
+        else:
+            evaluate(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+
+def evaluate(args: argparse.Namespace):
+    if args.daemon:
+        daemon = Daemon(
+            plot=args.plot,
+            interval=timedelta(minutes=args.interval or DEFAULT_INTERVAL),
+            force=args.force,
+            metrics_port=args.metrics_port,
+            metrics_file=args.metrics_file,
+            api_port=args.api_port,
+            adaptive_polling=args.adaptive_polling,
+        )
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            daemon.stop()
+    else:
+        try:
+            player_ranking.perform_evaluation(plot=args.plot, force=args.force)
+        finally:
+            if args.metrics_file:
+                metrics.REGISTRY.write_textfile(args.metrics_file)
+
+
+def presence(args: argparse.Namespace):
+    if not args.sample:
+        player_ranking.perform_presence_report(args.weeks, args.inactive_hours)
+        return
+    if args.sample_interval <= 0:
+        ARGUMENT_PARSER.error("--sample-interval must be a positive number of minutes")
+    sampler = PresenceSampler(timedelta(minutes=args.sample_interval))
+    try:
+        sampler.run()
+    except KeyboardInterrupt:
+        sampler.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from player_ranking import history_wrapper
+from player_ranking.constants import ROOT_DIR
+from player_ranking.evaluation_performer import EvaluationPerformer
+from player_ranking.excuse_handler import ExcuseHandler
+from player_ranking.input_snapshots import InputSnapshotStore, load_snapshot
+from player_ranking.models.ranking_parameters import RankingParameters
+from player_ranking.models.ranking_parameters_validation import RankingParameterLoader
+
+LOGGER = logging.getLogger(__name__)
+# inputs archived longer before a timestamp no longer describe the clan at that time
+MAX_SNAPSHOT_AGE = timedelta(days=1)
+
+
+def evaluate_snapshot(
+    params: RankingParameters, snapshot_path: Path, timestamp: datetime | None = None
+) -> pd.Series:
+    """
+    Evaluates the archived inputs as the pipeline does at the time they were archived, or at the
+    given timestamp. Returns the rating of each player.
+    Runs in worker processes, so it only receives what can be pickled cheaply.
+    """
+    snapshot = load_snapshot(snapshot_path)
+    excuses = ExcuseHandler(
+        excuses=snapshot.excuses, clan=snapshot.clan, excuse_params=params.excuses
+    )
+    excuses.update_excuses(current_war=snapshot.current_war, war_log=snapshot.war_log)
+    performance = EvaluationPerformer(
+        snapshot.clan,
+        snapshot.current_war,
+        snapshot.war_log,
+        params,
+        excuses,
+        now=timestamp or snapshot.timestamp,
+    ).evaluate()
+    return performance["rating"]
+
+
+def get_backfill_jobs(
+    store: InputSnapshotStore,
+    timestamps: list[datetime] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    max_age: timedelta = MAX_SNAPSHOT_AGE,
+) -> list[tuple[Path, datetime]]:
+    """
+    Returns the snapshot to evaluate and the evaluation time of each run to backfill.
+    Without timestamps, every archived snapshot in the range is evaluated at the time it was taken.
+    Otherwise, the latest snapshot before each timestamp is evaluated at that timestamp, unless it
+    was taken more than max_age before it.
+    """
+    if timestamps is None:
+        return [
+            (store.get_path(ts), ts)
+            for ts in store.get_timestamps()
+            if (since is None or ts >= since) and (until is None or ts <= until)
+        ]
+    jobs = []
+    for ts in timestamps:
+        snapshot_ts = store.find(ts)
+        if snapshot_ts is None:
+            LOGGER.warning(f"No archived inputs before {ts:%d.%m.%Y %H:%M:%S}, skipping it.")
+            continue
+        if ts - snapshot_ts > max_age:
+            LOGGER.warning(
+                f"The latest inputs before {ts:%d.%m.%Y %H:%M:%S} were archived at "
+                f"{snapshot_ts:%d.%m.%Y %H:%M:%S}, more than {max_age} before, skipping it."
+            )
+            continue
+        jobs.append((store.get_path(snapshot_ts), ts))
+    return jobs
+
+
+def backfill(
+    params: RankingParameters,
+    jobs: list[tuple[Path, datetime]],
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluates the runs in parallel and returns their ratings, one column per run labelled like the
+    columns of the rating history.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    args = ([params] * len(jobs), [path for path, _ in jobs], [ts for _, ts in jobs])
+    if workers <= 1:
+        ratings = list(map(evaluate_snapshot, *args))
+    else:
+        # spawn fresh interpreters, forking a process with running threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as executor:
+            ratings = list(executor.map(evaluate_snapshot, *args, chunksize=4))
+    labels = [ts.strftime(history_wrapper.DATETIME_FORMAT) for _, ts in jobs]
+    if not ratings:
+        return pd.DataFrame()
+    return pd.concat([rating.rename(label) for rating, label in zip(ratings, labels)], axis=1)
+
+
+def perform_backfill(
+    timestamps: list[datetime] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    replace: bool = False,
+    max_workers: int | None = None,
+    max_age: timedelta = MAX_SNAPSHOT_AGE,
+    parameter_file: Path = ROOT_DIR / "ranking_parameters.yaml",
+) -> None:
+    for params in RankingParameterLoader(parameter_file).load():
+        store = InputSnapshotStore(ROOT_DIR / params.stateDirectory, params.clanTag)
+        jobs = get_backfill_jobs(store, timestamps, since, until, max_age)
+        LOGGER.info(f"Backfilling {len(jobs)} runs of clan {params.clanTag}...")
+        ratings = backfill(params, jobs, max_workers)
+        if ratings.empty:
+            continue
+        written = history_wrapper.write_rating_history(
+            ROOT_DIR / params.ratingHistoryFile, ratings, replace
+        )
+        LOGGER.info(
+            f"Wrote {len(written)} runs of clan {params.clanTag} to {params.ratingHistoryFile}, "
+            f"{len(jobs) - len(written)} runs already existed."
+        )
@@ -0,0 +1,153 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.datetime_util import parse_timestamps
+from player_ranking.state_files import atomic_path, read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+BATTLE_LOG_DIRECTORY = "battles-{clan}"
+WATERMARK_FILE = "watermarks.json"
+SEGMENT_FILE = "segment-{index:06d}.npz"
+# segments are merged into one once there are more of them, which keeps loads fast
+MAX_SEGMENTS = 32
+
+
+def get_participant(battle: dict, side: str) -> dict:
+    """
+    Returns the first participant of the team or opponent side of a battle.
+    """
+    participants = battle.get(side) or [{}]
+    return participants[0]
+
+
+# columns of the store and how they are extracted from a battle of the API's battle log
+COLUMNS = {
+    "tag": lambda tag, battle: tag,
+    "battle_time": lambda tag, battle: battle["battleTime"],
+    "type": lambda tag, battle: battle.get("type", ""),
+    "game_mode": lambda tag, battle: battle.get("gameMode", {}).get("name", ""),
+    "crowns": lambda tag, battle: get_participant(battle, "team").get("crowns", 0),
+    "opponent_crowns": lambda tag, battle: get_participant(battle, "opponent").get("crowns", 0),
+    "trophy_change": lambda tag, battle: get_participant(battle, "team").get("trophyChange", 0),
+    "opponent_tag": lambda tag, battle: get_participant(battle, "opponent").get("tag", ""),
+}
+INTEGER_COLUMNS = ["crowns", "opponent_crowns", "trophy_change"]
+
+
+def frame_to_arrays(battles: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Converts loaded battles back to the arrays of a segment.
+    """
+    # pandas holds strings as objects, which cannot be stored without pickling
+    return {
+        name: values.astype(str) if values.dtype == object else values
+        for name, values in ((name, battles[name].to_numpy()) for name in COLUMNS)
+    }
+
+
+class BattleLogStore:
+    """
+    Append-only, columnar store of the battles of all members of a clan.
+
+    The battle time of the newest stored battle is remembered per player (watermark) so that only
+    battles after it are appended. Each ingestion with new battles writes one compressed segment of
+    numpy arrays. Once there are more than `max_segments` segments, they are compacted into one.
+    """
+
+    def __init__(self, state_directory: Path, clan_tag: str, max_segments: int = MAX_SEGMENTS):
+        self.directory: Path = state_directory / BATTLE_LOG_DIRECTORY.format(
+            clan=clan_tag.lstrip("#")
+        )
+        self.max_segments: int = max_segments
+        self.watermarks: dict[str, str] = read_json(self.directory / WATERMARK_FILE, {})
+
+    def ingest(self, battle_logs: dict[str, list[dict]]) -> int:
+        """
+        Appends the battles newer than the watermark of each player and returns their number.
+        """
+        rows: list[tuple] = []
+        watermarks = dict(self.watermarks)
+        for tag, battles in battle_logs.items():
+            watermark = watermarks.get(tag, "")
+            seen = set()
+            for battle in battles:
+                battle_time = battle.get("battleTime")
+                if not battle_time or not battle.get("team") or not battle.get("opponent"):
+                    LOGGER.warning(f"Skipping malformed battle of {tag}: {battle}")
+                    continue
+                # CR API timestamps have a fixed width and sort chronologically as strings
+                if battle_time <= watermark or battle_time in seen:
+                    continue
+                seen.add(battle_time)
+                rows.append(tuple(extract(tag, battle) for extract in COLUMNS.values()))
+            if seen:
+                watermarks[tag] = max(seen | {watermark})
+
+        if rows:
+            self.write_segment(rows)
+            if len(self.get_segments()) > self.max_segments:
+                self.compact()
+        self.watermarks = watermarks
+        self.save_watermarks()
+        LOGGER.info(f"Stored {len(rows)} new battles of {len(battle_logs)} players.")
+        return len(rows)
+
+    def write_segment(self, rows: list[tuple]) -> None:
+        columns = dict(zip(COLUMNS, zip(*rows)))
+        arrays = {
+            name: np.asarray(values, dtype=np.int32 if name in INTEGER_COLUMNS else str)
+            for name, values in columns.items()
+        }
+        arrays["battle_time"] = parse_timestamps(arrays["battle_time"])
+        self.write_arrays(arrays)
+
+    def write_arrays(self, arrays: dict[str, np.ndarray]) -> Path:
+        segments = self.get_segments()
+        index = int(segments[-1].stem.split("-")[1]) + 1 if segments else 1
+        path = self.directory / SEGMENT_FILE.format(index=index)
+        with atomic_path(path) as tmp_path, open(tmp_path, "wb") as segment:
+            np.savez_compressed(segment, **arrays)
+        return path
+
+    def compact(self) -> None:
+        """
+        Merges all segments into a new one and removes them afterwards. If the process dies in
+        between, the battles are stored twice until the next compaction, which load() tolerates.
+        """
+        segments = self.get_segments()
+        battles = self.load()
+        self.write_arrays(frame_to_arrays(battles))
+        for path in segments:
+            path.unlink()
+        LOGGER.info(f"Compacted {len(segments)} battle log segments with {len(battles)} battles.")
+
+    def save_watermarks(self) -> None:
+        write_text(
+            self.directory / WATERMARK_FILE, json.dumps(self.watermarks, indent=2, sort_keys=True)
+        )
+
+    def get_segments(self) -> list[Path]:
+        return sorted(self.directory.glob("segment-*.npz"))
+
+    def load(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Reads all stored battles, optionally only the given columns.
+        """
+        columns = columns or list(COLUMNS)
+        # the key columns are always read to drop duplicates
+        read_columns = list(dict.fromkeys(["tag", "battle_time", *columns]))
+        frames = []
+        for path in self.get_segments():
+            with np.load(path, allow_pickle=False) as segment:
+                frames.append(pd.DataFrame({name: segment[name] for name in read_columns}))
+        if not frames:
+            return pd.DataFrame({name: [] for name in columns})
+        battles = pd.concat(frames, ignore_index=True)
+        # battles are stored twice if the process died between writing a segment and the
+        # watermarks or during a compaction
+        battles = battles.drop_duplicates(["tag", "battle_time"], ignore_index=True)
+        return battles[columns]
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from player_ranking.state_files import read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+CHART_FINGERPRINT_FILE = "chart-fingerprints.json"
+# bump to re-render all charts after changing their appearance
+CHART_STYLE_VERSION = 1
+# formats written by svg_chart without matplotlib
+VECTOR_WRITERS = {".svg": "write_svg_chart", ".html": "write_html_chart"}
+
+
+@dataclass
+class ChartJob:
+    title: str
+    output_path: Path
+    # one column per line, indexed by time
+    data: pd.DataFrame
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(repr((CHART_STYLE_VERSION, self.title, self.data.columns.tolist())).encode())
+        digest.update(pd.util.hash_pandas_object(self.data, index=True).values.tobytes())
+        return digest.hexdigest()
+
+
+def render_chart(job: ChartJob) -> Path:
+    """
+    Renders a line chart in the format given by the suffix of its output path.
+    SVG and HTML charts are streamed to the file, anything else is rendered by matplotlib.
+    """
+    if job.output_path.suffix in VECTOR_WRITERS:
+        from player_ranking import svg_chart
+
+        write = getattr(svg_chart, VECTOR_WRITERS[job.output_path.suffix])
+        with open(job.output_path, "w", encoding="utf-8") as out:
+            write(job.data, job.title, out)
+        return job.output_path
+    return render_matplotlib_chart(job)
+
+
+def render_matplotlib_chart(job: ChartJob) -> Path:
+    """
+    Renders a line chart with a non-interactive backend. Runs in worker processes.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from cycler import cycler
+    from labellines import labelLines
+
+    fig = plt.figure()
+    try:
+        ax = fig.add_subplot(111)
+        colormap = list(plt.cm.tab20.colors)
+        del colormap[4 - 1 :: 4]  # Delete every 4th color
+        prop_cycle = cycler(color=colormap) * cycler(linestyle=["-", ":", "--", "-."])
+        ax.set_prop_cycle(prop_cycle)
+        job.data.plot(
+            ax=ax,
+            figsize=(16, 10),
+            legend=False,
+            title=job.title,
+            xlabel="Time",
+            ylabel="Rating",
+        )
+        labelLines(ax.get_lines(), drop_label=True)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(job.output_path, dpi=150)
+    finally:
+        plt.close(fig)
+    return job.output_path
+
+
+class ChartRenderer:
+    """
+    Renders charts in a process pool and skips charts whose data has not changed since they were
+    last rendered.
+    """
+
+    def __init__(self, state_directory: Path, max_workers: int | None = None):
+        self.fingerprint_path: Path = state_directory / CHART_FINGERPRINT_FILE
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+
+    def render(self, jobs: list[ChartJob]) -> list[Path]:
+        """
+        Renders all outdated charts and returns their paths.
+        """
+        fingerprints = self.load_fingerprints()
+        outdated: list[tuple[ChartJob, str]] = []
+        for job in jobs:
+            fingerprint = job.fingerprint()
+            if fingerprints.get(str(job.output_path)) == fingerprint and job.output_path.exists():
+                LOGGER.debug(f"Chart {job.output_path} is up to date.")
+            else:
+                outdated.append((job, fingerprint))
+        LOGGER.info(f"Rendering {len(outdated)} of {len(jobs)} charts.")
+
+        rendered: list[Path] = []
+        try:
+            results = self.map(render_chart, [job for job, _ in outdated])
+            for (job, fingerprint), path in zip(outdated, results):
+                fingerprints[str(job.output_path)] = fingerprint
+                rendered.append(path)
+        finally:
+            self.save_fingerprints(fingerprints)
+        return rendered
+
+    def map(self, fn, jobs: list[ChartJob]):
+        workers = min(self.max_workers, len(jobs))
+        # vector charts are written faster than a worker process starts
+        if workers <= 1 or all(job.output_path.suffix in VECTOR_WRITERS for job in jobs):
+            return map(fn, jobs)
+        # spawn fresh interpreters, forking a process with running threads (e.g. the metrics server)
+        # is unsafe
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        with executor:
+            return list(executor.map(fn, jobs))
+
+    def load_fingerprints(self) -> dict[str, str]:
+        return read_json(self.fingerprint_path, {})
+
+    def save_fingerprints(self, fingerprints: dict[str, str]) -> None:
+        write_text(self.fingerprint_path, json.dumps(fingerprints, indent=2, sort_keys=True))
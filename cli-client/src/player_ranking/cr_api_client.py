@@ -1,29 +1,84 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from typing import Any, Callable
 
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
 
+from player_ranking import instrumentation
 from player_ranking.datetime_util import parse_timestamp
 from player_ranking.models.clan import Clan
 from player_ranking.models.clan_member import ClanMember
+from player_ranking.polling import ResponseCache
 
 # URL of the proxy provided by RoyaleAPI.com
 # Alternatively you can use the official URL "https://api.clashroyale.com/v1"
 # Dynamic IPs don't work with the official URL as the IP must be whitelisted
 API_ENDPOINT: str = "https://proxy.royaleapi.dev/v1"
 LOGGER = logging.getLogger(__name__)
+MAX_WORKERS = 16
+ENCODED_TAG_PATTERN = re.compile(r"%23[0-9A-Z]+")
 
 
 def url_encode(tag: str) -> str:
     return f"%23{tag[1:]}"
 
 
+class SingleFlight:
+    """
+    Lets concurrent callers for the same key share a single call and its result (or exception).
+    The key is released as soon as the call has finished, results are not cached beyond that.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Returns the result of fn and whether it was shared from a call that was already in flight.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
+
+
+# shared by all clients, so that evaluations of several clans or overlapping runs in one process
+# don't send identical requests at the same time
+IN_FLIGHT = SingleFlight()
+
+
 class CRAPIClient:
-    def __init__(self, api_token: str, clan_tag: str):
+    def __init__(self, api_token: str, clan_tag: str, cache: ResponseCache | None = None):
         self.api_token: str = api_token
         self.clan_tag: str = clan_tag
+        self.cache: ResponseCache | None = cache
+        # reuse connections across requests and, in daemon mode, across evaluations
+        self.session = requests.Session()
+        # match the pool size to the worker count used for fetching player statistics
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+        self.session.headers.update(
+            {"Accept": "application/json", "authorization": f"Bearer {self.api_token}"}
+        )
 
     def get_current_members(self) -> Clan:
         LOGGER.info("Building list of current members...")
@@ -138,14 +193,60 @@ class CRAPIClient:
             player.previous_season_league_number = previous_season["leagueNumber"]
             player.previous_season_trophies = previous_season["trophies"]
 
-        with ThreadPoolExecutor() as executor:
-            executor.map(lambda player: get_stats_for_player(player), clan.get_members())
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            executor.map(instrumentation.in_current_run(get_stats_for_player), clan.get_members())
 
         LOGGER.info("Collection of path of legends statistics has finished.")
 
+    def get_battle_logs(
+        self, tags: list[str], max_workers: int = MAX_WORKERS
+    ) -> dict[str, list[dict]]:
+        """
+        Fetches the battle logs of the given players with at most max_workers concurrent requests.
+        Players whose battle log cannot be fetched are left out.
+        """
+        LOGGER.info(f"Fetching battle logs of {len(tags)} players...")
+
+        def get_battle_log(tag: str) -> list[dict] | None:
+            try:
+                return self.__get_json(f"/players/{url_encode(tag)}/battlelog")
+            except requests.HTTPError as e:
+                LOGGER.warning(f"Battle log of player {tag} could not be fetched: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, MAX_WORKERS)) as executor:
+            battle_logs = dict(
+                zip(tags, executor.map(instrumentation.in_current_run(get_battle_log), tags))
+            )
+        return {tag: battles for tag, battles in battle_logs.items() if battles is not None}
+
     def __get_json(self, path: str):
-        headers = {"Accept": "application/json", "authorization": f"Bearer {self.api_token}"}
-        response = requests.get(API_ENDPOINT + path, headers=headers)
+        """
+        Returns the parsed response, which may be shared with concurrent callers of the same path
+        or served from the response cache and must therefore not be modified.
+        """
+        endpoint = ENCODED_TAG_PATTERN.sub("{tag}", path)
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, path)
+            if cached is not None:
+                instrumentation.record_cached(endpoint)
+                return cached
+
+        result, shared = IN_FLIGHT.do(path, lambda: self.__fetch_json(path))
+        if shared:
+            instrumentation.record_coalesced(endpoint)
+        elif self.cache is not None:
+            self.cache.put(endpoint, path, result)
+        return result
+
+    def __fetch_json(self, path: str):
+        start = time.perf_counter()
+        response = self.session.get(API_ENDPOINT + path)
+        instrumentation.record_http(
+            endpoint=ENCODED_TAG_PATTERN.sub("{tag}", path),
+            duration=time.perf_counter() - start,
+            num_bytes=len(response.content),
+        )
         response.raise_for_status()
         return response.json()
 
@@ -0,0 +1,123 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+from player_ranking import metrics, player_ranking
+from player_ranking.constants import ROOT_DIR
+from player_ranking.polling import ResponseCache, get_last_phase_change, get_next_phase_change
+from player_ranking.presence import PresenceTracker
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_next_run(ts: datetime, interval: timedelta) -> datetime:
+    """
+    Returns the next point in time after the given timestamp at which an evaluation should run.
+    Runs are aligned to the most recent start or end of the battle days of a clan war, so that both
+    are always evaluated regardless of the chosen interval.
+    """
+    last_phase_change: datetime = get_last_phase_change(ts)
+    elapsed_intervals: int = (ts - last_phase_change) // interval
+    return min(last_phase_change + (elapsed_intervals + 1) * interval, get_next_phase_change(ts))
+
+
+class Daemon:
+    """
+    Keeps the process, its configuration and its API clients alive and schedules evaluations itself.
+    """
+
+    def __init__(
+        self,
+        plot: bool,
+        interval: timedelta,
+        force: bool = False,
+        metrics_port: int | None = None,
+        metrics_file: Path | None = None,
+        api_port: int | None = None,
+        adaptive_polling: bool = False,
+    ) -> None:
+        self.plot: bool = plot
+        # only the first run is forced, later runs skip unchanged inputs
+        self.force: bool = force
+        self.interval: timedelta = interval
+        self.metrics_port: int | None = metrics_port
+        self.metrics_file: Path | None = metrics_file
+        self.api_port: int | None = api_port
+        self.adaptive_polling: bool = adaptive_polling
+        self._stopped = threading.Event()
+        self._context: player_ranking.EvaluationContext | None = None
+
+    def run(self) -> None:
+        LOGGER.info(f"Starting daemon with an evaluation interval of {self.interval}.")
+        self._context = player_ranking.EvaluationContext(
+            response_cache=ResponseCache() if self.adaptive_polling else None
+        )
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = metrics.REGISTRY.serve(self.metrics_port)
+        api_server = None
+        if self.api_port is not None:
+            api_server = self._context.rating_store.serve(self.api_port)
+        try:
+            while not self._stopped.is_set():
+                self.run_once()
+                now = datetime.now(timezone.utc)
+                next_run: datetime = get_next_run(now, self.interval)
+                LOGGER.info(f"Next evaluation scheduled for {next_run:%d.%m.%Y %H:%M:%S} UTC.")
+                self._stopped.wait((next_run - now).total_seconds())
+        finally:
+            # also on KeyboardInterrupt, which ends the loop without stop()
+            if metrics_server:
+                metrics_server.shutdown()
+            if api_server:
+                api_server.shutdown()
+            LOGGER.info("Daemon has been stopped.")
+
+    def run_once(self) -> None:
+        try:
+            player_ranking.perform_evaluation(
+                plot=self.plot, context=self._context, force=self.force
+            )
+            self.force = False
+        except Exception:
+            # a single failing run (e.g. an API outage) must not take down the daemon
+            LOGGER.exception("Evaluation failed, retrying at the next scheduled run.")
+        if self.metrics_file:
+            metrics.REGISTRY.write_textfile(self.metrics_file)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class PresenceSampler:
+    """
+    Polls only the member lists of the configured clans to record when members are online.
+    """
+
+    def __init__(self, interval: timedelta) -> None:
+        self.interval: timedelta = interval
+        self._stopped = threading.Event()
+        # an invalid parameter file keeps the previous configuration instead of ending the sampling
+        self._clients = player_ranking.ClanClients()
+
+    def run(self) -> None:
+        LOGGER.info(f"Sampling member presence every {self.interval}.")
+        while not self._stopped.is_set():
+            self.run_once()
+            self._stopped.wait(self.interval.total_seconds())
+        LOGGER.info("Presence sampling has been stopped.")
+
+    def run_once(self) -> None:
+        for params in self._clients.reload_params():
+            try:
+                clan = self._clients.get_cr_api(params.clanTag).get_current_members()
+                tracker = PresenceTracker(ROOT_DIR / params.stateDirectory, params.clanTag)
+                tracker.record(clan)
+                tracker.save()
+            except Exception:
+                LOGGER.exception(f"Sampling the presence of clan {params.clanTag} failed.")
+
+    def stop(self) -> None:
+        self._stopped.set()
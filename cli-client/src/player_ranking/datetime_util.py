@@ -1,4 +1,12 @@
 from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+CR_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S.%fZ"
+CR_TIMESTAMP_LENGTH = 20
 
 
 def get_season_start(ts: datetime) -> datetime:
@@ -31,22 +39,227 @@ def get_season_end(season_start: datetime) -> datetime:
     return four_weeks_later + timedelta(weeks=1)
 
 
+def get_war_week(ts: datetime) -> tuple[datetime, datetime, datetime]:
+    """
+    Returns the start of the war week the timestamp falls into, the start of its battle days and its
+    end, which is also the end of the battle days. War weeks start on Monday at 10 AM UTC, including
+    the first week of a season, and their battle days start on Thursday at 10 AM UTC.
+    """
+    week_start = datetime.combine(
+        (ts - timedelta(days=ts.weekday())).date(), time(hour=10), ts.tzinfo
+    )
+    if ts < week_start:
+        week_start -= timedelta(weeks=1)
+    return week_start, week_start + timedelta(days=3), week_start + timedelta(weeks=1)
+
+
+def is_war_day(ts: datetime) -> bool:
+    """
+    Returns whether the battle days of a clan war are ongoing (Thursday until Monday 10 AM UTC).
+    """
+    _, battle_start, _ = get_war_week(ts)
+    return ts >= battle_start
+
+
 def get_time_since_last_clan_war_started(ts: datetime) -> timedelta:
     """
     Returns the timedelta since the start of the most recent clan war.
     Clan wars start roughly 10 AM UTC on Thursday.
     """
-    days_since_last_thursday = (ts.weekday() - 3) % 7
-    if days_since_last_thursday == 0 and ts.time() < time(hour=10):
-        # the war beginning today has not yet started
-        days_since_last_thursday = 7
-    last_thursday = ts - timedelta(days=days_since_last_thursday)
-    last_thursday_10am = datetime.combine(last_thursday, time(hour=10), ts.tzinfo)
-    return ts - last_thursday_10am
+    _, battle_start, _ = get_war_week(ts)
+    if ts < battle_start:
+        # the war of this week has not yet started
+        battle_start -= timedelta(weeks=1)
+    return ts - battle_start
 
 
+@lru_cache(maxsize=4096)
 def parse_timestamp(timestamp: str) -> datetime:
     """
-    Parse a timestamp in the form returned by the CR API.
+    Parse a timestamp in the form returned by the CR API, e.g. 20260126T192338.000Z.
+    Timestamps in the usual fixed layout are parsed by slicing, anything else falls back to strptime.
+    """
+    if (
+        len(timestamp) == CR_TIMESTAMP_LENGTH
+        and timestamp[8] == "T"
+        and timestamp[15] == "."
+        and timestamp[19] == "Z"
+        and timestamp[:8].isdigit()
+        and timestamp[9:15].isdigit()
+        and timestamp[16:19].isdigit()
+    ):
+        return datetime(
+            int(timestamp[0:4]),
+            int(timestamp[4:6]),
+            int(timestamp[6:8]),
+            int(timestamp[9:11]),
+            int(timestamp[11:13]),
+            int(timestamp[13:15]),
+            int(timestamp[16:19]) * 1000,
+            tzinfo=timezone.utc,
+        )
+    return datetime.strptime(timestamp, CR_TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def parse_timestamps(timestamps: Iterable[str]) -> np.ndarray:
+    """
+    Parse many timestamps in the form returned by the CR API at once.
+    Returns an array of UTC timestamps with dtype datetime64[ms].
+    """
+    values = timestamps if isinstance(timestamps, np.ndarray) else np.asarray(list(timestamps))
+    if values.size == 0:
+        return np.array([], dtype="datetime64[ms]")
+    if values.dtype.kind != "U" or values.dtype.itemsize // 4 != CR_TIMESTAMP_LENGTH:
+        # irregular input (e.g. missing values or other precisions), let pandas handle it
+        parsed = pd.to_datetime(pd.Series(values), format=CR_TIMESTAMP_FORMAT)
+        return parsed.to_numpy(dtype="datetime64[ms]")
+
+    # rearrange the characters of all timestamps into ISO 8601 and let numpy parse them in one go
+    chars = values.reshape(-1).view("U1").reshape(-1, CR_TIMESTAMP_LENGTH)
+
+    def separator(char: str) -> np.ndarray:
+        return np.full((chars.shape[0], 1), char, dtype="U1")
+
+    iso = np.hstack(
+        [
+            chars[:, 0:4],
+            separator("-"),
+            chars[:, 4:6],
+            separator("-"),
+            chars[:, 6:9],  # day and "T"
+            chars[:, 9:11],
+            separator(":"),
+            chars[:, 11:13],
+            separator(":"),
+            chars[:, 13:19],  # seconds, "." and milliseconds
+        ]
+    )
+    return iso.view(f"U{iso.shape[1]}").reshape(values.shape).astype("datetime64[ms]")
+
+
+def to_datetime64(timestamps) -> np.ndarray:
+    """
+    Converts timezone-aware or naive UTC timestamps to an array with dtype datetime64[s] (naive UTC).
     """
-    return datetime.strptime(timestamp, "%Y%m%dT%H%M%S.%fZ").replace(tzinfo=timezone.utc)
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == "M":
+        return timestamps.astype("datetime64[s]")
+    converted = pd.to_datetime(
+        pd.Series(np.atleast_1d(np.asarray(timestamps, dtype=object))), utc=True
+    )
+    return converted.dt.tz_localize(None).to_numpy(dtype="datetime64[s]")
+
+
+class WarCalendar:
+    """
+    Precomputed season and war week boundaries for a range of years.
+
+    Each season consists of 4 or 5 war weeks (sections) which start on Mondays at 10 AM UTC.
+    The battle days of a war start on Thursday at 10 AM UTC and last until the end of the week.
+    As the CR API does not expose the numbering of seasons, seasons are labelled relative to
+    an anchor, i.e. a known season ID and any timestamp within that season.
+    """
+
+    def __init__(self, anchor_season_id: int, anchor: datetime, first_year: int, last_year: int):
+        season_starts = []
+        for year in range(first_year, last_year + 2):
+            for month in range(1, 13):
+                first_day = date(year, month, 1)
+                first_monday = first_day + timedelta(days=(7 - first_day.weekday()) % 7)
+                season_starts.append(datetime.combine(first_monday, time(hour=10)))
+        starts = np.array(season_starts, dtype="datetime64[s]")
+
+        # the last start only serves as the end of the preceding season
+        self.season_starts: np.ndarray = starts[:-1]
+        self.season_ends: np.ndarray = starts[1:]
+        anchor_index = (
+            int(np.searchsorted(self.season_starts, to_datetime64(anchor)[0], "right")) - 1
+        )
+        if anchor_index < 0 or anchor_index >= len(self.season_starts):
+            raise ValueError(f"Anchor {anchor} is outside of the years {first_year}-{last_year}.")
+        self.season_ids: np.ndarray = (
+            np.arange(len(self.season_starts)) - anchor_index + anchor_season_id
+        )
+
+        week = np.timedelta64(7, "D")
+        weeks_per_season = ((self.season_ends - self.season_starts) // week).astype(int)
+        self.section_season_ids: np.ndarray = np.repeat(self.season_ids, weeks_per_season)
+        self.section_indexes: np.ndarray = np.concatenate([np.arange(n) for n in weeks_per_season])
+        self.section_starts: np.ndarray = (
+            np.repeat(self.season_starts, weeks_per_season) + self.section_indexes * week
+        )
+
+    @classmethod
+    def from_war_id(cls, war_id: str, ts: datetime, years: int = 2) -> "WarCalendar":
+        """
+        Creates a calendar anchored at a war labelled "seasonId.sectionIndex" that was ongoing at the given time.
+        """
+        season_id, section_index = (int(part) for part in war_id.split("."))
+        season_start: datetime = ts - timedelta(weeks=section_index)
+        return cls(season_id, season_start, ts.year - years, ts.year + years)
+
+    def _season_positions(self, timestamps: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(self.season_starts, timestamps, "right") - 1
+        if np.any(positions < 0) or np.any(timestamps >= self.season_ends[-1]):
+            raise ValueError("Timestamps outside of the precomputed range of the war calendar.")
+        return positions
+
+    def _section_positions(self, timestamps: np.ndarray) -> np.ndarray:
+        self._season_positions(timestamps)  # range check
+        return np.searchsorted(self.section_starts, timestamps, "right") - 1
+
+    def get_season(self, ts: datetime) -> tuple[int, datetime, datetime]:
+        """
+        Returns the season ID as well as the start and the end of the season the timestamp falls into.
+        """
+        position = self._season_positions(to_datetime64(ts))[0]
+        start = self.season_starts[position].astype(datetime).replace(tzinfo=ts.tzinfo)
+        end = self.season_ends[position].astype(datetime).replace(tzinfo=ts.tzinfo)
+        return int(self.season_ids[position]), start, end
+
+    def get_war_id(self, ts: datetime) -> str:
+        return str(self.war_ids(ts)[0])
+
+    def season_ids_of(self, timestamps) -> np.ndarray:
+        return self.season_ids[self._season_positions(to_datetime64(timestamps))]
+
+    def war_ids(self, timestamps) -> np.ndarray:
+        """
+        Maps timestamps to the ID ("seasonId.sectionIndex") of the war week they fall into.
+        """
+        positions = self._section_positions(to_datetime64(timestamps))
+        season_ids = self.section_season_ids[positions].astype(str)
+        section_indexes = self.section_indexes[positions].astype(str)
+        return np.char.add(np.char.add(season_ids, "."), section_indexes)
+
+    def season_progress(self, timestamps) -> np.ndarray:
+        """
+        Returns the fraction of the season that has passed, ranging from 0 to 1.
+        """
+        ts = to_datetime64(timestamps)
+        positions = self._season_positions(ts)
+        start = self.season_starts[positions]
+        return (ts - start) / (self.season_ends[positions] - start)
+
+    def war_progress(self, timestamps) -> np.ndarray:
+        """
+        Returns the fraction of the battle days of the current war week that has passed.
+        It is 0 during training days and grows linearly from 0 to 1 during the 4 battle days.
+        """
+        ts = to_datetime64(timestamps)
+        battle_start = self.section_starts[self._section_positions(ts)] + np.timedelta64(3, "D")
+        return np.clip((ts - battle_start) / np.timedelta64(4, "D"), 0, 1)
+
+    def annotate(self, timestamps) -> pd.DataFrame:
+        """
+        Annotates timestamps in bulk with their season, war and progress within both.
+        """
+        ts = to_datetime64(timestamps)
+        return pd.DataFrame(
+            {
+                "season_id": self.season_ids_of(ts),
+                "war_id": self.war_ids(ts),
+                "season_progress": self.season_progress(ts),
+                "war_progress": self.war_progress(ts),
+            },
+            index=pd.DatetimeIndex(ts, name="timestamp"),
+        )
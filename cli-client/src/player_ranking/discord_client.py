@@ -1,60 +1,178 @@
+import json
 import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
 
 import requests
 
+from player_ranking import instrumentation
 from player_ranking.models.clan_member import ClanMember
-from player_ranking.models.ranking_parameters import PromotionRequirements
+from player_ranking.promotion_engine import PromotionResults, RankPolicy
+from player_ranking.state_files import read_json, write_text
 
 LOGGER = logging.getLogger(__name__)
 CLAN_WARS_ICON_URL = (
     "https://static.wikia.nocookie.net/clashroyale/images/9/9f/War_Shield.png/revision/latest"
 )
 ELITE_BARBS_ICON_URL = "https://static.wikia.nocookie.net/clashroyale/images/e/e8/EliteBarbariansCard.png/revision/latest"
+# Discord accepts at most 10 embeds per message
+MAX_EMBEDS_PER_MESSAGE = 10
+LEDGER_FILE = "discord-ledger.json"
+
+
+class NotificationLedger:
+    """
+    Remembers which rank recommendations have already been posted so that each is posted exactly once.
+    Entries are dropped once a recommendation is no longer pending, e.g. after the player was promoted.
+    """
+
+    def __init__(self, state_directory: Path):
+        self.path: Path = state_directory / LEDGER_FILE
+        self._entries: dict[str, str] = read_json(self.path, {})
+
+    @staticmethod
+    def key(clan_tag: str, policy: RankPolicy, player: ClanMember) -> str:
+        return f"{clan_tag}:{policy.name}:{player.tag}"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def add(self, key: str) -> None:
+        self._entries[key] = datetime.now(timezone.utc).isoformat()
+
+    def retain(self, clan_tag: str, pending_keys: set[str]) -> None:
+        self._entries = {
+            k: v
+            for k, v in self._entries.items()
+            if not k.startswith(f"{clan_tag}:") or k in pending_keys
+        }
+
+    def save(self) -> None:
+        write_text(self.path, json.dumps(self._entries, indent=2, sort_keys=True))
 
 
 class DiscordClient:
-    def __init__(self, webhook: str):
+    def __init__(self, webhook: str, max_retries: int = 5):
         self.webhook = webhook
+        self.max_retries: int = max_retries
+        self.session = requests.Session()
 
-    def post_pending_promotions(
-        self, requirements: PromotionRequirements, pending_promotions: list[ClanMember]
+    def dispatch(
+        self, clan_tag: str, results: PromotionResults, ledger: NotificationLedger
     ) -> None:
-        LOGGER.info("Posting pending promotion message to webhook.")
+        """
+        Posts all recommendations that have not been posted before, coalesced into as few messages
+        as possible, and records them in the ledger.
+        """
+        pending_keys: set[str] = set()
+        # embeds to post together with the ledger keys of the players they announce
+        embeds: list[tuple[dict, list[str]]] = []
+        for policy, players in results.non_empty():
+            keys = {NotificationLedger.key(clan_tag, policy, p): p for p in players}
+            pending_keys.update(keys)
+            new_players = {key: p for key, p in keys.items() if key not in ledger}
+            if new_players:
+                embeds.append(
+                    (self.build_embed(policy, list(new_players.values())), list(new_players))
+                )
+            else:
+                LOGGER.info(f"Pending {policy.name} recommendations have already been posted.")
 
-        min_fame = requirements.minFameForCountingWar
-        min_wars = requirements.minCountingWars
-        requirements_msg = (
-            f"To be recommended for promotion, a player must score at least **{min_fame} fame** "
-            f"in **{min_wars} or more recent clan wars**."
+        try:
+            for i in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+                batch = embeds[i : i + MAX_EMBEDS_PER_MESSAGE]
+                LOGGER.info(f"Posting {len(batch)} rank recommendation(s) to webhook.")
+                self.post(self.build_message([embed for embed, _ in batch]))
+                for _, keys in batch:
+                    for key in keys:
+                        ledger.add(key)
+        finally:
+            ledger.retain(clan_tag, pending_keys)
+            ledger.save()
+
+    def post(self, message: dict) -> None:
+        """
+        Posts a message to the webhook and waits for the rate limit to reset if necessary.
+        """
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            response = self.session.post(self.webhook, json=message)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            retry_after = self.get_retry_after(response)
+            LOGGER.warning(f"Discord rate limit hit, retrying after {retry_after:.2f}s.")
+            time.sleep(retry_after)
+        instrumentation.record_http(
+            endpoint="discord_webhook", duration=time.perf_counter() - start, retries=attempt
         )
-        players = [f"**{p.name}** ({p.tag})" for p in pending_promotions]
+        response.raise_for_status()
+
+        # do not run into the rate limit with the next message
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            time.sleep(float(response.headers.get("X-RateLimit-Reset-After", 0)))
 
-        message = {
+    @staticmethod
+    def get_retry_after(response: requests.Response) -> float:
+        try:
+            return float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("Retry-After", 1))
+
+    @staticmethod
+    def build_message(embeds: list[dict]) -> dict:
+        return {
             "username": "Clan Herald",
             "avatar_url": CLAN_WARS_ICON_URL,
-            "embeds": [
+            "embeds": embeds,
+        }
+
+    @staticmethod
+    def build_embed(policy: RankPolicy, players: list[ClanMember]) -> dict:
+        min_fame = policy.requirements.minFameForCountingWar
+        min_wars = policy.requirements.minCountingWars
+        if policy.demotion:
+            title = "⚠️ Demotion Warning"
+            description = (
+                f"The following players are at risk of being demoted to **{policy.target_rank}**:"
+            )
+            field_name = "📉 At Risk"
+            requirements_name = "📋 Requirements to Keep the Rank"
+            requirements_msg = (
+                f"To keep their rank, a player must score at least **{min_fame} fame** "
+                f"in **{min_wars} or more recent clan wars**."
+            )
+        else:
+            title = "🎖️ Promotion Announcement"
+            description = (
+                f"The following players have earned a promotion to the rank of "
+                f"**{policy.target_rank}**:"
+            )
+            field_name = "🏅 Up for Promotion"
+            requirements_name = "📋 Promotion Criteria"
+            requirements_msg = (
+                f"To be recommended for promotion, a player must score at least **{min_fame} fame** "
+                f"in **{min_wars} or more recent clan wars**."
+            )
+
+        return {
+            "title": title,
+            "description": description,
+            "color": 0xFF8C00 if policy.demotion else 0xFFD700,
+            "fields": [
                 {
-                    "title": "🎖️ Promotion Announcement",
-                    "description": "The following players have earned a promotion to the rank of **Elder**:",
-                    "color": 0xFFD700,
-                    "fields": [
-                        {
-                            "name": "🏅 Up for Promotion",
-                            "value": "\n".join(players),
-                            "inline": False,
-                        },
-                        {
-                            "name": "📋 Promotion Criteria",
-                            "value": requirements_msg,
-                            "inline": False,
-                        },
-                    ],
-                    "footer": {
-                        "text": "Keep up the great work!",
-                        "icon_url": ELITE_BARBS_ICON_URL,
-                    },
-                }
+                    "name": field_name,
+                    "value": "\n".join(f"**{p.name}** ({p.tag})" for p in players),
+                    "inline": False,
+                },
+                {
+                    "name": requirements_name,
+                    "value": requirements_msg,
+                    "inline": False,
+                },
             ],
+            "footer": {
+                "text": "Keep up the great work!",
+                "icon_url": ELITE_BARBS_ICON_URL,
+            },
         }
-        response = requests.post(self.webhook, json=message)
-        response.raise_for_status()
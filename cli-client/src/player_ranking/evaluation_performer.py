@@ -1,10 +1,13 @@
+import dataclasses
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import List
 
 import numpy as np
 import pandas as pd
 
+from player_ranking import instrumentation
 from player_ranking.excuse_handler import ExcuseHandler
 from player_ranking.models.clan import Clan
 from player_ranking.datetime_util import (
@@ -12,7 +15,8 @@ from player_ranking.datetime_util import (
     get_season_start,
     get_time_since_last_clan_war_started,
 )
-from player_ranking.models.ranking_parameters import RankingParameters
+from player_ranking.models.ranking_parameters import RankingParameters, RatingWeights
+from player_ranking.war_statistics import WarStatistics
 
 LOGGER = logging.getLogger(__name__)
 MAX_LEAGUE_NUMBER = 7
@@ -26,6 +30,18 @@ def normalize(val: int, max_val: int, min_val: int, default: int) -> float | Non
     return (val - min_val) / (max_val - min_val) * 1000
 
 
+@dataclass(frozen=True)
+class AdjustedInputs:
+    """
+    The rating weights and fame after applying the war and season progress, ignored wars and excuses.
+    """
+
+    weights: RatingWeights
+    war_progress: float
+    current_war: pd.Series
+    war_log: pd.DataFrame
+
+
 class EvaluationPerformer:
     def __init__(
         self,
@@ -34,31 +50,43 @@ class EvaluationPerformer:
         war_log: pd.DataFrame,
         ranking_parameters: RankingParameters,
         excuses: ExcuseHandler,
+        war_statistics: WarStatistics | None = None,
+        now: datetime | None = None,
     ) -> None:
         self.clan: Clan = clan
-        self.current_war = current_war
-        self.war_log = war_log
-        self.war_progress = None
-        self.params = ranking_parameters
+        # the inputs are never modified, adjusted copies are created where needed
+        self.current_war: pd.Series = current_war
+        self.war_log: pd.DataFrame = war_log
+        self.params: RankingParameters = ranking_parameters
+        self.inputs: AdjustedInputs | None = None
         self.excuses: ExcuseHandler = excuses
+        # pass the persisted statistics to only apply the changes of the war log
+        self.war_statistics: WarStatistics = war_statistics or WarStatistics(
+            ranking_parameters.warHistoryWindow
+        )
+        # point in time the evaluation is performed for, e.g. a past run when backfilling
+        self.now: datetime = now or datetime.now(timezone.utc)
 
     def evaluate(self) -> pd.DataFrame:
-        self.adjust_inputs()
-        self.evaluate_ratings()
-        return self.build_rating_df()
-
-    def adjust_inputs(self) -> None:
-        self.adjust_war_weights()
-        self.adjust_season_weights()
-        self.ignore_selected_wars()
-        self.excuses.adjust_fame_with_excuses(
-            current_war=self.current_war, war_log=self.war_log, war_progress=self.war_progress
+        with instrumentation.span("evaluate.adjust_inputs"):
+            self.inputs = self.adjust_inputs()
+        with instrumentation.span("evaluate.ratings"):
+            self.evaluate_ratings(self.inputs)
+        with instrumentation.span("evaluate.build_rating_df"):
+            return self.build_rating_df()
+
+    def adjust_inputs(self) -> AdjustedInputs:
+        weights, war_progress = self.adjust_war_weights(self.params.ratingWeights)
+        weights = self.adjust_season_weights(weights)
+        current_war, war_log = self.ignore_selected_wars(self.current_war, self.war_log)
+        current_war, war_log = self.excuses.adjust_fame_with_excuses(
+            current_war=current_war, war_log=war_log, war_progress=war_progress
         )
+        return AdjustedInputs(weights, war_progress, current_war, war_log)
 
-    def adjust_war_weights(self):
-        weights = self.params.ratingWeights
-        now = datetime.now(timezone.utc)
-        time_since_start = get_time_since_last_clan_war_started(now)
+    def adjust_war_weights(self, weights: RatingWeights) -> tuple[RatingWeights, float]:
+        weights = dataclasses.replace(weights)
+        time_since_start = get_time_since_last_clan_war_started(self.now)
         if time_since_start > timedelta(days=4):
             # Training days are currently happening, do not count current war
             war_progress = 0
@@ -72,18 +100,17 @@ class EvaluationPerformer:
             weights.currentWar *= war_progress
 
         LOGGER.info(f"War progress: {war_progress}")
-        self.war_progress = war_progress
         weights.check()
+        return weights, war_progress
 
-    def adjust_season_weights(self) -> None:
-        weights = self.params.ratingWeights
-        now: datetime = datetime.now(timezone.utc)
+    def adjust_season_weights(self, weights: RatingWeights) -> RatingWeights:
+        weights = dataclasses.replace(weights)
 
         # the season ends at 10AM UTC on the first Monday of a month
-        current_season_start: datetime = get_season_start(now)
+        current_season_start: datetime = get_season_start(self.now)
         current_season_end: datetime = get_season_end(current_season_start)
 
-        season_progress: float = (now - current_season_start) / (
+        season_progress: float = (self.now - current_season_start) / (
             current_season_end - current_season_start
         )
         LOGGER.info(f"Season progress: {season_progress}")
@@ -96,19 +123,24 @@ class EvaluationPerformer:
         weights.currentSeasonTrophies -= redistributed_trophy_weight
         weights.previousSeasonTrophies += redistributed_trophy_weight
         weights.check()
+        return weights
 
-    def ignore_selected_wars(self):
+    def ignore_selected_wars(
+        self, current_war: pd.Series, war_log: pd.DataFrame
+    ) -> tuple[pd.Series, pd.DataFrame]:
         ignored_wars: List[str] = self.params.ignoreWars
-        ignored_wars_in_history = list(set(ignored_wars) & set(self.war_log.columns))
-        self.war_log.loc[:, ignored_wars_in_history] = np.nan
-        if ignored_wars and max([float(i) for i in ignored_wars]) > float(self.war_log.columns[0]):
-            self.current_war.values[:] = 0
-
-    def evaluate_ratings(self) -> None:
-        weights = self.params.ratingWeights
-
-        self.evaluate_war_log()
-        self.evaluate_current_war()
+        ignored_wars_in_history = war_log.columns.intersection(ignored_wars)
+        if not ignored_wars_in_history.empty:
+            war_log = war_log.assign(**dict.fromkeys(ignored_wars_in_history, np.nan))
+        if ignored_wars and max([float(i) for i in ignored_wars]) > float(war_log.columns[0]):
+            current_war = pd.Series(0, index=current_war.index, name=current_war.name)
+        return current_war, war_log
+
+    def evaluate_ratings(self, inputs: AdjustedInputs) -> None:
+        weights = inputs.weights
+
+        self.evaluate_war_log(inputs.war_log)
+        self.evaluate_current_war(inputs.current_war)
         self.evaluate_previous_season()
         self.evaluate_current_season()
         self.evaluate_ladder()
@@ -158,24 +190,24 @@ class EvaluationPerformer:
         for player in self.clan.get_members():
             player.ladder = normalize(player.trophies, trophies_max, trophies_min, 1000)
 
-    def evaluate_war_log(self) -> None:
-        self.war_log["mean"] = self.war_log.mean(axis=1)
-        war_log_max_fame = self.war_log["mean"].max()
-        war_log_min_fame = self.war_log["mean"].min()
+    def evaluate_war_log(self, war_log: pd.DataFrame) -> None:
+        self.war_statistics.update(war_log)
+        for player in self.clan.get_members():
+            player.avg_fame = self.war_statistics.get_mean(player.tag)
+        avg_fames = pd.Series([player.avg_fame for player in self.clan.get_members()], dtype=float)
+        war_log_max_fame = avg_fames.max()
+        war_log_min_fame = avg_fames.min()
         for player in self.clan.get_members():
-            player.avg_fame = (
-                self.war_log.at[player.tag, "mean"] if player.tag in self.war_log.index else None
-            )
             player.war_history = normalize(
                 player.avg_fame, war_log_max_fame, war_log_min_fame, 1000
             )
 
-    def evaluate_current_war(self) -> None:
-        current_max_fame = self.current_war.max()
-        current_min_fame = self.current_war.min()
+    def evaluate_current_war(self, current_war: pd.Series) -> None:
+        current_max_fame = current_war.max()
+        current_min_fame = current_war.min()
         for player in self.clan.get_members():
             # player_tag is not present in current_war until a user has logged in after season reset
-            current_fame = self.current_war[player.tag] if player.tag in self.current_war else 0
+            current_fame = current_war[player.tag] if player.tag in current_war else 0
             player.current_war = normalize(current_fame, current_max_fame, current_min_fame, 1000)
 
     def evaluate_previous_season(self) -> None:
@@ -236,8 +268,7 @@ class EvaluationPerformer:
     def build_rating_df(self) -> pd.DataFrame:
         rating = pd.DataFrame([player.__dict__ for player in self.clan.get_members()])
 
-        now: datetime = datetime.now(timezone.utc)
-        rating["last_seen"] = (now - rating["last_seen"]).dt.days.astype(str) + " days ago"
+        rating["last_seen"] = (self.now - rating["last_seen"]).dt.days.astype(str) + " days ago"
 
         rating = rating.set_index("tag")
         rating = rating[
@@ -11,6 +11,10 @@ from player_ranking.models.ranking_parameters import Excuses
 LOGGER = logging.getLogger(__name__)
 
 
+def is_same_fame(a: int | float, b: int | float) -> bool:
+    return a == b or (pd.isnull(a) and pd.isnull(b))
+
+
 class ExcuseHandler:
     def __init__(
         self,
@@ -45,10 +49,17 @@ class ExcuseHandler:
 
     def adjust_fame_with_excuses(
         self, current_war: pd.Series, war_log: pd.DataFrame, war_progress: float
-    ) -> None:
+    ) -> tuple[pd.Series, pd.DataFrame]:
+        """
+        Returns the current war and the war log with the fame of excused players replaced.
+        The given series and frame are left unchanged, the war log is only copied if an excuse applies.
+        """
+        current_fame: dict[str, int | float] = current_war.to_dict()
+        war_log_fame: np.ndarray | None = None
+        rows = {tag: row for row, tag in enumerate(war_log.index)}
         for player in self._clan.get_members():
             # current river race
-            current_war.at[player.tag] = self.get_new_fame(
+            current_fame[player.tag] = self.get_new_fame(
                 excuse_params=self._params,
                 player_name=player.name,
                 excuse=self._excuses.at[player.tag, current_war.name],
@@ -56,16 +67,26 @@ class ExcuseHandler:
                 war_id=str(current_war.name),
                 factor=war_progress,
             )
-            if player.tag in war_log.index:
-                for war, fame in war_log.loc[player.tag].items():
+            if player.tag in rows:
+                row = rows[player.tag]
+                for column, (war, fame) in enumerate(war_log.iloc[row].items()):
                     # river race history
-                    war_log.loc[player.tag, war] = self.get_new_fame(
+                    new_fame = self.get_new_fame(
                         excuse_params=self._params,
                         player_name=player.name,
                         excuse=self._excuses.at[player.tag, war],
                         old_fame=fame,
                         war_id=war,
                     )
+                    if is_same_fame(new_fame, fame):
+                        continue
+                    if war_log_fame is None:
+                        war_log_fame = war_log.to_numpy(dtype=float, copy=True)
+                    war_log_fame[row, column] = new_fame
+
+        if war_log_fame is not None:
+            war_log = pd.DataFrame(war_log_fame, index=war_log.index, columns=war_log.columns)
+        return pd.Series(current_fame, name=current_war.name), war_log
 
     @staticmethod
     def add_missing_wars(
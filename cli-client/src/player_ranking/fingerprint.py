@@ -0,0 +1,86 @@
+import dataclasses
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from player_ranking.datetime_util import is_war_day
+from player_ranking.models.clan import Clan
+from player_ranking.models.ranking_parameters import RankingParameters
+from player_ranking.state_files import write_text
+
+LOGGER = logging.getLogger(__name__)
+FINGERPRINT_FILE = "input-fingerprint-{clan}.txt"
+
+
+def fingerprint_inputs(
+    clan: Clan,
+    war_log: pd.DataFrame,
+    current_war: pd.Series,
+    excuses: pd.DataFrame,
+    params: RankingParameters | None = None,
+    now: datetime | None = None,
+) -> str:
+    """
+    Computes a hash over all inputs of an evaluation, including the ranking parameters and the time
+    of the evaluation.
+    Only material changes are taken into account, e.g. 'lastSeen' is reduced to its date as the rating
+    table only displays the number of days since a player was last seen. Likewise, the time of the
+    evaluation is reduced to its date and whether the battle days of a war are ongoing, so the
+    evaluation is repeated at least once a day and whenever the war phase changes.
+    """
+    digest = hashlib.sha256()
+    if params is not None:
+        digest.update(repr(dataclasses.asdict(params)).encode())
+    if now is not None:
+        battle_days: bool = is_war_day(now)
+        digest.update(repr((now.date().isoformat(), battle_days)).encode())
+    for member in sorted(clan.get_members(), key=lambda m: m.tag):
+        member_state = (
+            member.tag,
+            member.name,
+            member.role,
+            member.trophies,
+            member.level,
+            member.net_donations,
+            member.last_seen.date().isoformat(),
+            member.current_season_league_number,
+            member.current_season_trophies,
+            member.previous_season_league_number,
+            member.previous_season_trophies,
+        )
+        digest.update(repr(member_state).encode())
+    digest.update(_hash_frame(war_log))
+    digest.update(_hash_frame(current_war.to_frame()))
+    digest.update(_hash_frame(excuses))
+    return digest.hexdigest()
+
+
+def _hash_frame(df: pd.DataFrame) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(repr(df.columns.tolist()).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.digest()
+
+
+class FingerprintStore:
+    def __init__(self, state_directory: Path, clan_tag: str):
+        self.path: Path = state_directory / FINGERPRINT_FILE.format(clan=clan_tag.lstrip("#"))
+
+    def load(self) -> str | None:
+        try:
+            return self.path.read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def save(self, fingerprint: str) -> None:
+        write_text(self.path, fingerprint)
+
+    def has_changed(self, fingerprint: str) -> bool:
+        previous = self.load()
+        if previous == fingerprint:
+            LOGGER.info("Inputs have not changed since the last evaluation.")
+            return False
+        return True
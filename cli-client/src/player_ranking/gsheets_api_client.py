@@ -11,6 +11,8 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from player_ranking import instrumentation
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -106,24 +108,33 @@ class GSheetsAPIClient:
 
     @staticmethod
     def execute_with_retry(func: Callable[[], Any], op_name: str, max_retries: int = 5) -> Any:
-        for attempt in range(max_retries):
-            try:
-                return func()
-            except HttpError as e:
-                if e.resp.status in [500, 503]:
-                    delay = 2**attempt + random.uniform(0, 1)
-
-                    LOGGER.warning(
-                        "[%s] Retry %d/%d after %.2fs (error=%s)",
-                        op_name,
-                        attempt + 1,
-                        max_retries,
-                        delay,
-                        e,
-                    )
-
-                    time.sleep(delay)
-                else:
-                    raise  # rethrow non-retryable errors
-
-        raise Exception(f"Max retries {max_retries} exceeded for operation {op_name}")
+        start = time.perf_counter()
+        retries = 0
+        try:
+            for attempt in range(max_retries):
+                retries = attempt
+                try:
+                    return func()
+                except HttpError as e:
+                    if e.resp.status in [500, 503]:
+                        delay = 2**attempt + random.uniform(0, 1)
+
+                        LOGGER.warning(
+                            "[%s] Retry %d/%d after %.2fs (error=%s)",
+                            op_name,
+                            attempt + 1,
+                            max_retries,
+                            delay,
+                            e,
+                        )
+
+                        time.sleep(delay)
+                    else:
+                        raise  # rethrow non-retryable errors
+
+            retries = max_retries
+            raise Exception(f"Max retries {max_retries} exceeded for operation {op_name}")
+        finally:
+            instrumentation.record_http(
+                endpoint=op_name, duration=time.perf_counter() - start, retries=retries
+            )
@@ -0,0 +1,167 @@
+import json
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.state_files import atomic_path, read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+# values of archives written before the values file was versioned
+VALUES_FILE = "values.npy"
+VALUES_FILE_PATTERN = "values-{generation:06d}.npy"
+INDEX_FILE = "index.json"
+INITIAL_ROWS = 64
+INITIAL_COLUMNS = 256
+
+
+def get_capacity(size: int, minimum: int) -> int:
+    capacity = minimum
+    while capacity < size:
+        capacity *= 2
+    return capacity
+
+
+class MatrixArchive:
+    """
+    Stores a matrix of float32 values with one row per player and one column per snapshot (e.g. a
+    rating history or the fame per war) as a .npy file that is read through a memory map.
+
+    Rows are contiguous, so reading the series of one player touches only that series, and all
+    processes reading the archive share the same pages. The file is allocated with spare rows and
+    columns, so appending a column writes only the new values. The index of the rows (player tags)
+    and columns (labels like timestamps or war ids) is kept in a small JSON file, which is replaced
+    atomically after the values were written, so readers never see partial columns.
+
+    Rewriting the archive creates a new generation of the values file. The index names the values
+    file it belongs to, so replacing the index switches labels and values in one step. The previous
+    generation is kept for readers that still hold the previous index.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory: Path = directory
+        self.tags: list[str] = []
+        self.labels: list[str] = []
+        self.values_file: str = VALUES_FILE
+        self._row_index: dict[str, int] = {}
+        self.load_index()
+
+    def exists(self) -> bool:
+        return bool(self.labels)
+
+    def load_index(self) -> None:
+        index = read_json(self.directory / INDEX_FILE, {})
+        if not isinstance(index.get("tags"), list) or not isinstance(index.get("labels"), list):
+            # an unreadable archive is written again from its source
+            return
+        self.tags = index["tags"]
+        self.labels = index["labels"]
+        self.values_file = index.get("values", VALUES_FILE)
+        self._row_index = {tag: i for i, tag in enumerate(self.tags)}
+
+    def get_values_path(self) -> Path:
+        return self.directory / self.values_file
+
+    def get_generation(self) -> int:
+        match = re.fullmatch(r"values-(\d+)\.npy", self.values_file)
+        return int(match.group(1)) if match else 0
+
+    def get_values(self) -> np.ndarray:
+        """
+        Returns a read-only memory map of the values, NaN where a player has no value.
+        """
+        values = np.load(self.get_values_path(), mmap_mode="r")
+        return values[: len(self.tags), : len(self.labels)]
+
+    def get_series(self, tag: str) -> pd.Series:
+        row = self.get_values()[self._row_index[tag]]
+        return pd.Series(np.asarray(row, dtype=float), index=self.labels, name=tag)
+
+    def to_frame(self, tags: list[str] | None = None, first_column: int = 0) -> pd.DataFrame:
+        """
+        Copies the values of the given players (default: all) from the given column on into a frame.
+        """
+        values = self.get_values()[:, first_column:]
+        if tags is not None:
+            values = values[[self._row_index[tag] for tag in tags]]
+        return pd.DataFrame(
+            np.asarray(values, dtype=float),
+            index=tags if tags is not None else self.tags,
+            columns=self.labels[first_column:],
+        )
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Replaces the archive with the given frame (players x labels).
+        """
+        tags = [str(tag) for tag in df.index]
+        labels = [str(label) for label in df.columns]
+        previous_file = self.values_file
+        values_file = VALUES_FILE_PATTERN.format(generation=self.get_generation() + 1)
+        with atomic_path(self.directory / values_file) as tmp_path:
+            values = np.lib.format.open_memmap(
+                tmp_path,
+                mode="w+",
+                dtype=np.float32,
+                shape=(
+                    get_capacity(len(tags), INITIAL_ROWS),
+                    get_capacity(len(labels), INITIAL_COLUMNS),
+                ),
+            )
+            values[:] = np.nan
+            values[: len(tags), : len(labels)] = df.to_numpy(dtype=np.float32)
+            values.flush()
+            del values
+        # switches to the new values file
+        self.save_index(tags, labels, values_file)
+        for path in self.directory.glob("values*.npy"):
+            if path.name not in (values_file, previous_file):
+                path.unlink()
+
+    def append(self, label: str, values: pd.Series) -> bool:
+        """
+        Adds a column with the values of the given players. Returns False if the label exists.
+        """
+        label = str(label)
+        if label in self.labels:
+            return False
+        if not self.exists():
+            self.write(values.rename(label).to_frame())
+            return True
+
+        new_tags = [tag for tag in values.index if tag not in self._row_index]
+        stored = np.load(self.get_values_path(), mmap_mode="r")
+        if len(self.tags) + len(new_tags) > stored.shape[0] or len(self.labels) >= stored.shape[1]:
+            LOGGER.info(f"Growing archive {self.directory}.")
+            frame = self.to_frame()
+            del stored
+            self.write(pd.concat([frame, values.rename(label)], axis=1))
+            return True
+        del stored
+
+        tags = self.tags + new_tags
+        row_index = {tag: i for i, tag in enumerate(tags)}
+        # the new column is beyond the labels of the current index, readers do not see it yet
+        matrix = np.load(self.get_values_path(), mmap_mode="r+")
+        matrix[[row_index[tag] for tag in values.index], len(self.labels)] = values.to_numpy(
+            dtype=np.float32
+        )
+        matrix.flush()
+        del matrix
+        self.save_index(tags, self.labels + [label])
+        return True
+
+    def save_index(
+        self, tags: list[str], labels: list[str], values_file: str | None = None
+    ) -> None:
+        values_file = values_file or self.values_file
+        write_text(
+            self.directory / INDEX_FILE,
+            json.dumps({"tags": tags, "labels": labels, "values": values_file}),
+        )
+        self.tags = tags
+        self.labels = labels
+        self.values_file = values_file
+        self._row_index = {tag: i for i, tag in enumerate(tags)}
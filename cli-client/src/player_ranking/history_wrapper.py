@@ -1,17 +1,28 @@
+import math
 from datetime import timedelta, datetime
+from pathlib import Path
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from labellines import labelLines
-from cycler import cycler
 
+from player_ranking.chart_renderer import ChartJob, ChartRenderer
+from player_ranking.history_archive import MatrixArchive
 from player_ranking.models.clan import Clan
 
 DATETIME_FORMAT = "%d.%m.%Y %H:%M:%S"
 
 
-def append_rating_history(rating_history_path: str, rating: pd.DataFrame):
-    now = datetime.utcnow()
-    rating.rename(now.strftime(DATETIME_FORMAT), inplace=True)
+def get_archive(rating_history_path: str) -> MatrixArchive:
+    """
+    Returns the memory mapped copy of the rating history that is kept next to the CSV file.
+    """
+    return MatrixArchive(Path(rating_history_path).with_suffix(".archive"))
+
+
+def append_rating_history(
+    rating_history_path: str, rating: pd.DataFrame, timestamp: datetime | None = None
+):
+    now = timestamp or datetime.utcnow()
+    rating = rating.rename(now.strftime(DATETIME_FORMAT))
     try:
         rating_history = pd.read_csv(rating_history_path, sep=";", index_col=0)
         rating_history = pd.concat([rating_history, rating], axis=1)
@@ -19,6 +30,52 @@ def append_rating_history(rating_history_path: str, rating: pd.DataFrame):
         rating_history = rating.to_frame()
     rating_history.to_csv(rating_history_path, sep=";", float_format="%.0f")
 
+    archive = get_archive(rating_history_path)
+    if archive.labels == rating_history.columns[:-1].tolist():
+        archive.append(rating.name, rating.round())
+    else:
+        # create the archive or catch up with changes made to the CSV file
+        archive.write(rating_history.round())
+
+
+def write_rating_history(
+    rating_history_path: str, ratings: pd.DataFrame, replace: bool = False
+) -> list[str]:
+    """
+    Merges the ratings of several runs (one column per run, labelled like append_rating_history
+    does) into the rating history with a single write. Existing runs are only overwritten if replace
+    is set. Returns the labels of the written runs.
+    """
+    try:
+        rating_history = pd.read_csv(rating_history_path, sep=";", index_col=0)
+    except FileNotFoundError:
+        rating_history = pd.DataFrame()
+    if not replace:
+        ratings = ratings.drop(columns=rating_history.columns.intersection(ratings.columns))
+    rating_history = pd.concat(
+        [
+            rating_history.drop(columns=rating_history.columns.intersection(ratings.columns)),
+            ratings,
+        ],
+        axis=1,
+    )
+    rating_history = rating_history[
+        sorted(rating_history.columns, key=lambda label: datetime.strptime(label, DATETIME_FORMAT))
+    ]
+    rating_history.to_csv(rating_history_path, sep=";", float_format="%.0f")
+    get_archive(rating_history_path).write(rating_history.round())
+    return ratings.columns.tolist()
+
+
+def read_rating_history(rating_history_path: str) -> pd.DataFrame:
+    """
+    Reads the rating history from its memory mapped archive, falling back to the CSV file.
+    """
+    archive = get_archive(rating_history_path)
+    if archive.exists():
+        return archive.to_frame()
+    return pd.read_csv(rating_history_path, sep=";", index_col=0)
+
 
 def filter_close_timestamps(rating_history: pd.DataFrame):
     columns_to_drop = []
@@ -29,31 +86,52 @@ def filter_close_timestamps(rating_history: pd.DataFrame):
     return rating_history
 
 
-def plot_rating_history(rating_history_path: str, clan: Clan, rating_history_image: str):
-    # Only plots current clan members
-    rating_history = pd.read_csv(rating_history_path, sep=";", index_col=0)
+def plot_rating_history(
+    rating_history_path: str,
+    clan: Clan,
+    rating_history_image: str,
+    renderer: ChartRenderer,
+    group_size: int | None = None,
+) -> list[Path]:
+    """
+    Plots the rating history of the current clan members.
+    Without a group size all members are drawn into a single chart, otherwise the members are split
+    into groups of similar rating with one chart each, e.g. one chart per player for a size of 1.
+    """
+    rating_history = read_rating_history(rating_history_path)
 
     rating_history.columns = pd.to_datetime(rating_history.columns, format=DATETIME_FORMAT)
     rating_history = filter_close_timestamps(rating_history)
     rating_history = rating_history.loc[clan.get_tags()]
-    rating_history.index = [clan.get(tag).name for tag in rating_history.index]
-    rating_history = rating_history.T
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    colormap = list(plt.cm.tab20.colors)
-    del colormap[4 - 1 :: 4]  # Delete every 4th color
-    prop_cycle = cycler(color=colormap) * cycler(linestyle=["-", ":", "--", "-."])
-    ax.set_prop_cycle(prop_cycle)
-    rating_history.plot(
-        ax=ax,
-        figsize=(16, 10),
-        legend=False,
-        title="Rating History",
-        xlabel="Time",
-        ylabel="Rating",
-    )
-    labelLines(ax.get_lines(), drop_label=True)
-    ax.legend()
-    fig.tight_layout()
-    fig.savefig(rating_history_image, dpi=150)
+    # best players first
+    rating_history = rating_history.sort_values(rating_history.columns[-1], ascending=False)
+
+    image = Path(rating_history_image)
+    if group_size is None:
+        groups = [(rating_history, "Rating History", image)]
+    elif group_size == 1:
+        groups = [
+            (
+                rating_history.loc[[tag]],
+                f"Rating History of {clan.get(tag).name}",
+                image.with_stem(f"{image.stem}-{tag.lstrip('#')}"),
+            )
+            for tag in rating_history.index
+        ]
+    else:
+        num_groups = math.ceil(len(rating_history) / group_size)
+        groups = [
+            (
+                rating_history.iloc[i * group_size : (i + 1) * group_size],
+                f"Rating History ({i + 1}/{num_groups})",
+                image.with_stem(f"{image.stem}-{i + 1}"),
+            )
+            for i in range(num_groups)
+        ]
+
+    jobs = []
+    for history, title, output_path in groups:
+        history = history.copy()
+        history.index = [clan.get(tag).name for tag in history.index]
+        jobs.append(ChartJob(title, output_path, history.T))
+    return renderer.render(jobs)
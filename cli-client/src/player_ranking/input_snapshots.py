@@ -0,0 +1,150 @@
+import gzip
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.state_files import atomic_path
+
+LOGGER = logging.getLogger(__name__)
+SNAPSHOT_DIRECTORY = "snapshots-{clan}"
+SNAPSHOT_SUFFIX = ".json.gz"
+FILE_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S"
+MEMBER_FIELDS = ["tag", "name", "role", "trophies", "level", "net_donations"]
+PLAYER_STAT_FIELDS = [
+    "current_season_league_number",
+    "previous_season_league_number",
+    "current_season_trophies",
+    "previous_season_trophies",
+]
+
+
+@dataclass
+class InputSnapshot:
+    """
+    The inputs of an evaluation as fetched from the CR API and Google Sheets.
+    """
+
+    timestamp: datetime
+    clan: Clan
+    current_war: pd.Series
+    war_log: pd.DataFrame
+    excuses: pd.DataFrame
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "members": [
+                {
+                    **{field: getattr(member, field) for field in MEMBER_FIELDS},
+                    "last_seen": member.last_seen.isoformat(),
+                    **{field: getattr(member, field) for field in PLAYER_STAT_FIELDS},
+                }
+                for member in self.clan.get_members()
+            ],
+            "current_war": {
+                "name": str(self.current_war.name),
+                "fame": {tag: int(fame) for tag, fame in self.current_war.items()},
+            },
+            "war_log": frame_to_dict(self.war_log),
+            "excuses": frame_to_dict(self.excuses),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InputSnapshot":
+        clan = Clan()
+        for raw in data["members"]:
+            member = ClanMember(
+                **{field: raw[field] for field in MEMBER_FIELDS},
+                last_seen=datetime.fromisoformat(raw["last_seen"]),
+            )
+            for field in PLAYER_STAT_FIELDS:
+                setattr(member, field, raw[field])
+            clan.add(member)
+        war_log = frame_from_dict(data["war_log"])
+        return cls(
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            clan=clan,
+            current_war=pd.Series(
+                data["current_war"]["fame"], name=data["current_war"]["name"], dtype=int
+            ),
+            war_log=war_log.astype(float),
+            excuses=frame_from_dict(data["excuses"]),
+        )
+
+
+def frame_to_dict(df: pd.DataFrame) -> dict:
+    # JSON cannot represent NaN, missing values become null
+    values = df.astype(object).where(df.notna(), None)
+    return {
+        "index_name": df.index.name,
+        "index": df.index.tolist(),
+        "columns": df.columns.tolist(),
+        "data": values.to_numpy().tolist(),
+    }
+
+
+def frame_from_dict(data: dict) -> pd.DataFrame:
+    values = np.array(data["data"], dtype=object).reshape(len(data["index"]), len(data["columns"]))
+    return pd.DataFrame(
+        values,
+        index=pd.Index(data["index"], name=data["index_name"], dtype=object),
+        columns=pd.Index(data["columns"], dtype=object),
+    )
+
+
+class InputSnapshotStore:
+    """
+    Archives the inputs of every evaluation in the state directory, one compressed file per run,
+    so that past rankings can be evaluated again, e.g. after changing the rating formula.
+    """
+
+    def __init__(self, state_directory: Path, clan_tag: str):
+        self.directory: Path = state_directory / SNAPSHOT_DIRECTORY.format(
+            clan=clan_tag.lstrip("#")
+        )
+
+    def get_path(self, timestamp: datetime) -> Path:
+        utc = timestamp.astimezone(timezone.utc)
+        return self.directory / f"{utc.strftime(FILE_TIMESTAMP_FORMAT)}{SNAPSHOT_SUFFIX}"
+
+    def save(self, snapshot: InputSnapshot) -> Path:
+        path = self.get_path(snapshot.timestamp)
+        with atomic_path(path) as tmp_path, gzip.open(tmp_path, "wt") as snapshot_file:
+            json.dump(snapshot.to_dict(), snapshot_file, separators=(",", ":"))
+        LOGGER.debug(f"Archived the inputs of the evaluation to {path}.")
+        return path
+
+    def get_timestamps(self) -> list[datetime]:
+        """
+        Returns the timestamps of all archived snapshots, oldest first.
+        """
+        if not self.directory.exists():
+            return []
+        return sorted(
+            datetime.strptime(path.name[: -len(SNAPSHOT_SUFFIX)], FILE_TIMESTAMP_FORMAT).replace(
+                tzinfo=timezone.utc
+            )
+            for path in self.directory.glob(f"*{SNAPSHOT_SUFFIX}")
+        )
+
+    def find(self, timestamp: datetime) -> datetime | None:
+        """
+        Returns the timestamp of the latest snapshot taken at or before the given timestamp.
+        """
+        earlier = [ts for ts in self.get_timestamps() if ts <= timestamp]
+        return earlier[-1] if earlier else None
+
+    def load(self, timestamp: datetime) -> InputSnapshot:
+        return load_snapshot(self.get_path(timestamp))
+
+
+def load_snapshot(path: Path) -> InputSnapshot:
+    with gzip.open(path, "rt") as snapshot_file:
+        return InputSnapshot.from_dict(json.load(snapshot_file))
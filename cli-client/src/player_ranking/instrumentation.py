@@ -0,0 +1,152 @@
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from player_ranking import metrics
+
+LOGGER = logging.getLogger(__name__)
+RUN_REPORT_FILE = "run-reports.jsonl"
+T = TypeVar("T")
+
+
+class RunReport:
+    """
+    Collects timed spans and HTTP call statistics of a single evaluation run.
+    """
+
+    def __init__(self, clan_tag: str | None = None) -> None:
+        self.clan_tag: str | None = clan_tag
+        self.started_at: datetime = datetime.now(timezone.utc)
+        self.status: str = "running"
+        self.duration: float | None = None
+        self.spans: list[dict[str, Any]] = []
+        self.http_calls: dict[str, dict[str, int | float]] = {}
+        # calls that were served by an identical call already in flight
+        self.coalesced_calls: dict[str, int] = {}
+        # calls that were served from the response cache
+        self.cached_calls: dict[str, int] = {}
+        self._start: float = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.spans.append(
+                    {"name": name, "offset": start - self._start, "duration": duration}
+                )
+            metrics.STAGE_DURATION.observe(duration, stage=name)
+            LOGGER.debug(f"Stage {name} took {duration:.3f}s")
+
+    def record_http(
+        self, endpoint: str, duration: float, num_bytes: int = 0, retries: int = 0
+    ) -> None:
+        with self._lock:
+            stats = self.http_calls.setdefault(
+                endpoint, {"count": 0, "duration": 0.0, "bytes": 0, "retries": 0}
+            )
+            stats["count"] += 1
+            stats["duration"] += duration
+            stats["bytes"] += num_bytes
+            stats["retries"] += retries
+        metrics.HTTP_REQUESTS.inc(endpoint=endpoint)
+        metrics.HTTP_REQUEST_DURATION.observe(duration, endpoint=endpoint)
+        metrics.HTTP_RESPONSE_BYTES.inc(num_bytes, endpoint=endpoint)
+        metrics.HTTP_RETRIES.inc(retries, endpoint=endpoint)
+
+    def record_coalesced(self, endpoint: str) -> None:
+        with self._lock:
+            self.coalesced_calls[endpoint] = self.coalesced_calls.get(endpoint, 0) + 1
+        metrics.HTTP_COALESCED_REQUESTS.inc(endpoint=endpoint)
+
+    def record_cached(self, endpoint: str) -> None:
+        with self._lock:
+            self.cached_calls[endpoint] = self.cached_calls.get(endpoint, 0) + 1
+        metrics.HTTP_CACHED_RESPONSES.inc(endpoint=endpoint)
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.duration = time.perf_counter() - self._start
+        metrics.EVALUATION_DURATION.observe(self.duration)
+        metrics.EVALUATIONS.inc(status=status)
+        LOGGER.info(f"Run finished with status '{status}' after {self.duration:.2f}s.")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "clanTag": self.clan_tag,
+            "startedAt": self.started_at.isoformat(),
+            "status": self.status,
+            "duration": self.duration,
+            "spans": self.spans,
+            "httpCalls": self.http_calls,
+            "coalescedCalls": self.coalesced_calls,
+            "cachedCalls": self.cached_calls,
+        }
+
+    def write(self, state_directory: Path) -> None:
+        """
+        Appends the report as a single JSON line so that consecutive runs can be graphed over time.
+        """
+        state_directory.mkdir(parents=True, exist_ok=True)
+        with open(state_directory / RUN_REPORT_FILE, "a") as report_file:
+            report_file.write(json.dumps(self.to_dict()) + "\n")
+
+
+# report of the run in progress in the current thread or task, HTTP clients record their calls
+# into it. Clans evaluated concurrently each record into their own report.
+_current_report: ContextVar[RunReport] = ContextVar("current_report", default=RunReport())
+
+
+def start_run(clan_tag: str) -> RunReport:
+    report = RunReport(clan_tag)
+    _current_report.set(report)
+    return report
+
+
+def get_current_report() -> RunReport:
+    return _current_report.get()
+
+
+def in_current_run(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wraps the function to record into the report of the calling thread wherever it is called,
+    e.g. by the workers of a thread pool, which do not inherit the context of the caller.
+    """
+    report = get_current_report()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs) -> T:
+        token = _current_report.set(report)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_report.reset(token)
+
+    return run
+
+
+def span(name: str):
+    return get_current_report().span(name)
+
+
+def record_http(endpoint: str, duration: float, num_bytes: int = 0, retries: int = 0) -> None:
+    get_current_report().record_http(endpoint, duration, num_bytes, retries)
+
+
+def record_coalesced(endpoint: str) -> None:
+    get_current_report().record_coalesced(endpoint)
+
+
+def record_cached(endpoint: str) -> None:
+    get_current_report().record_cached(endpoint)
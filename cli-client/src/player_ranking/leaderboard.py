@@ -0,0 +1,132 @@
+import heapq
+import threading
+from dataclasses import dataclass
+from itertools import islice
+
+import pandas as pd
+
+# ratings are weighted sums of metrics normalized to 0-1000, the order-statistics index resolves
+# them to RATING_RESOLUTION, players within the same step share a rank
+MAX_RATING = 1000
+RATING_RESOLUTION = 0.01
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    rating: float
+    tag: str
+    name: str
+    clan_tag: str
+
+
+class FenwickTree:
+    """
+    Binary indexed tree of counts supporting point updates and prefix sums in O(log n).
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self._tree: list[int] = [0] * (size + 1)
+
+    def add(self, position: int, delta: int) -> None:
+        i = position + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, position: int) -> int:
+        """
+        Returns the sum of the counts at positions 0 to position (inclusive).
+        """
+        total = 0
+        i = min(position + 1, self.size)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class Leaderboard:
+    """
+    Combined ranking of several clans. Each clan contributes a list of its players sorted by rating,
+    so replacing the results of one clan leaves the contributions of the other clans untouched.
+    Players are listed once: a player that moved is removed from the previous clan's list.
+
+    The lists of the clans are immutable and replaced as a whole, so a snapshot taken under the lock
+    stays consistent while it is merged outside of it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clans: dict[str, tuple[LeaderboardEntry, ...]] = {}
+        self._players: dict[str, LeaderboardEntry] = {}
+        self._buckets = FenwickTree(self.get_bucket(MAX_RATING) + 1)
+
+    @staticmethod
+    def get_bucket(rating: float) -> int:
+        return round(min(max(rating, 0), MAX_RATING) / RATING_RESOLUTION)
+
+    def update(self, clan_tag: str, rating: pd.DataFrame) -> None:
+        """
+        Replaces the players of the clan by the given rating (indexed by player tag).
+        Players without a rating are left out.
+        """
+        rated = rating[rating["rating"].notna()].sort_values("rating", ascending=False)
+        entries = tuple(
+            LeaderboardEntry(float(value), tag, name, clan_tag)
+            for tag, value, name in zip(rated.index, rated["rating"], rated["name"])
+        )
+        with self._lock:
+            self._remove(clan_tag)
+            moved: set[str] = set()
+            for entry in entries:
+                previous = self._players.get(entry.tag)
+                if previous is not None:
+                    # the player moved from another clan, only the latest evaluation counts
+                    moved.add(previous.clan_tag)
+                    self._buckets.add(self.get_bucket(previous.rating), -1)
+                self._players[entry.tag] = entry
+                self._buckets.add(self.get_bucket(entry.rating), 1)
+            for previous_clan in moved:
+                self._clans[previous_clan] = tuple(
+                    entry
+                    for entry in self._clans[previous_clan]
+                    if self._players[entry.tag].clan_tag == previous_clan
+                )
+            self._clans[clan_tag] = entries
+
+    def remove(self, clan_tag: str) -> None:
+        with self._lock:
+            self._remove(clan_tag)
+
+    def _remove(self, clan_tag: str) -> None:
+        for entry in self._clans.pop(clan_tag, []):
+            del self._players[entry.tag]
+            self._buckets.add(self.get_bucket(entry.rating), -1)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._players)
+
+    def get_top(self, k: int) -> list[LeaderboardEntry]:
+        """
+        Returns the k best players of all clans by merging the sorted lists of the clans.
+        """
+        with self._lock:
+            clan_entries = list(self._clans.values())
+        merged = heapq.merge(*clan_entries, key=lambda entry: -entry.rating)
+        return list(islice(merged, k))
+
+    def get_rank(self, tag: str) -> tuple[int, LeaderboardEntry] | None:
+        """
+        Returns the global rank of the player, i.e. one more than the number of better rated players.
+        """
+        with self._lock:
+            entry = self._players.get(tag)
+            if entry is None:
+                return None
+            bucket = self.get_bucket(entry.rating)
+            better = self._buckets.prefix_sum(self._buckets.size - 1) - self._buckets.prefix_sum(
+                bucket
+            )
+        return better + 1, entry
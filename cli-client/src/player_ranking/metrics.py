@@ -0,0 +1,192 @@
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from player_ranking.state_files import write_text
+
+LOGGER = logging.getLogger(__name__)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type_name: str = ""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return self._render_header(self.name)
+
+    def _render_header(self, name: str) -> list[str]:
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.type_name}"]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key: LabelValues = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> list[str]:
+        lines = self._render_header(f"{self.name}_total")
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}_total{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets: tuple[float, ...] = DURATION_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        # per label set: cumulative bucket counts, sum and count
+        self._values: dict[LabelValues, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key: LabelValues = tuple(sorted(labels.items()))
+        with self._lock:
+            bucket_counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[i] += 1
+            self._values[key] = (bucket_counts, total + value, count + 1)
+
+    def get_count(self, **labels: str) -> int:
+        values = self._values.get(tuple(sorted(labels.items())))
+        return values[2] if values else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, (bucket_counts, total, count) in self._values.items():
+                for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                    le = ("le", _format_value(upper_bound))
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {bucket_count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """
+        Writes the metrics in the Prometheus text format for the node exporter's textfile collector.
+        The file is replaced atomically so that the collector never reads a partially written file.
+        """
+        write_text(Path(path), self.render())
+
+    def serve(self, port: int, host: str = "") -> ThreadingHTTPServer:
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOGGER.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        LOGGER.info(f"Serving metrics on port {server.server_port} at /metrics.")
+        return server
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "player_ranking_http_request_duration_seconds",
+        "Duration of calls to the CR API and Google Sheets per endpoint including retries.",
+    )
+)
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("player_ranking_http_requests", "Number of calls to the CR API and Google Sheets.")
+)
+HTTP_RESPONSE_BYTES = REGISTRY.register(
+    Counter("player_ranking_http_response_bytes", "Size of the received response bodies.")
+)
+HTTP_RETRIES = REGISTRY.register(
+    Counter("player_ranking_http_retries", "Number of retried calls, e.g. by execute_with_retry.")
+)
+HTTP_COALESCED_REQUESTS = REGISTRY.register(
+    Counter(
+        "player_ranking_http_coalesced_requests",
+        "Number of calls that shared the response of an identical call already in flight.",
+    )
+)
+HTTP_CACHED_RESPONSES = REGISTRY.register(
+    Counter(
+        "player_ranking_http_cached_responses",
+        "Number of calls that were answered from the response cache of the polling schedule.",
+    )
+)
+STAGE_DURATION = REGISTRY.register(
+    Histogram("player_ranking_stage_duration_seconds", "Duration of the evaluation stages.")
+)
+EVALUATION_DURATION = REGISTRY.register(
+    Histogram("player_ranking_evaluation_duration_seconds", "Duration of complete evaluations.")
+)
+EVALUATIONS = REGISTRY.register(
+    Counter("player_ranking_evaluations", "Number of evaluations by their final status.")
+)
+MEMBERS_PROCESSED = REGISTRY.register(
+    Counter("player_ranking_members_processed", "Number of clan members that were evaluated.")
+)
@@ -1,6 +1,6 @@
 import math
 from dataclasses import dataclass, field, is_dataclass
-from typing import List
+from typing import List, get_args
 
 
 def nested_dataclass(*args, **kwargs):
@@ -13,6 +13,8 @@ def nested_dataclass(*args, **kwargs):
         def __init__(self, *args, **kwargs):
             for name, value in kwargs.items():
                 field_type = cls.__annotations__.get(name, None)
+                # unwrap optional fields, e.g. PromotionRequirements | None
+                field_type = next((t for t in get_args(field_type) if is_dataclass(t)), field_type)
                 if is_dataclass(field_type) and isinstance(value, dict):
                     new_obj = field_type(**value)
                     kwargs[name] = new_obj
@@ -80,3 +82,14 @@ class RankingParameters:
     ratingHistoryFile: str
     ratingHistoryImage: str
     ignoreWars: List[str] = field(default_factory=list)
+    stateDirectory: str = "state"
+    warHistoryWindow: int = 10
+    recordPresence: bool = False
+    ratingHistoryGroupSize: int | None = None
+    ingestBattleLogs: bool = False
+    archiveInputSnapshots: bool = False
+    ratingExportFormats: List[str] = field(default_factory=list)
+    summaryStatistics: List[str] = field(default_factory=lambda: ["mean", "p75", "p50", "p25"])
+    summaryFile: str | None = None
+    coLeaderPromotionRequirements: PromotionRequirements | None = None
+    demotionRequirements: PromotionRequirements | None = None
@@ -1,24 +1,82 @@
+import hashlib
+import logging
+import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 import jsonschema
 import yaml
 
+from player_ranking import rating_export
 from player_ranking.constants import ROOT_DIR
 from player_ranking.models.ranking_parameters import RankingParameters
 
+LOGGER = logging.getLogger(__name__)
 SCHEMA_FILE: Path = ROOT_DIR / "data" / "ranking_parameters_model.yaml"
 
 
-class RankingParameterValidator:
-    def __init__(self, ranking_parameters):
-        self.parameters = yaml.safe_load(ranking_parameters)
-        self.schema = yaml.safe_load(open(SCHEMA_FILE))
+@lru_cache(maxsize=1)
+def get_schema_validator() -> jsonschema.protocols.Validator:
+    """
+    Loads the schema and compiles a validator for it once per process.
+    """
+    with open(SCHEMA_FILE) as schema_file:
+        schema = yaml.safe_load(schema_file)
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
 
-    def validate(self) -> RankingParameters:
-        jsonschema.validate(self.parameters, self.schema)
-        parameters = RankingParameters(**self.parameters)
 
-        # rating weights must add up to 1
-        parameters.ratingWeights.check()
+def validate_parameters(parameters: Any) -> RankingParameters:
+    error = jsonschema.exceptions.best_match(get_schema_validator().iter_errors(parameters))
+    if error is not None:
+        raise error
+    ranking_parameters = RankingParameters(**parameters)
 
-        return parameters
+    # rating weights must add up to 1
+    ranking_parameters.ratingWeights.check()
+    # optional dependencies of the configured features must be installed
+    rating_export.check_export_formats(ranking_parameters.ratingExportFormats)
+
+    return ranking_parameters
+
+
+class RankingParameterLoader:
+    """
+    Loads the ranking parameters of one or more clans from a YAML file with one document per clan.
+
+    Validated parameters are cached by the hash of the file content and only reloaded once the file
+    changes, which makes repeated loads (e.g. before every evaluation in daemon mode) close to free.
+    The returned parameters are shared between calls and must not be modified.
+    """
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self._stat: tuple[int, int] | None = None
+        self._content_hash: str | None = None
+        self._parameters: list[RankingParameters] = []
+
+    def load(self) -> list[RankingParameters]:
+        stat = os.stat(self.path)
+        if self._stat == (stat.st_mtime_ns, stat.st_size):
+            return self._parameters
+
+        with open(self.path, "rb") as parameter_file:
+            content = parameter_file.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash != self._content_hash:
+            documents = [doc for doc in yaml.safe_load_all(content) if doc is not None]
+            if not documents:
+                # validate an empty file to get a meaningful error
+                documents = [None]
+            parameters = [validate_parameters(doc) for doc in documents]
+            clan_tags = [p.clanTag for p in parameters]
+            if len(set(clan_tags)) != len(clan_tags):
+                raise ValueError(f"Clans must not be configured more than once: {clan_tags}")
+            if self._content_hash is not None:
+                LOGGER.info(f"Reloaded ranking parameters from {self.path}.")
+            self._parameters = parameters
+            self._content_hash = content_hash
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        return self._parameters
@@ -1,99 +1,287 @@
 import logging
 import os
+from datetime import datetime, timezone
+from pathlib import Path
 
-from player_ranking import history_wrapper
+import pandas as pd
+import yaml
+from jsonschema import ValidationError
+
+from player_ranking import (
+    history_wrapper,
+    instrumentation,
+    metrics,
+    rating_export,
+    summary_statistics,
+)
+from player_ranking.battle_log import BattleLogStore
+from player_ranking.chart_renderer import ChartRenderer
 from player_ranking.constants import ROOT_DIR
 from player_ranking.cr_api_client import CRAPIClient
-from player_ranking.discord_client import DiscordClient
+from player_ranking.discord_client import DiscordClient, NotificationLedger
 from player_ranking.evaluation_performer import EvaluationPerformer
 from player_ranking.excuse_handler import ExcuseHandler
+from player_ranking.fingerprint import FingerprintStore, fingerprint_inputs
 from player_ranking.gsheets_api_client import GSheetsAPIClient
-from player_ranking.models.clan import Clan
-from player_ranking.models.clan_member import ClanMember
-from player_ranking.models.ranking_parameters import RankingParameters, PromotionRequirements
-from player_ranking.models.ranking_parameters_validation import RankingParameterValidator
+from player_ranking.history_archive import MatrixArchive
+from player_ranking.input_snapshots import InputSnapshot, InputSnapshotStore
+from player_ranking.polling import ResponseCache
+from player_ranking.presence import PresenceTracker, report_presence
+from player_ranking.promotion_engine import PromotionEngine, PromotionResults, get_rank_policies
+from player_ranking.rating_api import RatingStore
+from player_ranking.models.ranking_parameters import RankingParameters
+from player_ranking.models.ranking_parameters_validation import RankingParameterLoader
+from player_ranking.war_statistics import WarStatistics, WarStatisticsStore
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_pending_promotions(
-    clan: Clan, war_log, requirements: PromotionRequirements
-) -> list[ClanMember]:
-    war_log = war_log.copy()
-    war_log = war_log.drop("mean", axis=1)
-    min_fame = requirements.minFameForCountingWar
-    min_wars = requirements.minCountingWars
-
-    only_members = clan.filter(lambda member: member.role == "member")
-    promotion_deserving_logs = war_log[war_log >= min_fame].count(axis="columns")
-    promotion_deserving_logs = promotion_deserving_logs[promotion_deserving_logs >= min_wars]
-    promotion_deserving_logs = promotion_deserving_logs[
-        promotion_deserving_logs.index.isin(only_members.get_tags())
-    ]
-    pending_promotions = promotion_deserving_logs.index.map(lambda k: only_members.get(k)).to_list()
-    if pending_promotions:
-        LOGGER.info(f"Pending promotions for: {', '.join([p.name for p in pending_promotions])}")
-    else:
-        LOGGER.info("No promotions pending.")
-    return pending_promotions
-
-
-def perform_evaluation(plot: bool):
-    params: RankingParameters = RankingParameterValidator(
-        open(ROOT_DIR / "ranking_parameters.yaml")
-    ).validate()
+class ClanClients:
+    """
+    Holds the parameters of the configured clans and a CR API client per clan across runs.
+    """
+
+    def __init__(
+        self,
+        parameter_file: Path = ROOT_DIR / "ranking_parameters.yaml",
+        response_cache: ResponseCache | None = None,
+    ) -> None:
+        self.parameter_loader = RankingParameterLoader(parameter_file)
+        self.clan_params: list[RankingParameters] = []
+        self.cr_api_token: str = read_env_variable("CR_API_TOKEN")
+        # shared by the API clients of all clans, responses are only reused if it is set
+        self.response_cache: ResponseCache | None = response_cache
+        self._cr_api_clients: dict[str, CRAPIClient] = {}
+
+    def reload_params(self) -> list[RankingParameters]:
+        """
+        Picks up changes to the parameter file. An invalid file does not replace a valid configuration.
+        """
+        try:
+            self.clan_params = self.parameter_loader.load()
+        except (ValidationError, yaml.YAMLError, ValueError, OSError) as e:
+            LOGGER.error(f"Invalid ranking parameters, keeping the previous configuration: {e}")
+        return self.clan_params
+
+    def get_cr_api(self, clan_tag: str) -> CRAPIClient:
+        if clan_tag not in self._cr_api_clients:
+            self._cr_api_clients[clan_tag] = CRAPIClient(
+                self.cr_api_token, clan_tag, self.response_cache
+            )
+        return self._cr_api_clients[clan_tag]
+
+
+class EvaluationContext(ClanClients):
+    """
+    Holds the configuration and API clients of a process so that they can be reused across evaluations.
+    """
+
+    def __init__(
+        self,
+        parameter_file: Path = ROOT_DIR / "ranking_parameters.yaml",
+        response_cache: ResponseCache | None = None,
+    ) -> None:
+        super().__init__(parameter_file, response_cache)
+        # the first load fails on an invalid file, later reloads keep the previous configuration
+        self.clan_params = self.parameter_loader.load()
+
+        gsheets_spreadsheet_id: str = read_env_variable("GSHEET_SPREADSHEET_ID")
+        gsheets_service_account_key: str = read_env_variable("GSHEETS_SERVICE_ACCOUNT_KEY")
+        discord_webhook: str = read_env_variable("DISCORD_WEBHOOK")
+
+        self.gsheets_client = GSheetsAPIClient(
+            service_account_key=gsheets_service_account_key,
+            spreadsheet_id=gsheets_spreadsheet_id,
+        )
+        self.discord_client = DiscordClient(discord_webhook)
+        # latest results of all clans for the ranking API
+        self.rating_store = RatingStore()
+
+
+def perform_evaluation(plot: bool, context: EvaluationContext = None, force: bool = False):
+    if context is None:
+        context = EvaluationContext()
+
+    failed_clans = []
+    for clan_params in context.reload_params():
+        try:
+            evaluate_clan(clan_params, context, plot, force)
+        except Exception:
+            if len(context.clan_params) == 1:
+                raise
+            # do not let one clan prevent the evaluation of the others
+            LOGGER.exception(f"Evaluation of clan {clan_params.clanTag} failed.")
+            failed_clans.append(clan_params.clanTag)
+    if failed_clans:
+        raise RuntimeError(f"Evaluation failed for clans {failed_clans}.")
+
+
+def evaluate_clan(
+    params: RankingParameters, context: EvaluationContext, plot: bool, force: bool
+) -> None:
+    # the loaded parameters are shared across evaluations, stages must not modify them
+    report = instrumentation.start_run(params.clanTag)
+    status = "failed"
+    try:
+        status = run_pipeline(params, context, plot, force)
+    finally:
+        report.finish(status)
+        report.write(ROOT_DIR / params.stateDirectory)
 
-    cr_api_token: str = read_env_variable("CR_API_TOKEN")
-    gsheets_spreadsheet_id: str = read_env_variable("GSHEET_SPREADSHEET_ID")
-    gsheets_service_account_key: str = read_env_variable("GSHEETS_SERVICE_ACCOUNT_KEY")
-    discord_webhook: str = read_env_variable("DISCORD_WEBHOOK")
+
+def run_pipeline(
+    params: RankingParameters, context: EvaluationContext, plot: bool, force: bool
+) -> str:
+    cr_api: CRAPIClient = context.get_cr_api(params.clanTag)
+    gsheets_client: GSheetsAPIClient = context.gsheets_client
 
     LOGGER.info(f"Evaluating performance of players from {params.clanTag}...")
-    cr_api = CRAPIClient(cr_api_token, params.clanTag)
-    clan = cr_api.get_current_members()
-    war_log = cr_api.get_war_statistics(clan)
-    current_war = cr_api.get_current_river_race(war_log.columns[0])
-    cr_api.get_path_statistics(clan)
-
-    gsheets_client = GSheetsAPIClient(
-        service_account_key=gsheets_service_account_key,
-        spreadsheet_id=gsheets_spreadsheet_id,
-    )
-    excuses_df = gsheets_client.fetch_sheet(sheet_name=params.googleSheets.excuses)
-    excuses = ExcuseHandler(excuses=excuses_df, clan=clan, excuse_params=params.excuses)
-    excuses.update_excuses(current_war=current_war, war_log=war_log)
+    with instrumentation.span("fetch_members"):
+        clan = cr_api.get_current_members()
+    if params.recordPresence:
+        with instrumentation.span("record_presence"):
+            presence = PresenceTracker(ROOT_DIR / params.stateDirectory, params.clanTag)
+            presence.record(clan)
+            presence.save()
+    with instrumentation.span("fetch_war_log"):
+        war_log = cr_api.get_war_statistics(clan)
+    with instrumentation.span("archive_war_log"):
+        war_archive = MatrixArchive(
+            ROOT_DIR / params.stateDirectory / f"war-archive-{params.clanTag.lstrip('#')}"
+        )
+        # oldest war first, wars that are already archived are skipped
+        for war in reversed(war_log.columns):
+            war_archive.append(war, war_log[war])
+    with instrumentation.span("fetch_current_war"):
+        current_war = cr_api.get_current_river_race(war_log.columns[0])
+    with instrumentation.span("fetch_path_statistics"):
+        cr_api.get_path_statistics(clan)
+    if params.ingestBattleLogs:
+        with instrumentation.span("ingest_battle_logs"):
+            battle_logs = cr_api.get_battle_logs(clan.get_tags())
+            BattleLogStore(ROOT_DIR / params.stateDirectory, params.clanTag).ingest(battle_logs)
+    with instrumentation.span("fetch_excuses"):
+        excuses_df = gsheets_client.fetch_sheet(sheet_name=params.googleSheets.excuses)
+
+    now = datetime.now(timezone.utc)
+    fingerprint_store = FingerprintStore(ROOT_DIR / params.stateDirectory, params.clanTag)
+    fingerprint: str = fingerprint_inputs(clan, war_log, current_war, excuses_df, params, now)
+    if not force and not fingerprint_store.has_changed(fingerprint):
+        LOGGER.info("Skipping evaluation as nothing changed. Use --force to evaluate anyway.")
+        if not context.rating_store.is_published(params.clanTag):
+            # e.g. after a restart, serve the results of the last evaluation
+            context.rating_store.restore(
+                params.clanTag,
+                ROOT_DIR / params.stateDirectory,
+                history_wrapper.get_archive(ROOT_DIR / params.ratingHistoryFile).directory,
+            )
+        return "skipped"
 
-    performance = EvaluationPerformer(clan, current_war, war_log, params, excuses).evaluate()
+    if params.archiveInputSnapshots:
+        with instrumentation.span("archive_inputs"):
+            InputSnapshotStore(ROOT_DIR / params.stateDirectory, params.clanTag).save(
+                InputSnapshot(now, clan, current_war, war_log, excuses_df)
+            )
 
-    history_wrapper.append_rating_history(
-        ROOT_DIR / params.ratingHistoryFile, performance["rating"]
+    with instrumentation.span("update_excuses"):
+        excuses = ExcuseHandler(excuses=excuses_df, clan=clan, excuse_params=params.excuses)
+        excuses.update_excuses(current_war=current_war, war_log=war_log)
+
+    metrics.MEMBERS_PROCESSED.inc(len(clan))
+    promotion_engine = PromotionEngine(get_rank_policies(params))
+    war_statistics_store = WarStatisticsStore(ROOT_DIR / params.stateDirectory, params.clanTag)
+    war_statistics: WarStatistics = war_statistics_store.load(
+        params.warHistoryWindow, promotion_engine.thresholds
     )
+    with instrumentation.span("evaluate"):
+        performer = EvaluationPerformer(
+            clan,
+            current_war,
+            war_log,
+            params,
+            excuses,
+            war_statistics=war_statistics,
+            now=now,
+        )
+        performance = performer.evaluate()
+        war_statistics_store.save(war_statistics)
+
+    with instrumentation.span("append_rating_history"):
+        history_wrapper.append_rating_history(
+            ROOT_DIR / params.ratingHistoryFile, performance["rating"], now
+        )
     if plot:
-        history_wrapper.plot_rating_history(
-            ROOT_DIR / params.ratingHistoryFile, clan, ROOT_DIR / params.ratingHistoryImage
+        with instrumentation.span("plot_rating_history"):
+            history_wrapper.plot_rating_history(
+                ROOT_DIR / params.ratingHistoryFile,
+                clan,
+                ROOT_DIR / params.ratingHistoryImage,
+                ChartRenderer(ROOT_DIR / params.stateDirectory),
+                params.ratingHistoryGroupSize,
+            )
+    with instrumentation.span("promotions"):
+        promotions: PromotionResults = promotion_engine.evaluate(clan, war_statistics)
+        context.discord_client.dispatch(
+            params.clanTag, promotions, NotificationLedger(ROOT_DIR / params.stateDirectory)
         )
-    pending_promotions: list[ClanMember] = get_pending_promotions(
-        clan, war_log, params.promotionRequirements
-    )
-    if pending_promotions:
-        DiscordClient(discord_webhook).post_pending_promotions(
-            params.promotionRequirements, pending_promotions
+
+    performance["recommendation"] = promotions.to_series()
+    with instrumentation.span("summary_statistics"):
+        summary, breakdowns = summary_statistics.get_summary(
+            performance, clan, params.summaryStatistics
         )
+        if params.summaryFile:
+            summary_statistics.write_summary(
+                summary_statistics.to_dict(params.clanTag, summary, breakdowns),
+                ROOT_DIR / params.summaryFile,
+            )
 
-    performance = performance.reset_index(drop=True)
-    performance.index += 1
-    performance.loc["mean"] = performance.iloc[:, 1:-1].mean()
-    performance.loc["p75"] = performance.iloc[:, 1:-1].quantile(0.75)
-    performance.loc["p50"] = performance.iloc[:, 1:-1].quantile(0.50)
-    performance.loc["p25"] = performance.iloc[:, 1:-1].quantile(0.25)
-    performance.to_csv(ROOT_DIR / params.ratingFile, sep=";", float_format="%.0f")
+    with instrumentation.span("write_rating_file"):
+        ranking = performance
+        performance = performance.reset_index(drop=True)
+        performance.index += 1
+        performance = pd.concat([performance, summary])
+        performance.to_csv(ROOT_DIR / params.ratingFile, sep=";", float_format="%.0f")
+    if params.ratingExportFormats:
+        with instrumentation.span("export_rating"):
+            rating_export.export_rating(
+                ranking,
+                summary,
+                params.ratingExportFormats,
+                ROOT_DIR / params.ratingFile,
+                rating_export.get_run_metadata(
+                    params.clanTag, str(current_war.name), performer.inputs.weights
+                ),
+            )
     print(performance)
-
-    gsheets_client.write_sheet(df=performance, sheet_name=params.googleSheets.rating)
-    gsheets_client.write_sheet(
-        df=excuses.get_excuses_as_df(), sheet_name=params.googleSheets.excuses
+    context.rating_store.publish(
+        params.clanTag,
+        ranking,
+        promotions,
+        history_wrapper.get_archive(ROOT_DIR / params.ratingHistoryFile).directory,
+        (summary, breakdowns),
+        ROOT_DIR / params.stateDirectory,
     )
 
+    with instrumentation.span("write_sheets"):
+        gsheets_client.write_sheet(df=performance, sheet_name=params.googleSheets.rating)
+        gsheets_client.write_sheet(
+            df=excuses.get_excuses_as_df(), sheet_name=params.googleSheets.excuses
+        )
+    fingerprint_store.save(fingerprint)
+    return "evaluated"
+
+
+def perform_presence_report(weeks: int, inactive_hours: int) -> None:
+    cr_api_token: str = read_env_variable("CR_API_TOKEN")
+    for params in RankingParameterLoader(ROOT_DIR / "ranking_parameters.yaml").load():
+        clan = CRAPIClient(cr_api_token, params.clanTag).get_current_members()
+        presence = PresenceTracker(ROOT_DIR / params.stateDirectory, params.clanTag)
+        presence.record(clan)
+        presence.save()
+        print(f"Presence of the members of {params.clanTag}:")
+        report_presence(presence, clan, weeks, inactive_hours)
+
 
 def read_env_variable(env_var: str) -> str:
     var = os.getenv(env_var)
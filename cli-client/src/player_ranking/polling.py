@@ -0,0 +1,97 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from player_ranking.datetime_util import get_war_week, is_war_day
+
+LOGGER = logging.getLogger(__name__)
+# the API takes a while to reflect a new war or season, poll on every run until it settled
+SETTLE_TIME = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class PollingInterval:
+    war_days: timedelta
+    training_days: timedelta
+
+
+# endpoints without an interval are requested on every run
+DEFAULT_INTERVALS: dict[str, PollingInterval] = {
+    # fame only changes during the battle days
+    "/clans/{tag}/currentriverrace": PollingInterval(timedelta(0), timedelta(hours=12)),
+    # only gains an entry when a war ends
+    "/clans/{tag}/riverracelog": PollingInterval(timedelta(days=1), timedelta(days=1)),
+    # path of legends results, the previous season only changes at the season rollover
+    "/players/{tag}": PollingInterval(timedelta(hours=3), timedelta(hours=6)),
+}
+
+
+def get_last_phase_change(ts: datetime) -> datetime:
+    """
+    Returns the most recent start or end of the battle days before the timestamp. Seasons start
+    when the battle days end, so this is also the most recent start of a season.
+    """
+    week_start, battle_start, _ = get_war_week(ts)
+    return battle_start if ts >= battle_start else week_start
+
+
+def get_next_phase_change(ts: datetime) -> datetime:
+    """
+    Returns the next start or end of the battle days after the timestamp.
+    """
+    _, battle_start, week_end = get_war_week(ts)
+    return battle_start if ts < battle_start else week_end
+
+
+class PollingSchedule:
+    """
+    Derives how long responses of each endpoint stay valid from the clan war and season calendar.
+    Responses never outlive the war phase or season they were fetched in.
+    """
+
+    def __init__(self, intervals: dict[str, PollingInterval] | None = None) -> None:
+        self.intervals: dict[str, PollingInterval] = (
+            DEFAULT_INTERVALS if intervals is None else intervals
+        )
+
+    def get_interval(self, endpoint: str, ts: datetime) -> timedelta:
+        interval = self.intervals.get(endpoint)
+        if interval is None or ts - get_last_phase_change(ts) < SETTLE_TIME:
+            return timedelta(0)
+        return interval.war_days if is_war_day(ts) else interval.training_days
+
+    def is_fresh(self, endpoint: str, fetched_at: datetime, ts: datetime) -> bool:
+        return ts - fetched_at < self.get_interval(
+            endpoint, ts
+        ) and fetched_at >= get_last_phase_change(ts)
+
+
+class ResponseCache:
+    """
+    Keeps parsed API responses of all clans for as long as the polling schedule considers them fresh.
+    """
+
+    def __init__(self, schedule: PollingSchedule | None = None) -> None:
+        self.schedule: PollingSchedule = schedule if schedule is not None else PollingSchedule()
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[datetime, Any]] = {}
+
+    def get(self, endpoint: str, path: str, ts: datetime | None = None) -> Any | None:
+        ts = ts if ts is not None else datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+        fetched_at, response = entry
+        if not self.schedule.is_fresh(endpoint, fetched_at, ts):
+            return None
+        return response
+
+    def put(self, endpoint: str, path: str, response: Any, ts: datetime | None = None) -> None:
+        if endpoint not in self.schedule.intervals:
+            return
+        ts = ts if ts is not None else datetime.now(timezone.utc)
+        with self._lock:
+            self._entries[path] = (ts, response)
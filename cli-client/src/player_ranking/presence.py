@@ -0,0 +1,164 @@
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from player_ranking.models.clan import Clan
+from player_ranking.state_files import read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+PRESENCE_FILE = "presence-{clan}.json"
+SLOT = timedelta(hours=1)
+HOURS_PER_WEEK = 7 * 24
+
+
+def floor_to_slot(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+class PresenceTracker:
+    """
+    Records in which hours each player was online as a bitset per player.
+    Bit i is set if the player was seen online in the i-th hour after the epoch of the tracker,
+    so a year of data takes about a kilobyte per player.
+    """
+
+    def __init__(self, state_directory: Path, clan_tag: str):
+        self.path: Path = state_directory / PRESENCE_FILE.format(clan=clan_tag.lstrip("#"))
+        self.epoch: datetime | None
+        self.bitsets: dict[str, int]
+        self.epoch, self.bitsets = self.load()
+
+    def load(self) -> tuple[datetime | None, dict[str, int]]:
+        state = read_json(self.path, {})
+        if not state:
+            return None, {}
+        try:
+            epoch = datetime.fromisoformat(state["epoch"])
+            bitsets = {
+                tag: int.from_bytes(base64.b64decode(bits), "little")
+                for tag, bits in state["players"].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            LOGGER.warning(f"Could not read presence state from {self.path}, starting over: {e}")
+            return None, {}
+        return epoch, bitsets
+
+    def get_slot(self, ts: datetime) -> int:
+        return (floor_to_slot(ts) - self.epoch) // SLOT
+
+    def record(self, clan: Clan) -> None:
+        """
+        Marks the hour in which each member was last seen online.
+        """
+        for member in clan.get_members():
+            self.mark(member.tag, member.last_seen)
+
+    def mark(self, tag: str, ts: datetime) -> None:
+        if self.epoch is None:
+            self.epoch = floor_to_slot(ts)
+        slot = self.get_slot(ts)
+        if slot < 0:
+            # activity before the epoch is not tracked
+            return
+        self.bitsets[tag] = self.bitsets.get(tag, 0) | (1 << slot)
+
+    def get_active_hours(self, tag: str, start: datetime, end: datetime) -> int:
+        """
+        Returns the number of hours between start (inclusive) and end (exclusive) in which the player
+        was seen online.
+        """
+        if self.epoch is None:
+            return 0
+        start_slot = max(self.get_slot(start), 0)
+        end_slot = self.get_slot(end)
+        if end_slot <= start_slot:
+            return 0
+        window = (self.bitsets.get(tag, 0) >> start_slot) & ((1 << (end_slot - start_slot)) - 1)
+        return window.bit_count()
+
+    def get_active_hours_per_week(self, tag: str, now: datetime, weeks: int) -> list[int]:
+        """
+        Returns the active hours in each of the last weeks before now, the most recent week first.
+        """
+        end = floor_to_slot(now) + SLOT
+        return [
+            self.get_active_hours(
+                tag, end - (i + 1) * HOURS_PER_WEEK * SLOT, end - i * HOURS_PER_WEEK * SLOT
+            )
+            for i in range(weeks)
+        ]
+
+    def get_last_active(self, tag: str) -> datetime | None:
+        bits = self.bitsets.get(tag, 0)
+        if not bits:
+            return None
+        return self.epoch + (bits.bit_length() - 1) * SLOT
+
+    def get_inactive_players(self, tags: list[str], now: datetime, hours: int) -> dict[str, int]:
+        """
+        Returns the players that have not been online in the last hours with their hours of
+        inactivity. Players that were never seen count as inactive since the epoch.
+        """
+        if self.epoch is None:
+            return {}
+        now_slot = self.get_slot(now)
+        inactive = {}
+        for tag in tags:
+            # bit_length() - 1 is the slot of the most recent activity, -1 if never seen
+            inactive_hours = now_slot - (self.bitsets.get(tag, 0).bit_length() - 1)
+            if inactive_hours >= hours:
+                inactive[tag] = inactive_hours
+        return inactive
+
+    def merge(self, epoch: datetime | None, bitsets: dict[str, int]) -> None:
+        """
+        Adds the hours of other bitsets, e.g. the ones another process has saved in the meantime.
+        """
+        if epoch is None:
+            return
+        if self.epoch is None or epoch < self.epoch:
+            shift = (self.epoch - epoch) // SLOT if self.epoch is not None else 0
+            self.bitsets = {tag: bits << shift for tag, bits in self.bitsets.items()}
+            self.epoch = epoch
+        shift = (epoch - self.epoch) // SLOT
+        for tag, bits in bitsets.items():
+            self.bitsets[tag] = self.bitsets.get(tag, 0) | (bits << shift)
+
+    def save(self) -> None:
+        """
+        Saves the bitsets merged with the ones on disk, so that the hours recorded by other processes
+        (e.g. a sampler next to the evaluations) are kept.
+        """
+        if self.epoch is None:
+            return
+        self.merge(*self.load())
+        state = {
+            "epoch": self.epoch.isoformat(),
+            "players": {
+                tag: base64.b64encode(
+                    bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+                ).decode()
+                for tag, bits in self.bitsets.items()
+            },
+        }
+        write_text(self.path, json.dumps(state))
+
+
+def report_presence(
+    tracker: PresenceTracker, clan: Clan, weeks: int = 4, inactive_hours: int = 72
+) -> None:
+    now = datetime.now(timezone.utc)
+    rows = [
+        (member.name, member.tag, *tracker.get_active_hours_per_week(member.tag, now, weeks))
+        for member in clan.get_members()
+    ]
+    print(f"Active hours per week (most recent week first) over the last {weeks} weeks:")
+    for name, tag, *hours in sorted(rows, key=lambda row: row[2:], reverse=True):
+        print(f"{name:<20} {tag:<12} {' '.join(f'{h:>4}' for h in hours)}")
+
+    inactive = tracker.get_inactive_players(clan.get_tags(), now, inactive_hours)
+    print(f"Members that have not been online for {inactive_hours} hours or more:")
+    for tag, hours in sorted(inactive.items(), key=lambda item: item[1], reverse=True):
+        print(f"{clan.get(tag).name:<20} {tag:<12} {hours:>5}h")
@@ -0,0 +1,120 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.models.ranking_parameters import PromotionRequirements, RankingParameters
+from player_ranking.war_statistics import WarStatistics
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class RankPolicy:
+    name: str
+    # the role a player must currently have for the policy to apply
+    role: str
+    # the rank the player is recommended for, e.g. "Elder"
+    target_rank: str
+    requirements: PromotionRequirements
+    # demotion policies select the players that do NOT meet the requirements
+    demotion: bool = False
+
+
+def get_rank_policies(params: RankingParameters) -> list[RankPolicy]:
+    policies = [RankPolicy("elder", "member", "Elder", params.promotionRequirements)]
+    if params.coLeaderPromotionRequirements:
+        policies.append(
+            RankPolicy("coLeader", "elder", "Co-Leader", params.coLeaderPromotionRequirements)
+        )
+    if params.demotionRequirements:
+        policies.append(
+            RankPolicy("demotion", "elder", "Member", params.demotionRequirements, demotion=True)
+        )
+    return policies
+
+
+class PromotionResults:
+    """
+    Players selected by each rank policy, in the order of the policies.
+    """
+
+    def __init__(self, policies: list[RankPolicy], selected: dict[str, list[ClanMember]]):
+        self.policies: list[RankPolicy] = policies
+        self._selected: dict[str, list[ClanMember]] = selected
+
+    def get(self, policy_name: str) -> list[ClanMember]:
+        return self._selected.get(policy_name, [])
+
+    def non_empty(self) -> list[tuple[RankPolicy, list[ClanMember]]]:
+        return [(p, self._selected[p.name]) for p in self.policies if self._selected[p.name]]
+
+    def to_series(self) -> pd.Series:
+        """
+        Returns the recommended rank per player tag, e.g. to add it as a column to the rating table.
+        """
+        recommendations = {}
+        for policy, members in self.non_empty():
+            for member in members:
+                recommendations.setdefault(member.tag, policy.target_rank)
+        return pd.Series(recommendations, name="recommendation", dtype=object)
+
+    def __bool__(self) -> bool:
+        return bool(self.non_empty())
+
+
+class PromotionEngine:
+    """
+    Evaluates several rank policies based on the running war statistics of the players.
+    """
+
+    def __init__(self, policies: list[RankPolicy]):
+        self.policies: list[RankPolicy] = policies
+        self.thresholds: np.ndarray = np.unique(
+            [p.requirements.minFameForCountingWar for p in policies]
+        )
+
+    def evaluate(self, clan: Clan, war_statistics: WarStatistics) -> PromotionResults:
+        members: list[ClanMember] = clan.get_members()
+        roles = np.array([member.role for member in members])
+        counting_wars = self.count_wars_per_threshold(clan, war_statistics)
+
+        selected: dict[str, list[ClanMember]] = {}
+        for policy in self.policies:
+            threshold_index = np.searchsorted(
+                self.thresholds, policy.requirements.minFameForCountingWar
+            )
+            meets_requirements = counting_wars[:, threshold_index] >= (
+                policy.requirements.minCountingWars
+            )
+            if policy.demotion:
+                meets_requirements = ~meets_requirements
+            matches = np.flatnonzero((roles == policy.role) & meets_requirements)
+            selected[policy.name] = [members[i] for i in matches]
+            self.log_result(policy, selected[policy.name])
+        return PromotionResults(self.policies, selected)
+
+    def count_wars_per_threshold(self, clan: Clan, war_statistics: WarStatistics) -> np.ndarray:
+        """
+        Returns a matrix of shape (members, thresholds) with the number of wars in which each member
+        reached each fame threshold. Members without any logged war count 0 wars.
+        """
+        tracked = {threshold: i for i, threshold in enumerate(war_statistics.thresholds)}
+        missing = [t for t in self.thresholds if t not in tracked]
+        if missing:
+            raise ValueError(f"War statistics do not track the fame thresholds {missing}.")
+        columns = [tracked[threshold] for threshold in self.thresholds]
+        return war_statistics.get_counts(clan.get_tags())[:, columns]
+
+    @staticmethod
+    def log_result(policy: RankPolicy, members: list[ClanMember]) -> None:
+        action = "demotions" if policy.demotion else "promotions"
+        if members:
+            LOGGER.info(
+                f"Pending {action} to {policy.target_rank}: {', '.join([m.name for m in members])}"
+            )
+        else:
+            LOGGER.info(f"No {action} to {policy.target_rank} pending.")
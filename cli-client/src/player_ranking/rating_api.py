@@ -0,0 +1,352 @@
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from player_ranking import summary_statistics
+from player_ranking.history_archive import MatrixArchive
+from player_ranking.leaderboard import Leaderboard
+from player_ranking.promotion_engine import PromotionResults
+from player_ranking.state_files import atomic_path
+
+LOGGER = logging.getLogger(__name__)
+CONTENT_TYPES = {"json": "application/json", "csv": "text/csv; charset=utf-8"}
+# responses smaller than this are not worth compressing
+MIN_GZIP_SIZE = 512
+# number of players on the pre-rendered leaderboard of all clans
+LEADERBOARD_SIZE = 100
+PUBLISHED_FILE = "published-results-{clan}.json.gz"
+
+
+class Representation:
+    """
+    A response body with its ETag and gzip compressed variant, computed once when it is created.
+    """
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body: bytes = body
+        self.content_type: str = content_type
+        digest = hashlib.sha1(body).hexdigest()
+        self.etag: str = f'"{digest}"'
+        self.gzipped: bytes | None = (
+            gzip.compress(body, compresslevel=6) if len(body) >= MIN_GZIP_SIZE else None
+        )
+        # each encoding is a different representation and needs its own strong validator
+        self.gzip_etag: str = f'"{digest}-gzip"'
+
+    @classmethod
+    def from_json(cls, data) -> "Representation":
+        return cls(json.dumps(data, separators=(",", ":")).encode(), CONTENT_TYPES["json"])
+
+    @classmethod
+    def from_csv(cls, df: pd.DataFrame) -> "Representation":
+        return cls(df.to_csv(sep=";", index=False).encode(), CONTENT_TYPES["csv"])
+
+
+def matches_etag(if_none_match: str, etag: str) -> bool:
+    """
+    Evaluates an If-None-Match header, a list of entity tags or '*', using the weak comparison.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+
+def get_published_path(state_directory: Path, clan_tag: str) -> Path:
+    return state_directory / PUBLISHED_FILE.format(clan=clan_tag.lstrip("#"))
+
+
+class RatingStore:
+    """
+    Holds the latest evaluation results of all clans as ready to send responses.
+    Results are replaced as a whole after each evaluation, so readers never see a partial update.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # resource path without format -> format -> representation
+        self._resources: dict[str, dict[str, Representation]] = {}
+        self._history_archives: dict[str, Path] = {}
+        # per player history, built on first request after each evaluation
+        self._history_cache: dict[tuple[str, str, str], Representation] = {}
+        self.leaderboard = Leaderboard()
+
+    def publish(
+        self,
+        clan_tag: str,
+        rating: pd.DataFrame,
+        promotions: PromotionResults,
+        history_archive: Path,
+        summary: tuple[pd.DataFrame, dict[str, dict[str, pd.DataFrame]]] | None = None,
+        state_directory: Path | None = None,
+    ) -> None:
+        """
+        Publishes the rating (indexed by player tag, best player first), pending rank changes and
+        the summary statistics as returned by summary_statistics.get_summary.
+        If a state directory is given, the results are persisted there so that they can be restored
+        after a restart.
+        """
+        published = {
+            "clanTag": clan_tag,
+            "evaluatedAt": datetime.now(timezone.utc).isoformat(),
+            "ranking": json.loads(rating.reset_index().to_json(orient="split", index=False)),
+            "promotions": [
+                {
+                    "policy": policy.name,
+                    "target_rank": policy.target_rank,
+                    "demotion": policy.demotion,
+                    "tag": player.tag,
+                    "name": player.name,
+                }
+                for policy, players in promotions.non_empty()
+                for player in players
+            ],
+            "summary": None,
+        }
+        if summary is not None:
+            overall, breakdowns = summary
+            published["summary"] = {
+                "statistics": summary_statistics.to_dict(clan_tag, overall, breakdowns),
+                "table": json.loads(
+                    summary_statistics.to_frame(overall, breakdowns).to_json(
+                        orient="split", index=False
+                    )
+                ),
+            }
+        if state_directory is not None:
+            path = get_published_path(state_directory, clan_tag)
+            with atomic_path(path) as tmp_path, gzip.open(tmp_path, "wt") as published_file:
+                json.dump(published, published_file, separators=(",", ":"))
+        self._publish(published, history_archive)
+
+    def restore(self, clan_tag: str, state_directory: Path, history_archive: Path) -> bool:
+        """
+        Publishes the results persisted by the last evaluation of the clan, e.g. when the evaluation
+        is skipped after a restart as nothing changed. Returns whether results were found.
+        """
+        path = get_published_path(state_directory, clan_tag)
+        try:
+            with gzip.open(path, "rt") as published_file:
+                published = json.load(published_file)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            LOGGER.warning(f"Could not restore the published results from {path}: {e}")
+            return False
+        self._publish(published, history_archive)
+        LOGGER.info(f"Restored the results of {clan_tag} evaluated at {published['evaluatedAt']}.")
+        return True
+
+    def is_published(self, clan_tag: str) -> bool:
+        with self._lock:
+            return clan_tag.lstrip("#") in self._history_archives
+
+    def _publish(self, published: dict, history_archive: Path) -> None:
+        clan_tag: str = published["clanTag"]
+        clan = clan_tag.lstrip("#")
+        evaluated_at: str = published["evaluatedAt"]
+        rating = pd.DataFrame(
+            published["ranking"]["data"], columns=published["ranking"]["columns"]
+        ).set_index(published["ranking"]["columns"][0])
+        ranking = rating.reset_index()
+        ranking.insert(0, "rank", range(1, len(ranking) + 1))
+        ranking_json = {
+            "clanTag": clan_tag,
+            "evaluatedAt": evaluated_at,
+            "players": json.loads(ranking.to_json(orient="records")),
+        }
+
+        promotions_json = {
+            "clanTag": clan_tag,
+            "evaluatedAt": evaluated_at,
+            "promotions": published["promotions"],
+        }
+        promotions_df = pd.DataFrame(
+            published["promotions"], columns=["policy", "target_rank", "demotion", "tag", "name"]
+        )
+
+        resources = {
+            f"/clans/{clan}/ranking": {
+                "json": Representation.from_json(ranking_json),
+                "csv": Representation.from_csv(ranking),
+            },
+            f"/clans/{clan}/promotions": {
+                "json": Representation.from_json(promotions_json),
+                "csv": Representation.from_csv(promotions_df),
+            },
+        }
+        if published["summary"] is not None:
+            table = published["summary"]["table"]
+            resources[f"/clans/{clan}/summary"] = {
+                "json": Representation.from_json(
+                    {**published["summary"]["statistics"], "evaluatedAt": evaluated_at}
+                ),
+                "csv": Representation.from_csv(
+                    pd.DataFrame(table["data"], columns=table["columns"])
+                ),
+            }
+        self.leaderboard.update(clan_tag, rating)
+        leaderboard = self.render_leaderboard(LEADERBOARD_SIZE)
+        with self._lock:
+            self._resources = {
+                path: representations
+                for path, representations in self._resources.items()
+                if not path.startswith(f"/clans/{clan}/") and path != "/clans"
+            }
+            self._resources.update(resources)
+            self._resources["/leaderboard"] = leaderboard
+            self._history_archives[clan] = history_archive
+            self._history_cache = {k: v for k, v in self._history_cache.items() if k[0] != clan}
+            clans = sorted(self._history_archives)
+            self._resources["/clans"] = {
+                "json": Representation.from_json({"clans": [f"#{c}" for c in clans]}),
+                "csv": Representation.from_csv(
+                    pd.DataFrame({"clan_tag": [f"#{c}" for c in clans]})
+                ),
+            }
+
+    def render_leaderboard(self, limit: int) -> dict[str, Representation]:
+        entries = self.leaderboard.get_top(limit)
+        leaderboard = pd.DataFrame(
+            [entry.__dict__ for entry in entries], columns=["rating", "tag", "name", "clan_tag"]
+        )
+        leaderboard.insert(0, "rank", [self.leaderboard.get_rank(e.tag)[0] for e in entries])
+        return {
+            "json": Representation.from_json(
+                {
+                    "players": json.loads(leaderboard.to_json(orient="records")),
+                    "totalPlayers": len(self.leaderboard),
+                }
+            ),
+            "csv": Representation.from_csv(leaderboard),
+        }
+
+    def get(
+        self, path: str, response_format: str, limit: int | None = None
+    ) -> Representation | None:
+        if path == "/leaderboard" and limit is not None and limit != LEADERBOARD_SIZE:
+            return self.render_leaderboard(limit)[response_format]
+        with self._lock:
+            representations = self._resources.get(path)
+        if representations is not None:
+            return representations[response_format]
+
+        parts = path.strip("/").split("/")
+        # /players/{player}/rank
+        if len(parts) == 3 and parts[0] == "players" and parts[2] == "rank":
+            return self.get_rank(parts[1], response_format)
+        # /clans/{clan}/players/{player}/history
+        if (
+            len(parts) == 5
+            and parts[0] == "clans"
+            and parts[2] == "players"
+            and parts[4] == "history"
+        ):
+            return self.get_history(parts[1], parts[3], response_format)
+        return None
+
+    def get_rank(self, player: str, response_format: str) -> Representation | None:
+        result = self.leaderboard.get_rank(f"#{player}")
+        if result is None:
+            return None
+        rank, entry = result
+        rank_df = pd.DataFrame([{"rank": rank, **entry.__dict__}])
+        if response_format == "json":
+            return Representation.from_json(
+                {
+                    **json.loads(rank_df.to_json(orient="records"))[0],
+                    "totalPlayers": len(self.leaderboard),
+                }
+            )
+        return Representation.from_csv(rank_df)
+
+    def get_history(self, clan: str, player: str, response_format: str) -> Representation | None:
+        key = (clan, player, response_format)
+        with self._lock:
+            if key in self._history_cache:
+                return self._history_cache[key]
+            archive_path = self._history_archives.get(clan)
+        if archive_path is None:
+            return None
+        archive = MatrixArchive(archive_path)
+        tag = f"#{player}"
+        if tag not in archive.tags:
+            return None
+
+        history = archive.get_series(tag).dropna()
+        history_df = pd.DataFrame({"timestamp": history.index, "rating": history.to_numpy()})
+        if response_format == "json":
+            representation = Representation.from_json(
+                {"tag": tag, "history": json.loads(history_df.to_json(orient="records"))}
+            )
+        else:
+            representation = Representation.from_csv(history_df)
+        with self._lock:
+            self._history_cache[key] = representation
+        return representation
+
+    def serve(self, port: int, host: str = "") -> ThreadingHTTPServer:
+        store = self
+
+        class RatingHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path.rstrip("/")
+                response_format = "json"
+                if path.endswith(".csv"):
+                    path, response_format = path[: -len(".csv")], "csv"
+                query = parse_qs(url.query)
+                requested_format = query.get("format", [response_format])[0]
+                if requested_format not in CONTENT_TYPES:
+                    self.send_error(400, f"Unknown format {requested_format}")
+                    return
+                limit = query.get("limit", [None])[0]
+                if limit is not None and (not limit.isdigit() or int(limit) == 0):
+                    self.send_error(400, f"Invalid limit {limit}")
+                    return
+
+                representation = store.get(
+                    path, requested_format, int(limit) if limit is not None else None
+                )
+                if representation is None:
+                    self.send_error(404)
+                    return
+
+                use_gzip = representation.gzipped is not None and "gzip" in self.headers.get(
+                    "Accept-Encoding", ""
+                )
+                etag = representation.gzip_etag if use_gzip else representation.etag
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match is not None and matches_etag(if_none_match, etag):
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Vary", "Accept-Encoding")
+                    self.end_headers()
+                    return
+
+                body = representation.body
+                self.send_response(200)
+                self.send_header("Content-Type", representation.content_type)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+                if use_gzip:
+                    body = representation.gzipped
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOGGER.debug(f"API request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), RatingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        LOGGER.info(f"Serving the ranking API on port {server.server_port}.")
+        return server
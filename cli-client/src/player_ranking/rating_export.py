@@ -0,0 +1,137 @@
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from player_ranking.state_files import atomic_path
+
+LOGGER = logging.getLogger(__name__)
+SCHEMA_VERSION = "1"
+EXPORT_SUFFIXES = {"arrow": ".arrow", "parquet": ".parquet"}
+# metric columns of the rating table, summary rows hold their mean and percentiles
+METRIC_COLUMNS = [
+    "rating",
+    "ladder",
+    "current_war",
+    "war_history",
+    "avg_fame",
+    "current_season",
+    "previous_season",
+    "level",
+    "net_donations",
+]
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Exporting the rating requires pyarrow, install it with 'poetry install --extras export'."
+        ) from e
+    return pyarrow
+
+
+def check_export_formats(formats: list[str]) -> None:
+    """
+    Checks that pyarrow is installed if any export format is configured, so that a missing
+    dependency is reported when the parameters are validated instead of after an evaluation.
+    """
+    if not formats:
+        return
+    try:
+        import_pyarrow()
+    except ImportError as e:
+        raise ValueError(f"ratingExportFormats {formats} cannot be used: {e}") from e
+
+
+def get_rating_schema(pa, metadata: dict[str, str] | None = None):
+    """
+    Returns the schema of the exported rating table. Columns are only ever added to it.
+    """
+    return pa.schema(
+        [
+            pa.field("rank", pa.int32()),
+            pa.field("summary", pa.string()),
+            pa.field("tag", pa.string()),
+            pa.field("name", pa.string()),
+            *[pa.field(column, pa.float64()) for column in METRIC_COLUMNS],
+            pa.field("last_seen_days", pa.int32()),
+            pa.field("recommendation", pa.string()),
+        ],
+        metadata=metadata,
+    )
+
+
+def export_rating(
+    ranking: pd.DataFrame,
+    summary: pd.DataFrame,
+    formats: list[str],
+    rating_file: Path,
+    metadata: dict[str, str],
+) -> list[Path]:
+    """
+    Writes the rating table as written to the rating file in the given columnar formats next to the
+    rating file: the players (indexed by tag, best player first) ranked from 1, followed by the
+    summary rows (indexed by statistic).
+    """
+    if not formats:
+        return []
+    pa = import_pyarrow()
+
+    players = len(ranking)
+    summary_rows = [None] * len(summary)
+    rating = pd.concat([ranking, summary])
+    last_seen_days = pd.to_numeric(
+        ranking["last_seen"].str.split(" ").str[0], errors="coerce"
+    ).astype("Int32")
+    columns = {
+        "rank": pd.array(list(range(1, players + 1)) + summary_rows, "Int32"),
+        "summary": [None] * players + [str(label) for label in summary.index],
+        "tag": ranking.index.tolist() + summary_rows,
+        "name": ranking["name"].tolist() + summary_rows,
+        **{column: rating[column].astype(float) for column in METRIC_COLUMNS},
+        "last_seen_days": pd.array(last_seen_days.tolist() + summary_rows, "Int32"),
+        "recommendation": [
+            value if pd.notna(value) else None for value in ranking["recommendation"]
+        ]
+        + summary_rows,
+    }
+    metadata = {
+        "schema_version": SCHEMA_VERSION,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        **metadata,
+    }
+    schema = get_rating_schema(pa, metadata)
+    table = pa.Table.from_pydict(
+        {name: pa.array(values, type=schema.field(name).type) for name, values in columns.items()},
+        schema=schema,
+    )
+
+    paths = []
+    for export_format in formats:
+        path = Path(rating_file).with_suffix(EXPORT_SUFFIXES[export_format])
+        # consumers must never load a partially written file
+        with atomic_path(path) as tmp_path:
+            if export_format == "arrow":
+                with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(
+                    sink, schema
+                ) as writer:
+                    writer.write_table(table)
+            else:
+                pa.parquet.write_table(table, tmp_path)
+        LOGGER.info(f"Exported rating to {path}.")
+        paths.append(path)
+    return paths
+
+
+def get_run_metadata(clan_tag: str, war_id: str, rating_weights) -> dict[str, str]:
+    return {
+        "clan_tag": clan_tag,
+        "current_war": war_id,
+        "rating_weights": json.dumps(rating_weights.__dict__),
+    }
@@ -0,0 +1,49 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """
+    Yields a temporary path to write the content of the given path to. It replaces the given path
+    once the block completes, so readers never see a partially written file. The temporary name is
+    unique per process and thread, so concurrent writers do not interfere.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_text(path: Path, text: str) -> None:
+    with atomic_path(path) as tmp_path:
+        tmp_path.write_text(text)
+
+
+def read_json(path: Path, default: Any) -> Any:
+    """
+    Reads a JSON state file. If the file does not exist or cannot be read, the default is returned.
+    An unreadable file is logged, the state starts over and the file is replaced by the next write.
+    """
+    try:
+        state = json.loads(path.read_text())
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        LOGGER.warning(f"Could not read {path}, starting over: {e}")
+        return default
+    if default is not None and not isinstance(state, type(default)):
+        LOGGER.warning(f"Unexpected content in {path}, starting over.")
+        return default
+    return state
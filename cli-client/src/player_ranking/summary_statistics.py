@@ -0,0 +1,144 @@
+import json
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.models.clan import Clan
+from player_ranking.state_files import write_text
+
+LOGGER = logging.getLogger(__name__)
+# mean, count, min, max or a percentile such as p90
+STATISTIC_PATTERN = re.compile(r"^(mean|count|min|max|p(100|[1-9]?[0-9]))$")
+
+
+def compute_statistics(values: np.ndarray, statistics: list[str]) -> np.ndarray:
+    """
+    Computes the statistics of each column of the values, ignoring missing values.
+    All quantiles are read from a single sort, interpolating linearly like pandas.
+    Returns one row per statistic.
+    """
+    if not statistics:
+        return np.empty((0, values.shape[1]))
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    # missing values are sorted to the end
+    ordered = np.sort(values, axis=0) if len(values) else np.full((1, values.shape[1]), np.nan)
+    last = np.maximum(counts - 1, 0)
+
+    def quantile(q: float) -> np.ndarray:
+        position = q * last
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        low = np.take_along_axis(ordered, lower[np.newaxis], axis=0)[0]
+        high = np.take_along_axis(ordered, upper[np.newaxis], axis=0)[0]
+        return low + (high - low) * (position - lower)
+
+    rows = []
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for statistic in statistics:
+            if statistic == "count":
+                rows.append(counts.astype(float))
+                continue
+            if statistic == "mean":
+                row = np.nansum(values, axis=0) / counts
+            elif statistic == "min":
+                row = quantile(0)
+            elif statistic == "max":
+                row = quantile(1)
+            else:
+                row = quantile(int(statistic[1:]) / 100)
+            rows.append(np.where(counts > 0, row, np.nan))
+    return np.vstack(rows)
+
+
+def summarize(performance: pd.DataFrame, statistics: list[str]) -> pd.DataFrame:
+    """
+    Returns the statistics (rows) of all numeric columns of the performance table (columns).
+    """
+    numeric = performance.select_dtypes("number")
+    return pd.DataFrame(
+        compute_statistics(numeric.to_numpy(dtype=float), statistics),
+        index=pd.Index(statistics),
+        columns=numeric.columns,
+    )
+
+
+def summarize_groups(
+    performance: pd.DataFrame, groups: pd.Series, statistics: list[str]
+) -> dict[str, pd.DataFrame]:
+    """
+    Summarizes the players of each group separately. `groups` maps player tags to their group,
+    players without a group (e.g. no league yet) are summarized as "unknown".
+    """
+    keys = groups.reindex(performance.index, fill_value="unknown").map(
+        lambda group: "unknown" if pd.isna(group) else str(group)
+    )
+    return {
+        key: summarize(performance.iloc[positions], statistics)
+        for key, positions in sorted(performance.groupby(keys).indices.items())
+    }
+
+
+def get_member_groups(clan: Clan) -> dict[str, pd.Series]:
+    members = clan.get_members()
+    return {
+        "role": pd.Series({member.tag: member.role for member in members}, dtype=object),
+        "league": pd.Series(
+            {member.tag: member.current_season_league_number for member in members},
+            dtype=object,
+        ),
+    }
+
+
+def get_summary(
+    performance: pd.DataFrame, clan: Clan, statistics: list[str]
+) -> tuple[pd.DataFrame, dict[str, dict[str, pd.DataFrame]]]:
+    """
+    Returns the statistics of all players and their breakdowns by role and path of legends league.
+    """
+    overall = summarize(performance, statistics)
+    breakdowns = {
+        name: summarize_groups(performance, groups, statistics)
+        for name, groups in get_member_groups(clan).items()
+    }
+    return overall, breakdowns
+
+
+def to_frame(overall: pd.DataFrame, breakdowns: dict[str, dict[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Flattens the summary into one row per breakdown, group and statistic.
+    """
+    frames = [overall.rename_axis("statistic").reset_index().assign(breakdown="all", group="all")]
+    for name, groups in breakdowns.items():
+        for group, summary in groups.items():
+            frames.append(
+                summary.rename_axis("statistic").reset_index().assign(breakdown=name, group=group)
+            )
+    frame = pd.concat(frames, ignore_index=True)
+    first_columns = ["breakdown", "group", "statistic"]
+    return frame[first_columns + [c for c in frame.columns if c not in first_columns]]
+
+
+def to_dict(
+    clan_tag: str, overall: pd.DataFrame, breakdowns: dict[str, dict[str, pd.DataFrame]]
+) -> dict:
+    def records(summary: pd.DataFrame) -> dict:
+        # missing values become null
+        return json.loads(summary.to_json(orient="index"))
+
+    return {
+        "clanTag": clan_tag,
+        "statistics": overall.index.tolist(),
+        "overall": records(overall),
+        "breakdowns": {
+            name: {group: records(summary) for group, summary in groups.items()}
+            for name, groups in breakdowns.items()
+        },
+    }
+
+
+def write_summary(summary: dict, path: Path) -> None:
+    write_text(path, json.dumps(summary, indent=2))
+    LOGGER.info(f"Wrote summary statistics to {path}.")
@@ -0,0 +1,127 @@
+from typing import TextIO
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+WIDTH = 1600
+HEIGHT = 1000
+# space for the axes on the left/bottom and the line labels on the right
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 80, 180, 60, 70
+NUM_TICKS = 6
+# tab20 without every 4th color, combined with the line styles like the matplotlib charts
+COLORS = [
+    "#1f77b4", "#aec7e8", "#ff7f0e", "#2ca02c", "#98df8a", "#d62728", "#9467bd", "#c5b0d5",
+    "#8c564b", "#e377c2", "#f7b6d2", "#7f7f7f", "#bcbd22", "#dbdb8d", "#17becf",
+]  # fmt: skip
+DASH_ARRAYS = [None, "2,4", "10,6", "10,4,2,4"]
+
+
+def get_line_style(i: int) -> tuple[str, str | None]:
+    color_index, dash_index = divmod(i, len(DASH_ARRAYS))
+    return COLORS[color_index % len(COLORS)], DASH_ARRAYS[dash_index]
+
+
+class Scale:
+    def __init__(self, min_val: float, max_val: float, start: float, end: float):
+        if min_val == max_val:
+            min_val, max_val = min_val - 1, max_val + 1
+        self.min_val: float = min_val
+        self.max_val: float = max_val
+        self.start: float = start
+        self.end: float = end
+
+    def __call__(self, val):
+        return self.start + (val - self.min_val) / (self.max_val - self.min_val) * (
+            self.end - self.start
+        )
+
+    def ticks(self) -> np.ndarray:
+        return np.linspace(self.min_val, self.max_val, NUM_TICKS)
+
+
+def write_svg_chart(data: pd.DataFrame, title: str, out: TextIO) -> None:
+    """
+    Writes a line chart with one line per column of `data` (indexed by time) as SVG to `out`.
+    The document is written while iterating over the data, no figure is built in memory.
+    """
+    times = data.index.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    values = data.to_numpy(dtype=float)
+    has_values = not np.isnan(values).all()
+    x_scale = Scale(times.min(), times.max(), MARGIN_LEFT, WIDTH - MARGIN_RIGHT)
+    y_scale = Scale(
+        np.nanmin(values) if has_values else 0,
+        np.nanmax(values) if has_values else 1000,
+        HEIGHT - MARGIN_BOTTOM,
+        MARGIN_TOP,
+    )
+
+    out.write(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="sans-serif" font-size="12">\n'
+    )
+    out.write(f'<rect width="{WIDTH}" height="{HEIGHT}" fill="white"/>\n')
+    out.write(
+        f'<text x="{WIDTH / 2}" y="{MARGIN_TOP / 2}" text-anchor="middle" font-size="18">'
+        f"{escape(title)}</text>\n"
+    )
+    write_axes(out, x_scale, y_scale)
+
+    for i, column in enumerate(data.columns):
+        color, dash_array = get_line_style(i)
+        dash = f' stroke-dasharray="{dash_array}"' if dash_array else ""
+        out.write(f'<path fill="none" stroke="{color}" stroke-width="1.5"{dash} d="')
+        command = "M"
+        last_point = None
+        for t, val in zip(times, values[:, i]):
+            if np.isnan(val):
+                # start a new segment after gaps, e.g. while a player was not in the clan
+                command = "M"
+                continue
+            last_point = (x_scale(t), y_scale(val))
+            out.write(f"{command}{last_point[0]:.1f},{last_point[1]:.1f} ")
+            command = "L"
+        out.write('"/>\n')
+        if last_point is not None:
+            out.write(
+                f'<text x="{last_point[0] + 6:.1f}" y="{last_point[1] + 4:.1f}" fill="{color}">'
+                f"{escape(str(column))}</text>\n"
+            )
+    out.write("</svg>\n")
+
+
+def write_axes(out: TextIO, x_scale: Scale, y_scale: Scale) -> None:
+    left, right = MARGIN_LEFT, WIDTH - MARGIN_RIGHT
+    top, bottom = MARGIN_TOP, HEIGHT - MARGIN_BOTTOM
+    out.write(f'<g stroke="#cccccc"><line x1="{left}" y1="{top}" x2="{left}" y2="{bottom}"/>')
+    out.write(f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}"/></g>\n')
+    for tick in y_scale.ticks():
+        y = y_scale(tick)
+        out.write(
+            f'<line x1="{left}" y1="{y:.1f}" x2="{right}" y2="{y:.1f}" stroke="#eeeeee"/>'
+            f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end">{tick:.0f}</text>\n'
+        )
+    # show the time of day if ticks are less than a day apart
+    short_range = x_scale.max_val - x_scale.min_val < NUM_TICKS * 24 * 3600
+    label_format = "%d.%m. %H:%M" if short_range else "%d.%m.%Y"
+    for tick in x_scale.ticks():
+        x = x_scale(tick)
+        label = pd.Timestamp(int(tick), unit="s").strftime(label_format)
+        out.write(f'<text x="{x:.1f}" y="{bottom + 20}" text-anchor="middle">{label}</text>\n')
+    out.write(
+        f'<text x="{(left + right) / 2}" y="{HEIGHT - 20}" text-anchor="middle">Time</text>\n'
+        f'<text x="20" y="{(top + bottom) / 2}" text-anchor="middle" '
+        f'transform="rotate(-90 20 {(top + bottom) / 2})">Rating</text>\n'
+    )
+
+
+def write_html_chart(data: pd.DataFrame, title: str, out: TextIO) -> None:
+    """
+    Writes a self-contained HTML page embedding the SVG chart.
+    """
+    out.write(
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{escape(title)}</title>\n</head>\n<body>\n"
+    )
+    write_svg_chart(data, title, out)
+    out.write("</body>\n</html>\n")
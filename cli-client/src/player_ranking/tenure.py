@@ -0,0 +1,171 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.constants import ROOT_DIR
+from player_ranking.history_wrapper import DATETIME_FORMAT, get_archive
+from player_ranking.models.ranking_parameters_validation import RankingParameterLoader
+from player_ranking.state_files import read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+TENURE_FILE = "tenure-{clan}.json"
+
+
+def read_new_snapshots(rating_history_path: Path, after: pd.Timestamp | None) -> pd.DataFrame:
+    """
+    Reads the rating history snapshots taken after the given time. Older columns are not parsed.
+    """
+    archive = get_archive(rating_history_path)
+    if archive.exists():
+        header = pd.Index(archive.labels)
+    else:
+        header = pd.read_csv(rating_history_path, sep=";", index_col=0, nrows=0).columns
+    timestamps = pd.to_datetime(header, format=DATETIME_FORMAT)
+    is_new = timestamps > after if after is not None else np.ones(len(header), dtype=bool)
+
+    if archive.exists():
+        # snapshots are appended in chronological order
+        history = archive.to_frame(first_column=len(header) - int(is_new.sum()))
+    else:
+        history = pd.read_csv(
+            rating_history_path,
+            sep=";",
+            index_col=0,
+            usecols=[0, *(np.flatnonzero(is_new) + 1)],
+        )
+    history.columns = pd.to_datetime(history.columns, format=DATETIME_FORMAT)
+    return history.sort_index(axis=1)
+
+
+def compute_sightings(history: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the first and last snapshot in which each player has a rating.
+    Players without any rating are omitted.
+    """
+    present = history.notna().to_numpy()
+    seen = present.any(axis=1)
+    first = present.argmax(axis=1)
+    last = present.shape[1] - 1 - present[:, ::-1].argmax(axis=1)
+    return pd.DataFrame(
+        {
+            "first_sighting": history.columns[first[seen]],
+            "last_sighting": history.columns[last[seen]],
+        },
+        index=history.index[seen],
+    )
+
+
+class TenureTracker:
+    """
+    First and last sighting of every player in the rating history of a clan.
+    The results are persisted so that each update only processes the snapshots added since.
+    """
+
+    def __init__(self, state_directory: Path, clan_tag: str):
+        self.path: Path = state_directory / TENURE_FILE.format(clan=clan_tag.lstrip("#"))
+        self.last_snapshot: pd.Timestamp | None = None
+        self.sightings: pd.DataFrame = pd.DataFrame(
+            {"first_sighting": [], "last_sighting": []},
+            index=pd.Index([], name="tag"),
+            dtype="datetime64[ns]",
+        )
+        self.load()
+
+    def update(self, rating_history_path: Path) -> None:
+        new_snapshots = read_new_snapshots(rating_history_path, self.last_snapshot)
+        if new_snapshots.columns.empty:
+            LOGGER.info("No new rating history snapshots.")
+            return
+        LOGGER.info(f"Processing {len(new_snapshots.columns)} new rating history snapshots.")
+
+        new_sightings = compute_sightings(new_snapshots)
+        known = new_sightings.index.intersection(self.sightings.index)
+        # first sightings of known players stay, last sightings move forward
+        self.sightings.loc[known, "last_sighting"] = new_sightings.loc[known, "last_sighting"]
+        self.sightings = pd.concat([self.sightings, new_sightings.drop(known)]).rename_axis("tag")
+        self.last_snapshot = new_snapshots.columns[-1]
+
+    def get_current_members(self) -> pd.DataFrame:
+        """
+        Returns the sightings of all players that were part of the latest snapshot with their tenure.
+        """
+        current = self.sightings[self.sightings["last_sighting"] == self.last_snapshot].copy()
+        current["tenure_days"] = (current["last_sighting"] - current["first_sighting"]).dt.days
+        return current.sort_values("first_sighting")
+
+    def load(self) -> None:
+        state = read_json(self.path, {})
+        if not state:
+            return
+        try:
+            last_snapshot = pd.Timestamp(state["lastSnapshot"]) if state["lastSnapshot"] else None
+            players = state["players"]
+            sightings = pd.DataFrame(
+                {
+                    "first_sighting": pd.to_datetime([p[0] for p in players.values()]),
+                    "last_sighting": pd.to_datetime([p[1] for p in players.values()]),
+                },
+                index=pd.Index(list(players), name="tag"),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError, IndexError) as e:
+            # the sightings are rebuilt from the whole rating history
+            LOGGER.warning(f"Could not read tenure state from {self.path}, rebuilding it: {e}")
+            return
+        self.last_snapshot = last_snapshot
+        self.sightings = sightings
+
+    def save(self) -> None:
+        state = {
+            "lastSnapshot": self.last_snapshot.isoformat() if self.last_snapshot else None,
+            "players": {
+                tag: [first.isoformat(), last.isoformat()]
+                for tag, first, last in zip(
+                    self.sightings.index,
+                    self.sightings["first_sighting"],
+                    self.sightings["last_sighting"],
+                )
+            },
+        }
+        write_text(self.path, json.dumps(state, indent=2))
+
+
+def get_cohorts(first_sightings: pd.Series) -> pd.Series:
+    """
+    Counts the players by the month of their first sighting.
+    """
+    cohorts = first_sightings.dt.to_period("M").value_counts().sort_index()
+    return cohorts.rename("players").rename_axis("cohort")
+
+
+def get_summary(first_sightings: pd.Series) -> pd.Series:
+    return pd.Series(
+        {
+            "newest": first_sightings.max(),
+            "oldest": first_sightings.min(),
+            "mean": first_sightings.mean(),
+            "median": first_sightings.median(),
+        },
+        name="first_sighting",
+    )
+
+
+def report_tenure(rating_history_path: Path, state_directory: Path, clan_tag: str) -> None:
+    tracker = TenureTracker(state_directory, clan_tag)
+    tracker.update(rating_history_path)
+    tracker.save()
+
+    members = tracker.get_current_members()
+    print(f"Tenure of the members of {clan_tag}:")
+    print(members)
+    print(get_summary(members["first_sighting"]))
+    print(get_cohorts(members["first_sighting"]))
+
+
+def perform_tenure_report(parameter_file: Path = ROOT_DIR / "ranking_parameters.yaml") -> None:
+    for params in RankingParameterLoader(parameter_file).load():
+        report_tenure(
+            ROOT_DIR / params.ratingHistoryFile, ROOT_DIR / params.stateDirectory, params.clanTag
+        )
@@ -0,0 +1,182 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from player_ranking.state_files import read_json, write_text
+
+LOGGER = logging.getLogger(__name__)
+WAR_STATISTICS_FILE = "war-statistics-{clan}.json"
+
+
+def war_sort_key(war_id: str) -> tuple[int, int]:
+    season_id, section_index = war_id.split(".")
+    return int(season_id), int(section_index)
+
+
+class PlayerWarStatistics:
+    """
+    Running aggregate of the fame a player scored in the wars of the window.
+    Wars without fame (not participated or ignored) are kept as None and are not counted.
+    """
+
+    def __init__(self, num_thresholds: int) -> None:
+        self.fames: dict[str, float | None] = {}
+        self.sum: float = 0
+        self.count: int = 0
+        self.counts: list[int] = [0] * num_thresholds
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else np.nan
+
+    def add(self, fame: float | None, thresholds: list[float]) -> None:
+        self._apply(fame, thresholds, 1)
+
+    def remove(self, fame: float | None, thresholds: list[float]) -> None:
+        self._apply(fame, thresholds, -1)
+
+    def _apply(self, fame: float | None, thresholds: list[float], sign: int) -> None:
+        if fame is None:
+            return
+        self.sum += sign * fame
+        self.count += sign
+        for i, threshold in enumerate(thresholds):
+            if fame >= threshold:
+                self.counts[i] += sign
+
+
+class WarStatistics:
+    """
+    Per player aggregates over the last `window` river races (sum, count, number of wars above each
+    fame threshold and the fames themselves).
+
+    The aggregates are updated with the difference to the previous war log, i.e. only new wars,
+    wars leaving the window and fames changed by excuses are applied. Wars that drop out of the
+    API's river race log are kept as long as they are within the window.
+    """
+
+    def __init__(self, window: int = 10, thresholds: list[float] | None = None) -> None:
+        self.window: int = window
+        self.thresholds: list[float] = sorted(
+            {float(t) for t in (thresholds if thresholds is not None else [])}
+        )
+        # wars within the window, newest first
+        self.wars: list[str] = []
+        self.players: dict[str, PlayerWarStatistics] = {}
+
+    def update(self, war_log: pd.DataFrame) -> None:
+        """
+        Applies a (possibly excuse adjusted) war log. NaN marks wars that do not count for a player.
+        """
+        self.evict(set(self.wars) | set(war_log.columns))
+
+        # players that left the clan have to rejoin within the window of the river race log
+        for tag in set(self.players) - set(war_log.index):
+            del self.players[tag]
+
+        columns = [war for war in war_log.columns if war in self.wars]
+        fames = war_log[columns].to_numpy(dtype=float)
+        changed = 0
+        for tag, row in zip(war_log.index, fames):
+            player = self.players.setdefault(tag, PlayerWarStatistics(len(self.thresholds)))
+            for war, fame in zip(columns, row):
+                new_fame = None if np.isnan(fame) else float(fame)
+                if war in player.fames and player.fames[war] == new_fame:
+                    continue
+                player.remove(player.fames.get(war), self.thresholds)
+                player.add(new_fame, self.thresholds)
+                player.fames[war] = new_fame
+                changed += 1
+        LOGGER.info(f"Applied {changed} changed war results to the war statistics.")
+
+    def evict(self, wars: set[str]) -> None:
+        """
+        Keeps the newest wars that fit into the window and removes the fame of all older wars.
+        """
+        wars_in_window = sorted(wars, key=war_sort_key, reverse=True)[: self.window]
+        for war in set(self.wars) - set(wars_in_window):
+            LOGGER.debug(f"War {war} left the window of {self.window} wars.")
+            for player in self.players.values():
+                player.remove(player.fames.pop(war, None), self.thresholds)
+        self.wars = wars_in_window
+
+    def get_mean(self, tag: str) -> float | None:
+        """
+        Returns the average fame of a player or None if the player has not been in any logged war.
+        """
+        player = self.players.get(tag)
+        return player.mean if player is not None else None
+
+    def get_counts(self, tags: list[str]) -> np.ndarray:
+        """
+        Returns a matrix of shape (players, thresholds) with the number of wars in which each player
+        reached each fame threshold.
+        """
+        counts = np.zeros((len(tags), len(self.thresholds)), dtype=int)
+        for i, tag in enumerate(tags):
+            if tag in self.players:
+                counts[i] = self.players[tag].counts
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "window": self.window,
+            "thresholds": self.thresholds,
+            "wars": self.wars,
+            "players": {
+                tag: {
+                    "fames": player.fames,
+                    "sum": player.sum,
+                    "count": player.count,
+                    "counts": player.counts,
+                }
+                for tag, player in self.players.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(
+        cls, state: dict, window: int = 10, thresholds: list[float] | None = None
+    ) -> "WarStatistics":
+        statistics = cls(window, thresholds)
+        statistics.wars = state["wars"]
+        for tag, player_state in state["players"].items():
+            player = PlayerWarStatistics(len(statistics.thresholds))
+            player.fames = player_state["fames"]
+            player.sum = player_state["sum"]
+            player.count = player_state["count"]
+            player.counts = player_state["counts"]
+            statistics.players[tag] = player
+
+        if state["thresholds"] != statistics.thresholds:
+            LOGGER.info("Fame thresholds have changed, recounting wars from the stored fames.")
+            for player in statistics.players.values():
+                player.counts = [
+                    sum(1 for f in player.fames.values() if f is not None and f >= threshold)
+                    for threshold in statistics.thresholds
+                ]
+        # the window might have been reduced
+        statistics.evict(set(statistics.wars))
+        return statistics
+
+
+class WarStatisticsStore:
+    def __init__(self, state_directory: Path, clan_tag: str):
+        self.path: Path = state_directory / WAR_STATISTICS_FILE.format(clan=clan_tag.lstrip("#"))
+
+    def load(self, window: int, thresholds: list[float]) -> WarStatistics:
+        state = read_json(self.path, None)
+        if state is None:
+            return WarStatistics(window, thresholds)
+        try:
+            return WarStatistics.from_dict(state, window, thresholds)
+        except (KeyError, TypeError, AttributeError) as e:
+            # the statistics are rebuilt from the war log
+            LOGGER.warning(f"Could not read war statistics from {self.path}, rebuilding them: {e}")
+            return WarStatistics(window, thresholds)
+
+    def save(self, statistics: WarStatistics) -> None:
+        write_text(self.path, json.dumps(statistics.to_dict()))
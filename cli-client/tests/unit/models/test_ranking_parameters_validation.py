@@ -1,10 +1,14 @@
+import sys
 from typing import Any
 
 import pytest
 import yaml
 from jsonschema import ValidationError
 
-from player_ranking.models.ranking_parameters_validation import RankingParameterValidator
+from player_ranking.models.ranking_parameters_validation import (
+    RankingParameterLoader,
+    validate_parameters,
+)
 
 
 @pytest.fixture
@@ -44,26 +48,26 @@ def minimal_yaml_as_dict() -> dict[str, Any]:
 def test_validate_with_empty_string_fails():
     param_yaml = ""
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(param_yaml).validate()
+        validate_parameters(yaml.safe_load(param_yaml))
     assert "None is not of type 'object" in str(exc_info.value)
 
 
 def test_validate_with_invalid_yaml_fails():
     param_yaml = "missing_colon 1"
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(param_yaml).validate()
+        validate_parameters(yaml.safe_load(param_yaml))
     assert "'missing_colon 1' is not of type 'object'" in str(exc_info.value)
 
 
 def test_validate_with_unknown_property_fails():
     param_yaml = "unknown_prop: 1"
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(param_yaml).validate()
+        validate_parameters(yaml.safe_load(param_yaml))
     assert "'clanTag' is a required property" in str(exc_info.value)
 
 
 def test_validate_with_minimal_yaml_succeeds(minimal_yaml_as_dict):
-    actual = RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+    actual = validate_parameters(minimal_yaml_as_dict)
 
     assert actual.clanTag == minimal_yaml_as_dict["clanTag"]
 
@@ -98,19 +102,21 @@ def test_validate_with_minimal_yaml_succeeds(minimal_yaml_as_dict):
     assert actual.ratingHistoryFile == minimal_yaml_as_dict["ratingHistoryFile"]
     assert actual.ratingHistoryImage == minimal_yaml_as_dict["ratingHistoryImage"]
     assert actual.ignoreWars == minimal_yaml_as_dict["ignoreWars"]
+    assert actual.recordPresence is False
+    assert actual.stateDirectory == "state"
 
 
 def test_validate_with_invalid_clantag_fails(minimal_yaml_as_dict):
     minimal_yaml_as_dict["clanTag"] = "ABCDEF"
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "'ABCDEF' does not match '#[0-9A-Z]+'" in str(exc_info.value)
 
 
 def test_validate_with_invalid_rating_weights_fails(minimal_yaml_as_dict):
     minimal_yaml_as_dict["ratingWeights"]["unknownWeight"] = 1
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "Additional properties are not allowed ('unknownWeight' was unexpected)" in str(
         exc_info.value
     )
@@ -118,28 +124,109 @@ def test_validate_with_invalid_rating_weights_fails(minimal_yaml_as_dict):
 
     minimal_yaml_as_dict["ratingWeights"]["ladder"] = 0.9
     with pytest.raises(ValueError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "Sum of ratingWeights must be 1." in str(exc_info.value)
 
     minimal_yaml_as_dict["ratingWeights"]["ladder"] = -0.1
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "-0.1 is less than the minimum of 0" in str(exc_info.value)
 
     del minimal_yaml_as_dict["ratingWeights"]["ladder"]
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "'ladder' is a required property" in str(exc_info.value)
 
 
 def test_validate_with_special_wars_succeeds(minimal_yaml_as_dict):
     minimal_yaml_as_dict["ignoreWars"] = ["1.4", "11.0"]
-    actual = RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+    actual = validate_parameters(minimal_yaml_as_dict)
     assert actual.ignoreWars == ["1.4", "11.0"]
 
 
 def test_validate_with_invalid_special_wars_fails(minimal_yaml_as_dict):
     minimal_yaml_as_dict["ignoreWars"] = ["1.5"]
     with pytest.raises(ValidationError) as exc_info:
-        RankingParameterValidator(yaml.dump(minimal_yaml_as_dict)).validate()
+        validate_parameters(minimal_yaml_as_dict)
     assert "'1.5' does not match '[0-9]+\\\\.[0-4]'" in str(exc_info.value)
+
+
+def test_validate_with_optional_rank_requirements_succeeds(minimal_yaml_as_dict):
+    actual = validate_parameters(minimal_yaml_as_dict)
+    assert actual.coLeaderPromotionRequirements is None
+    assert actual.demotionRequirements is None
+
+    minimal_yaml_as_dict["coLeaderPromotionRequirements"] = {
+        "minFameForCountingWar": 3000,
+        "minCountingWars": 9,
+    }
+    minimal_yaml_as_dict["demotionRequirements"] = {
+        "minFameForCountingWar": 1000,
+        "minCountingWars": 5,
+    }
+    actual = validate_parameters(minimal_yaml_as_dict)
+    assert actual.coLeaderPromotionRequirements.minFameForCountingWar == 3000
+    assert actual.coLeaderPromotionRequirements.minCountingWars == 9
+    assert actual.demotionRequirements.minFameForCountingWar == 1000
+    assert actual.demotionRequirements.minCountingWars == 5
+
+
+def test_validate_with_invalid_rank_requirements_fails(minimal_yaml_as_dict):
+    minimal_yaml_as_dict["demotionRequirements"] = {"minFameForCountingWar": 1000}
+    with pytest.raises(ValidationError) as exc_info:
+        validate_parameters(minimal_yaml_as_dict)
+    assert "'minCountingWars' is a required property" in str(exc_info.value)
+
+
+def test_validate_export_formats_without_pyarrow_fails(minimal_yaml_as_dict, monkeypatch):
+    minimal_yaml_as_dict["ratingExportFormats"] = ["parquet"]
+    # importing a module that is set to None raises an ImportError
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ValueError) as exc_info:
+        validate_parameters(minimal_yaml_as_dict)
+    assert "poetry install --extras export" in str(exc_info.value)
+
+    minimal_yaml_as_dict["ratingExportFormats"] = []
+    validate_parameters(minimal_yaml_as_dict)
+
+
+def test_loader_with_multiple_clans_succeeds(minimal_yaml_as_dict, tmp_path):
+    other_clan = dict(minimal_yaml_as_dict, clanTag="#GHIJKL")
+    parameter_file = tmp_path / "ranking_parameters.yaml"
+    parameter_file.write_text(yaml.dump_all([minimal_yaml_as_dict, other_clan]))
+
+    actual = RankingParameterLoader(parameter_file).load()
+    assert [p.clanTag for p in actual] == ["#ABCDEF", "#GHIJKL"]
+
+
+def test_loader_with_duplicate_clans_fails(minimal_yaml_as_dict, tmp_path):
+    parameter_file = tmp_path / "ranking_parameters.yaml"
+    parameter_file.write_text(yaml.dump_all([minimal_yaml_as_dict, minimal_yaml_as_dict]))
+
+    with pytest.raises(ValueError) as exc_info:
+        RankingParameterLoader(parameter_file).load()
+    assert "Clans must not be configured more than once" in str(exc_info.value)
+
+
+def test_loader_with_empty_file_fails(tmp_path):
+    parameter_file = tmp_path / "ranking_parameters.yaml"
+    parameter_file.write_text("")
+
+    with pytest.raises(ValidationError) as exc_info:
+        RankingParameterLoader(parameter_file).load()
+    assert "None is not of type 'object" in str(exc_info.value)
+
+
+def test_loader_reloads_changed_file(minimal_yaml_as_dict, tmp_path):
+    parameter_file = tmp_path / "ranking_parameters.yaml"
+    parameter_file.write_text(yaml.dump(minimal_yaml_as_dict))
+    loader = RankingParameterLoader(parameter_file)
+
+    first = loader.load()
+    assert loader.load() is first
+
+    minimal_yaml_as_dict["newPlayerWarRating"] = 600
+    parameter_file.write_text(yaml.dump(minimal_yaml_as_dict) + "\n")
+    reloaded = loader.load()
+    assert reloaded is not first
+    assert reloaded[0].newPlayerWarRating == 600
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking import backfill, history_wrapper
+from player_ranking.evaluation_performer import EvaluationPerformer
+from player_ranking.excuse_handler import ExcuseHandler
+from player_ranking.input_snapshots import InputSnapshot, InputSnapshotStore
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.models.ranking_parameters import (
+    Excuses,
+    GoogleSheets,
+    PromotionRequirements,
+    RankingParameters,
+    RatingWeights,
+)
+
+# during the battle days of war 120.1
+SNAPSHOT_TIME = datetime(2025, 3, 21, 12, 30, 15, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def params() -> RankingParameters:
+    return RankingParameters(
+        clanTag="#ABC",
+        ratingWeights=RatingWeights(0.1, 0.3, 0.2, 0.1, 0.1, 0.1, 0.1),
+        newPlayerWarRating=500,
+        promotionRequirements=PromotionRequirements(2500, 2),
+        excuses=Excuses("not in clan", "new player", "excused"),
+        googleSheets=GoogleSheets("rating", "excuses"),
+        ratingFile="player-ranking.csv",
+        ratingHistoryFile="player-ranking-history.csv",
+        ratingHistoryImage="player-ranking-history.png",
+    )
+
+
+def get_snapshot(timestamp: datetime) -> InputSnapshot:
+    clan = Clan()
+    for i, trophies in enumerate([5000, 6000, 7000], start=1):
+        member = ClanMember(f"#{i}", f"player{i}", "member", trophies, 50 + i, 10 * i, timestamp)
+        member.current_season_league_number = 5 + i // 2
+        member.previous_season_league_number = 7
+        member.current_season_trophies = 100 * i
+        member.previous_season_trophies = 1000 * i
+        clan.add(member)
+    return InputSnapshot(
+        timestamp=timestamp,
+        clan=clan,
+        current_war=pd.Series({"#1": 800, "#2": 1600, "#3": 0, "#9": 300}, name="120.1"),
+        war_log=pd.DataFrame(
+            {"120.0": [2000.0, 3000.0, np.nan], "119.4": [1500.0, np.nan, 2500.0]},
+            index=["#1", "#2", "#3"],
+        ),
+        excuses=pd.DataFrame(),
+    )
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = InputSnapshotStore(tmp_path, "#ABC")
+    snapshot = get_snapshot(SNAPSHOT_TIME)
+    store.save(snapshot)
+    later = SNAPSHOT_TIME.replace(hour=14)
+    store.save(get_snapshot(later))
+
+    assert store.get_timestamps() == [SNAPSHOT_TIME.replace(second=15), later]
+    assert store.find(SNAPSHOT_TIME.replace(hour=13)) == SNAPSHOT_TIME
+    assert store.find(SNAPSHOT_TIME.replace(hour=11)) is None
+
+    loaded = store.load(SNAPSHOT_TIME)
+    assert loaded.timestamp == SNAPSHOT_TIME
+    assert loaded.clan.get("#2").__dict__ == snapshot.clan.get("#2").__dict__
+    pd.testing.assert_series_equal(loaded.current_war, snapshot.current_war)
+    pd.testing.assert_frame_equal(loaded.war_log, snapshot.war_log)
+
+
+def test_evaluate_snapshot_matches_evaluation(tmp_path, params: RankingParameters):
+    path = InputSnapshotStore(tmp_path, "#ABC").save(get_snapshot(SNAPSHOT_TIME))
+
+    snapshot = get_snapshot(SNAPSHOT_TIME)
+    excuses = ExcuseHandler(snapshot.excuses, snapshot.clan, params.excuses)
+    excuses.update_excuses(snapshot.current_war, snapshot.war_log)
+    expected = EvaluationPerformer(
+        snapshot.clan,
+        snapshot.current_war,
+        snapshot.war_log,
+        params,
+        excuses,
+        now=SNAPSHOT_TIME,
+    ).evaluate()["rating"]
+
+    pd.testing.assert_series_equal(backfill.evaluate_snapshot(params, path), expected)
+    # the configured weights are not modified by the evaluation
+    assert params.ratingWeights == RatingWeights(0.1, 0.3, 0.2, 0.1, 0.1, 0.1, 0.1)
+    # the same inputs evaluated later in the war weigh the current war higher
+    later = backfill.evaluate_snapshot(params, path, SNAPSHOT_TIME.replace(day=23))
+    assert not later.equals(expected)
+
+
+def test_backfill_writes_rating_history(tmp_path, params: RankingParameters):
+    store = InputSnapshotStore(tmp_path, "#ABC")
+    timestamps = [SNAPSHOT_TIME, SNAPSHOT_TIME.replace(day=22)]
+    for ts in timestamps:
+        store.save(get_snapshot(ts))
+    history_path = tmp_path / "history.csv"
+    history_wrapper.append_rating_history(
+        history_path, pd.Series({"#1": 1.0}, name="rating"), timestamps[0]
+    )
+
+    jobs = backfill.get_backfill_jobs(store)
+    assert [ts for _, ts in jobs] == timestamps
+    ratings = backfill.backfill(params, jobs, max_workers=2)
+    labels = ["21.03.2025 12:30:15", "22.03.2025 12:30:15"]
+    assert ratings.columns.tolist() == labels
+
+    # the existing run is kept
+    assert history_wrapper.write_rating_history(history_path, ratings) == labels[1:]
+    history = history_wrapper.read_rating_history(history_path)
+    assert history.columns.tolist() == labels
+    assert history.loc["#1", labels[0]] == 1
+
+    assert history_wrapper.write_rating_history(history_path, ratings, replace=True) == labels
+    history = history_wrapper.read_rating_history(history_path)
+    assert history.loc["#1", labels[0]] == round(ratings.loc["#1", labels[0]])
+
+
+def test_get_backfill_jobs_at_timestamps(tmp_path):
+    store = InputSnapshotStore(tmp_path, "#ABC")
+    store.save(get_snapshot(SNAPSHOT_TIME))
+    later = SNAPSHOT_TIME.replace(day=25)
+
+    jobs = backfill.get_backfill_jobs(
+        store, [SNAPSHOT_TIME.replace(day=20), later], max_age=timedelta(days=7)
+    )
+    assert jobs == [(store.get_path(SNAPSHOT_TIME), later)]
+    assert backfill.get_backfill_jobs(store, since=later) == []
+
+
+def test_get_backfill_jobs_skips_outdated_snapshots(tmp_path, caplog):
+    store = InputSnapshotStore(tmp_path, "#ABC")
+    store.save(get_snapshot(SNAPSHOT_TIME))
+    timestamps = [SNAPSHOT_TIME + timedelta(hours=23), SNAPSHOT_TIME + timedelta(days=4)]
+
+    assert backfill.get_backfill_jobs(store, timestamps) == [
+        (store.get_path(SNAPSHOT_TIME), timestamps[0])
+    ]
+    assert "25.03.2025 12:30:15" in caplog.text
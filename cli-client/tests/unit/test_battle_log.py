@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking.battle_log import BattleLogStore, frame_to_arrays
+
+
+def create_battle(battle_time: str, crowns: int = 1, trophy_change: int | None = None) -> dict:
+    team = {"tag": "#1", "crowns": crowns}
+    if trophy_change is not None:
+        team["trophyChange"] = trophy_change
+    return {
+        "type": "PvP",
+        "battleTime": battle_time,
+        "gameMode": {"id": 72000006, "name": "Ladder"},
+        "team": [team],
+        "opponent": [{"tag": "#9", "crowns": 0}],
+    }
+
+
+@pytest.fixture
+def battle_logs() -> dict[str, list[dict]]:
+    return {
+        # the API returns the newest battle first
+        "#1": [
+            create_battle("20260102T100000.000Z", 3, 30),
+            create_battle("20260101T100000.000Z"),
+        ],
+        "#2": [],
+    }
+
+
+def test_ingest_only_stores_new_battles(tmp_path, battle_logs: dict[str, list[dict]]):
+    store = BattleLogStore(tmp_path, "#ABC")
+    assert store.ingest(battle_logs) == 2
+    assert store.watermarks == {"#1": "20260102T100000.000Z"}
+
+    battle_logs["#1"].insert(0, create_battle("20260103T100000.000Z"))
+    battle_logs["#2"].append(create_battle("20260101T120000.000Z"))
+    store = BattleLogStore(tmp_path, "#ABC")
+    assert store.ingest(battle_logs) == 2
+    assert store.ingest(battle_logs) == 0
+    assert len(store.get_segments()) == 2
+
+    battles = store.load()
+    assert battles["tag"].tolist() == ["#1", "#1", "#1", "#2"]
+    assert battles["battle_time"].tolist() == [
+        np.datetime64("2026-01-02T10:00:00"),
+        np.datetime64("2026-01-01T10:00:00"),
+        np.datetime64("2026-01-03T10:00:00"),
+        np.datetime64("2026-01-01T12:00:00"),
+    ]
+    assert battles["crowns"].tolist() == [3, 1, 1, 1]
+    assert battles["trophy_change"].tolist() == [30, 0, 0, 0]
+    assert battles["game_mode"].tolist() == ["Ladder"] * 4
+
+
+def test_load_columns(tmp_path, battle_logs: dict[str, list[dict]]):
+    store = BattleLogStore(tmp_path, "#ABC")
+    assert store.load().empty
+    store.ingest(battle_logs)
+    assert store.load(["tag", "crowns"]).columns.tolist() == ["tag", "crowns"]
+
+
+def test_load_drops_duplicates(tmp_path, battle_logs: dict[str, list[dict]]):
+    store = BattleLogStore(tmp_path, "#ABC")
+    store.ingest(battle_logs)
+    # simulate a crash before the watermarks were written
+    store.watermarks = {}
+    store.ingest(battle_logs)
+    assert len(store.load()) == 2
+
+
+def test_ingest_compacts_segments(tmp_path, battle_logs: dict[str, list[dict]]):
+    store = BattleLogStore(tmp_path, "#ABC", max_segments=2)
+    store.ingest(battle_logs)
+    battle_logs["#2"].append(create_battle("20260101T120000.000Z"))
+    store.ingest(battle_logs)
+    assert [path.name for path in store.get_segments()] == [
+        "segment-000001.npz",
+        "segment-000002.npz",
+    ]
+    expected = store.load()
+
+    battle_logs["#1"].insert(0, create_battle("20260103T100000.000Z", 2, -20))
+    store.ingest(battle_logs)
+    assert [path.name for path in store.get_segments()] == ["segment-000004.npz"]
+    battles = store.load()
+    assert len(battles) == 4
+    pd.testing.assert_frame_equal(battles.iloc[:3], expected)
+    assert battles.iloc[3][["tag", "crowns", "trophy_change"]].tolist() == ["#1", 2, -20]
+    assert battles.dtypes.equals(expected.dtypes)
+
+    # new segments are appended after the compacted one
+    battle_logs["#2"].insert(0, create_battle("20260104T100000.000Z"))
+    store.ingest(battle_logs)
+    assert [path.name for path in store.get_segments()] == [
+        "segment-000004.npz",
+        "segment-000005.npz",
+    ]
+    assert len(store.load()) == 5
+
+
+def test_load_drops_duplicates_of_interrupted_compaction(
+    tmp_path, battle_logs: dict[str, list[dict]]
+):
+    store = BattleLogStore(tmp_path, "#ABC")
+    store.ingest(battle_logs)
+    # simulate a crash after the compacted segment was written
+    store.write_arrays(frame_to_arrays(store.load()))
+    assert len(store.get_segments()) == 2
+    assert len(store.load(["crowns"])) == 2
+
+
+def test_ingest_skips_malformed_battles(tmp_path, battle_logs: dict[str, list[dict]], caplog):
+    battle_logs["#2"] = [
+        {"type": "boatBattle", "battleTime": "20260101T130000.000Z", "team": []},
+        {"type": "PvP", "team": [{"tag": "#2"}], "opponent": [{"tag": "#9"}]},
+        create_battle("20260101T120000.000Z"),
+    ]
+    store = BattleLogStore(tmp_path, "#ABC")
+    assert store.ingest(battle_logs) == 3
+    assert store.watermarks["#2"] == "20260101T120000.000Z"
+    assert len([r for r in caplog.records if "malformed battle of #2" in r.message]) == 2
@@ -0,0 +1,105 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from player_ranking import chart_renderer, history_wrapper
+from player_ranking.chart_renderer import ChartJob, ChartRenderer
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+
+
+def create_job(tmp_path: Path, name: str, rating: int = 500) -> ChartJob:
+    data = pd.DataFrame(
+        {"player1": [400, rating], "player2": [300, 350]},
+        index=pd.to_datetime(["2026-01-01 10:00", "2026-01-02 10:00"]),
+    )
+    return ChartJob("Rating History", tmp_path / name, data)
+
+
+@pytest.fixture
+def rendered_jobs(monkeypatch) -> list[str]:
+    rendered = []
+
+    def render(job: ChartJob) -> Path:
+        rendered.append(job.output_path.name)
+        job.output_path.touch()
+        return job.output_path
+
+    monkeypatch.setattr(chart_renderer, "render_chart", render)
+    return rendered
+
+
+def test_render_skips_unchanged_charts(tmp_path, rendered_jobs: list[str]):
+    renderer = ChartRenderer(tmp_path / "state", max_workers=1)
+    renderer.render([create_job(tmp_path, "a.png"), create_job(tmp_path, "b.png")])
+    assert rendered_jobs == ["a.png", "b.png"]
+
+    rendered_jobs.clear()
+    renderer.render([create_job(tmp_path, "a.png"), create_job(tmp_path, "b.png", rating=600)])
+    assert rendered_jobs == ["b.png"]
+
+    # deleted charts are rendered again
+    rendered_jobs.clear()
+    (tmp_path / "a.png").unlink()
+    renderer.render([create_job(tmp_path, "a.png"), create_job(tmp_path, "b.png", rating=600)])
+    assert rendered_jobs == ["a.png"]
+
+
+def test_render_ignores_unreadable_fingerprints(tmp_path, rendered_jobs: list[str]):
+    renderer = ChartRenderer(tmp_path / "state", max_workers=1)
+    renderer.fingerprint_path.parent.mkdir()
+    renderer.fingerprint_path.write_text("{")
+    renderer.render([create_job(tmp_path, "a.png")])
+    assert rendered_jobs == ["a.png"]
+    assert str(tmp_path / "a.png") in renderer.load_fingerprints()
+
+
+def test_render_in_process_pool(tmp_path):
+    renderer = ChartRenderer(tmp_path, max_workers=2)
+    jobs = [create_job(tmp_path, "a.png"), create_job(tmp_path, "b.png")]
+    assert renderer.render(jobs) == [tmp_path / "a.png", tmp_path / "b.png"]
+    assert (tmp_path / "a.png").stat().st_size > 0
+    assert (tmp_path / "b.png").stat().st_size > 0
+
+
+@pytest.mark.parametrize(
+    "group_size, expected_charts",
+    [
+        (None, ["history.png"]),
+        (2, ["history-1.png", "history-2.png"]),
+        (1, ["history-2.png", "history-3.png", "history-1.png"]),
+    ],
+)
+def test_plot_rating_history_groups(
+    tmp_path, rendered_jobs: list[str], group_size: int | None, expected_charts: list[str]
+):
+    clan = Clan()
+    for i in range(1, 4):
+        clan.add(ClanMember(f"#{i}", f"player{i}", "member", 100, 50, 100, datetime(2026, 1, 1)))
+    history_path = tmp_path / "history.csv"
+    pd.DataFrame(
+        {
+            "01.01.2026 10:00:00": [100, 200, 300, 400],
+            "02.01.2026 10:00:00": [100, 300, 200, 400],
+        },
+        index=["#1", "#2", "#3", "#4"],
+    ).to_csv(history_path, sep=";")
+
+    history_wrapper.plot_rating_history(
+        history_path, clan, tmp_path / "history.png", ChartRenderer(tmp_path), group_size
+    )
+    assert rendered_jobs == expected_charts
+
+
+@pytest.mark.parametrize("suffix", [".svg", ".html"])
+def test_render_vector_chart_without_matplotlib(tmp_path, suffix: str):
+    job = create_job(tmp_path, f"chart{suffix}")
+    job.data.loc[job.data.index[0], "player2"] = float("nan")
+    ChartRenderer(tmp_path, max_workers=2).render([job])
+
+    content = (tmp_path / f"chart{suffix}").read_text()
+    assert content.count("<path ") == 2
+    assert ">player1</text>" in content
+    assert content.rstrip().endswith("</html>" if suffix == ".html" else "</svg>")
@@ -1,12 +1,18 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import pytest
 import requests
 from requests_mock.mocker import Mocker
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from player_ranking.cr_api_client import CRAPIClient, url_encode
+from player_ranking import instrumentation
+from player_ranking.cr_api_client import CRAPIClient, SingleFlight, url_encode
 from player_ranking.models.clan import Clan
 from player_ranking.models.clan_member import ClanMember
+from player_ranking.polling import PollingInterval, PollingSchedule, ResponseCache
 
 API_TOKEN: str = "1234567"
 CLAN_TAG: str = "#ABCDEF"
@@ -227,3 +233,80 @@ def test_get_current_members_fails(requests_mock: Mocker, cr_api_client: CRAPICl
     actual_headers = requests_mock.request_history[0].headers
     assert actual_headers["Accept"] == expected_headers["Accept"]
     assert actual_headers["authorization"] == expected_headers["authorization"]
+
+
+def test_get_battle_logs(requests_mock: Mocker, cr_api_client: CRAPIClient):
+    battles = [{"battleTime": "20260126T192338.000Z"}]
+    requests_mock.get("https://proxy.royaleapi.dev/v1/players/%231/battlelog", json=battles)
+    requests_mock.get("https://proxy.royaleapi.dev/v1/players/%232/battlelog", status_code=404)
+
+    battle_logs = cr_api_client.get_battle_logs(["#1", "#2"], max_workers=2)
+
+    assert battle_logs == {"#1": battles}
+    assert len(requests_mock.request_history) == 2
+
+
+def test_single_flight_shares_result_and_exception():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "/path", slow_call)
+        # give the follower time to join the call that is in flight
+        time.sleep(0.05)
+        follower = executor.submit(single_flight.do, "/path", slow_call)
+        time.sleep(0.05)
+        release.set()
+        assert leader.result() == ({"value": 1}, False)
+        assert follower.result() == ({"value": 1}, True)
+    assert len(calls) == 1
+
+    # finished calls are not cached
+    assert single_flight.do("/path", lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        single_flight.do("/path", lambda: int("x"))
+
+
+def test_concurrent_identical_requests_are_coalesced(requests_mock: Mocker):
+    release = threading.Event()
+
+    def respond(request, context):
+        release.wait(5)
+        return {"memberList": []}
+
+    mock = requests_mock.get(
+        "https://proxy.royaleapi.dev/v1/clans/%23ABCDEF", json=respond, status_code=200
+    )
+    report = instrumentation.start_run(CLAN_TAG)
+    clients = [CRAPIClient(API_TOKEN, CLAN_TAG), CRAPIClient(API_TOKEN, CLAN_TAG)]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(instrumentation.in_current_run(clients[0].get_current_members))
+        time.sleep(0.05)
+        second = executor.submit(instrumentation.in_current_run(clients[1].get_current_members))
+        time.sleep(0.05)
+        release.set()
+        assert len(first.result()) == len(second.result()) == 0
+
+    assert mock.call_count == 1
+    assert report.coalesced_calls == {"/clans/{tag}": 1}
+
+
+def test_responses_are_reused_from_cache(requests_mock: Mocker, monkeypatch):
+    monkeypatch.setattr("player_ranking.polling.SETTLE_TIME", timedelta(0))
+    day = timedelta(days=1)
+    cache = ResponseCache(PollingSchedule({"/clans/{tag}": PollingInterval(day, day)}))
+    mock = requests_mock.get(
+        "https://proxy.royaleapi.dev/v1/clans/%23ABCDEF", json={"memberList": []}, status_code=200
+    )
+    report = instrumentation.start_run(CLAN_TAG)
+
+    CRAPIClient(API_TOKEN, CLAN_TAG, cache).get_current_members()
+    CRAPIClient(API_TOKEN, CLAN_TAG, cache).get_current_members()
+    assert mock.call_count == 1
+    assert report.cached_calls == {"/clans/{tag}": 1}
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from player_ranking import daemon, metrics
+from player_ranking.daemon import Daemon, PresenceSampler, get_next_run
+
+
+def test_get_next_run_aligns_to_war_start():
+    # war started on Thursday 20.03.2025 at 10:00
+    timestamp = datetime(2025, 3, 20, 12, 34, tzinfo=timezone.utc)
+    expected = datetime(2025, 3, 20, 13, 0, tzinfo=timezone.utc)
+    assert get_next_run(timestamp, timedelta(hours=1)) == expected
+
+
+def test_get_next_run_on_slot_boundary():
+    timestamp = datetime(2025, 3, 20, 13, 0, tzinfo=timezone.utc)
+    expected = datetime(2025, 3, 20, 14, 0, tzinfo=timezone.utc)
+    assert get_next_run(timestamp, timedelta(hours=1)) == expected
+
+
+def test_get_next_run_aligns_to_war_end():
+    # battle days ended on Monday 24.03.2025 at 10:00
+    timestamp = datetime(2025, 3, 25, 12, 34, tzinfo=timezone.utc)
+    expected = datetime(2025, 3, 25, 16, 0, tzinfo=timezone.utc)
+    assert get_next_run(timestamp, timedelta(hours=5)) == expected
+
+
+def test_get_next_run_does_not_skip_war_end():
+    timestamp = datetime(2025, 3, 24, 1, 0, tzinfo=timezone.utc)
+    expected = datetime(2025, 3, 24, 10, 0, tzinfo=timezone.utc)
+    assert get_next_run(timestamp, timedelta(days=1)) == expected
+
+
+def test_get_next_run_does_not_skip_war_start():
+    timestamp = datetime(2025, 3, 27, 1, 0, tzinfo=timezone.utc)
+    expected = datetime(2025, 3, 27, 10, 0, tzinfo=timezone.utc)
+    assert get_next_run(timestamp, timedelta(days=1)) == expected
+
+
+def test_presence_sampler_keeps_parameters_of_invalid_file(monkeypatch, tmp_path):
+    monkeypatch.setenv("CR_API_TOKEN", "token")
+    sampler = PresenceSampler(timedelta(minutes=10))
+    params = [SimpleNamespace(clanTag="#ABC", stateDirectory=str(tmp_path))]
+    results = iter([params, ValueError("Sum of ratingWeights must be 1.")])
+
+    def load():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(sampler._clients.parameter_loader, "load", load)
+    assert sampler._clients.reload_params() == params
+    # the invalid file neither stops the sampling nor drops the configured clans
+    assert sampler._clients.reload_params() == params
+
+
+def test_daemon_shuts_down_servers_on_interrupt(monkeypatch):
+    servers = []
+
+    def serve(port: int) -> SimpleNamespace:
+        server = SimpleNamespace(port=port, stopped=False)
+        server.shutdown = lambda: setattr(server, "stopped", True)
+        servers.append(server)
+        return server
+
+    context = SimpleNamespace(rating_store=SimpleNamespace(serve=serve))
+    monkeypatch.setattr(daemon.player_ranking, "EvaluationContext", lambda response_cache: context)
+    monkeypatch.setattr(metrics.REGISTRY, "serve", serve)
+    instance = Daemon(plot=False, interval=timedelta(minutes=60), metrics_port=9000, api_port=8000)
+
+    def interrupt():
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(instance, "run_once", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        instance.run()
+    assert [(server.port, server.stopped) for server in servers] == [(9000, True), (8000, True)]
@@ -1,9 +1,18 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
 
 from player_ranking.datetime_util import (
+    WarCalendar,
+    get_war_week,
     get_season_start,
     get_season_end,
     get_time_since_last_clan_war_started,
+    is_war_day,
+    parse_timestamp,
+    parse_timestamps,
 )
 
 
@@ -79,3 +88,149 @@ def test_get_time_since_last_clan_war_started_1_minute_before_start():
     assert get_time_since_last_clan_war_started(timestamp) == timedelta(
         days=6, hours=23, minutes=59
     )
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("20260126T192338.123Z") == datetime(
+        2026, 1, 26, 19, 23, 38, 123000, tzinfo=timezone.utc
+    )
+    assert parse_timestamp("19691231T235959.000Z") == datetime(
+        1969, 12, 31, 23, 59, 59, tzinfo=timezone.utc
+    )
+
+
+def test_parse_timestamp_with_other_precision():
+    assert parse_timestamp("20260126T192338.123456Z") == datetime(
+        2026, 1, 26, 19, 23, 38, 123456, tzinfo=timezone.utc
+    )
+
+
+def test_parse_timestamp_with_invalid_timestamp_fails():
+    with pytest.raises(ValueError):
+        parse_timestamp("2026-01-26T19:23:38Z")
+    with pytest.raises(ValueError):
+        parse_timestamp("20261326T192338.000Z")
+
+
+def test_parse_timestamps():
+    timestamps = ["20260126T192338.123Z", "19691231T235959.000Z"]
+    expected = np.array(["2026-01-26T19:23:38.123", "1969-12-31T23:59:59.000"], "datetime64[ms]")
+    np.testing.assert_array_equal(parse_timestamps(timestamps), expected)
+    np.testing.assert_array_equal(parse_timestamps(pd.Series(timestamps)), expected)
+    np.testing.assert_array_equal(parse_timestamps(iter(timestamps)), expected)
+    for timestamp, parsed in zip(timestamps, parse_timestamps(timestamps)):
+        assert parse_timestamp(timestamp) == parsed.astype(datetime).replace(tzinfo=timezone.utc)
+
+
+def test_parse_timestamps_with_missing_values():
+    parsed = parse_timestamps(["20260126T192338.123Z", None])
+    assert parsed[0] == np.datetime64("2026-01-26T19:23:38.123")
+    assert np.isnat(parsed[1])
+
+
+def test_parse_timestamps_with_empty_input():
+    assert parse_timestamps([]).dtype == np.dtype("datetime64[ms]")
+    assert len(parse_timestamps([])) == 0
+
+
+@pytest.fixture
+def war_calendar() -> WarCalendar:
+    # season 100 starts on 03.03.2025 and lasts 5 weeks
+    return WarCalendar(100, datetime(2025, 3, 15, 12, 0), 2024, 2026)
+
+
+def test_war_calendar_matches_season_computation(war_calendar: WarCalendar):
+    timestamp = datetime(2024, 1, 1, 11, 0)
+    while timestamp < datetime(2026, 12, 1):
+        season_start = get_season_start(timestamp)
+        _, start, end = war_calendar.get_season(timestamp)
+        assert (start, end) == (season_start, get_season_end(season_start))
+        timestamp += timedelta(hours=17)
+
+
+def test_war_calendar_get_season(war_calendar: WarCalendar):
+    timestamp = datetime(2025, 4, 7, 9, 59, tzinfo=timezone.utc)
+    expected = (
+        100,
+        datetime(2025, 3, 3, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 4, 7, 10, 0, tzinfo=timezone.utc),
+    )
+    assert war_calendar.get_season(timestamp) == expected
+    assert war_calendar.get_season(timestamp + timedelta(minutes=1))[0] == 101
+
+
+def test_war_calendar_war_ids(war_calendar: WarCalendar):
+    timestamps = [
+        datetime(2025, 3, 3, 9, 59),
+        datetime(2025, 3, 3, 10, 0),
+        datetime(2025, 3, 20, 12, 0),
+        datetime(2025, 3, 31, 10, 0),
+        datetime(2025, 4, 7, 10, 0),
+    ]
+    expected = ["99.3", "100.0", "100.2", "100.4", "101.0"]
+    assert war_calendar.war_ids(timestamps).tolist() == expected
+    assert war_calendar.get_war_id(datetime(2025, 3, 20, 12, 0, tzinfo=timezone.utc)) == "100.2"
+
+
+def test_war_calendar_from_war_id():
+    timestamp = datetime(2025, 3, 20, 12, 0, tzinfo=timezone.utc)
+    war_calendar = WarCalendar.from_war_id("100.2", timestamp)
+    assert war_calendar.get_war_id(timestamp) == "100.2"
+    assert war_calendar.get_war_id(timestamp + timedelta(weeks=3)) == "101.0"
+
+
+def test_war_calendar_progress(war_calendar: WarCalendar):
+    timestamps = np.array(
+        ["2025-03-17T10:00", "2025-03-20T10:00", "2025-03-22T10:00", "2025-03-24T09:00"],
+        dtype="datetime64[s]",
+    )
+    np.testing.assert_allclose(
+        war_calendar.war_progress(timestamps), [0, 0, 0.5, 23 / 24 / 4 + 0.75]
+    )
+    np.testing.assert_allclose(war_calendar.season_progress(timestamps[:1]), [2 / 5])
+
+    annotated = war_calendar.annotate(timestamps)
+    assert annotated["season_id"].tolist() == [100] * 4
+    assert annotated["war_id"].tolist() == ["100.2", "100.2", "100.2", "100.2"]
+
+
+@pytest.mark.parametrize(
+    "ts",
+    [
+        datetime(2025, 3, 31, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 4, 3, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 4, 7, 9, 59, tzinfo=timezone.utc),
+    ],
+)
+def test_get_war_week(ts: datetime):
+    assert get_war_week(ts) == (
+        datetime(2025, 3, 31, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 4, 3, 10, 0, tzinfo=timezone.utc),
+        datetime(2025, 4, 7, 10, 0, tzinfo=timezone.utc),
+    )
+
+
+def test_get_war_week_matches_war_calendar():
+    # war weeks are the sections of the seasons, also across the turn of the year
+    timestamps = pd.date_range("2024-12-01", "2026-02-01", freq="17h")
+    week_starts = [get_war_week(ts.to_pydatetime())[0] for ts in timestamps]
+    calendar = WarCalendar(0, datetime(2025, 6, 15), 2024, 2026)
+    assert calendar.war_ids(week_starts).tolist() == calendar.war_ids(timestamps).tolist()
+
+
+@pytest.mark.parametrize(
+    "ts, expected",
+    [
+        (datetime(2025, 3, 20, 9, tzinfo=timezone.utc), False),
+        (datetime(2025, 3, 20, 12, tzinfo=timezone.utc), True),
+        (datetime(2025, 3, 24, 9, tzinfo=timezone.utc), True),
+        (datetime(2025, 3, 24, 11, tzinfo=timezone.utc), False),
+    ],
+)
+def test_is_war_day(ts: datetime, expected: bool):
+    assert is_war_day(ts) == expected
+
+
+def test_war_calendar_out_of_range_fails(war_calendar: WarCalendar):
+    with pytest.raises(ValueError):
+        war_calendar.get_war_id(datetime(2030, 1, 1))
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+from requests_mock.mocker import Mocker
+
+from player_ranking import discord_client
+from player_ranking.discord_client import DiscordClient, NotificationLedger
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.models.ranking_parameters import PromotionRequirements
+from player_ranking.promotion_engine import PromotionResults, RankPolicy
+
+WEBHOOK: str = "https://discord.com/api/webhooks/1/abc"
+CLAN_TAG: str = "#ABCDEF"
+
+ELDER = RankPolicy("elder", "member", "Elder", PromotionRequirements(2500, 8))
+DEMOTION = RankPolicy("demotion", "elder", "Member", PromotionRequirements(1000, 5), True)
+
+
+def create_member(tag: str) -> ClanMember:
+    return ClanMember(tag, f"player{tag[1:]}", "member", 100, 50, 100, datetime(2026, 1, 26))
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(discord_client.time, "sleep", lambda s: sleeps.append(s))
+    return sleeps
+
+
+@pytest.fixture
+def ledger(tmp_path) -> NotificationLedger:
+    return NotificationLedger(tmp_path)
+
+
+def test_dispatch_coalesces_policies(requests_mock: Mocker, ledger: NotificationLedger):
+    requests_mock.post(WEBHOOK, status_code=204)
+    results = PromotionResults(
+        [ELDER, DEMOTION], {"elder": [create_member("#1")], "demotion": [create_member("#2")]}
+    )
+
+    DiscordClient(WEBHOOK).dispatch(CLAN_TAG, results, ledger)
+
+    assert len(requests_mock.request_history) == 1
+    embeds = requests_mock.request_history[0].json()["embeds"]
+    assert [e["title"] for e in embeds] == ["🎖️ Promotion Announcement", "⚠️ Demotion Warning"]
+    assert embeds[0]["fields"][0]["value"] == "**player1** (#1)"
+    assert [e["fields"][1]["name"] for e in embeds] == [
+        "📋 Promotion Criteria",
+        "📋 Requirements to Keep the Rank",
+    ]
+
+
+def test_dispatch_posts_each_recommendation_once(
+    requests_mock: Mocker, ledger: NotificationLedger, tmp_path
+):
+    requests_mock.post(WEBHOOK, status_code=204)
+    client = DiscordClient(WEBHOOK)
+    client.dispatch(CLAN_TAG, PromotionResults([ELDER], {"elder": [create_member("#1")]}), ledger)
+    # a new process reads the ledger from disk
+    ledger = NotificationLedger(tmp_path)
+    client.dispatch(CLAN_TAG, PromotionResults([ELDER], {"elder": [create_member("#1")]}), ledger)
+    assert len(requests_mock.request_history) == 1
+
+    client.dispatch(
+        CLAN_TAG,
+        PromotionResults([ELDER], {"elder": [create_member("#1"), create_member("#2")]}),
+        ledger,
+    )
+    assert len(requests_mock.request_history) == 2
+    assert requests_mock.request_history[1].json()["embeds"][0]["fields"][0]["value"] == (
+        "**player2** (#2)"
+    )
+
+    # once a player is no longer pending, a later recommendation is posted again
+    client.dispatch(CLAN_TAG, PromotionResults([ELDER], {"elder": [create_member("#2")]}), ledger)
+    client.dispatch(CLAN_TAG, PromotionResults([ELDER], {"elder": [create_member("#1")]}), ledger)
+    assert len(requests_mock.request_history) == 3
+
+
+def test_unreadable_ledger_starts_empty(requests_mock: Mocker, tmp_path):
+    requests_mock.post(WEBHOOK, status_code=204)
+    (tmp_path / discord_client.LEDGER_FILE).write_text('{"#ABC:elder')
+    ledger = NotificationLedger(tmp_path)
+    DiscordClient(WEBHOOK).dispatch(
+        CLAN_TAG, PromotionResults([ELDER], {"elder": [create_member("#1")]}), ledger
+    )
+    assert len(requests_mock.request_history) == 1
+    assert NotificationLedger.key(CLAN_TAG, ELDER, create_member("#1")) in NotificationLedger(
+        tmp_path
+    )
+
+
+def test_post_retries_after_rate_limit(requests_mock: Mocker, no_sleep):
+    requests_mock.post(
+        WEBHOOK,
+        [
+            {"status_code": 429, "json": {"retry_after": 1.5}},
+            {"status_code": 204},
+        ],
+    )
+    DiscordClient(WEBHOOK).post({"content": "hello"})
+    assert len(requests_mock.request_history) == 2
+    assert no_sleep == [1.5]
+
+
+def test_post_fails_after_max_retries(requests_mock: Mocker):
+    requests_mock.post(WEBHOOK, status_code=429, json={"retry_after": 0.1})
+    with pytest.raises(Exception):
+        DiscordClient(WEBHOOK, max_retries=2).post({"content": "hello"})
+    assert len(requests_mock.request_history) == 3
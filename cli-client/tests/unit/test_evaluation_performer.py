@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from player_ranking.evaluation_performer import EvaluationPerformer
+from player_ranking.models.clan import Clan
+
+
+def test_ignore_selected_wars_returns_new_inputs():
+    current_war = pd.Series({"#1": 500, "#2": 800}, name="100.1")
+    war_log = pd.DataFrame({"100.0": [300, 400], "99.4": [1000, 2000]}, index=["#1", "#2"])
+    params = SimpleNamespace(ignoreWars=["99.4", "100.1"], warHistoryWindow=10)
+    performer = EvaluationPerformer(Clan(), current_war, war_log, params, excuses=None)
+
+    adjusted_war, adjusted_log = performer.ignore_selected_wars(current_war, war_log)
+    assert adjusted_war.tolist() == [0, 0]
+    assert adjusted_log["99.4"].isna().all()
+    assert adjusted_log["100.0"].tolist() == [300, 400]
+    # the inputs are left unchanged
+    assert current_war.tolist() == [500, 800]
+    assert war_log["99.4"].tolist() == [1000, 2000]
@@ -408,10 +408,14 @@ def test_adjust_fame_updates_only_excused_players_current_war():
         excuse_params=params,
     )
 
-    handler.adjust_fame_with_excuses(current_war, war_log, war_progress=1.0)
+    adjusted_war, adjusted_log = handler.adjust_fame_with_excuses(
+        current_war, war_log, war_progress=1.0
+    )
 
-    assert current_war["#1"] == 1600
-    assert current_war["#2"] == 800
+    assert adjusted_war["#1"] == 1600
+    assert adjusted_war["#2"] == 800
+    # nothing to adjust in the war log, it is passed on as is
+    assert adjusted_log is war_log
 
 
 def test_adjust_fame_updates_war_log_history():
@@ -438,10 +442,15 @@ def test_adjust_fame_updates_war_log_history():
         excuse_params=params,
     )
 
-    handler.adjust_fame_with_excuses(current_war, war_log, war_progress=1.0)
+    adjusted_war, adjusted_log = handler.adjust_fame_with_excuses(
+        current_war, war_log, war_progress=1.0
+    )
 
-    assert current_war["#1"] == 1600
-    assert war_log.loc["#1", "100.0"] == 1600
+    assert adjusted_war["#1"] == 1600
+    assert adjusted_log.loc["#1", "100.0"] == 1600
+    # the inputs are left unchanged
+    assert current_war["#1"] == 400
+    assert war_log.loc["#1", "100.0"] == 300
 
 
 def test_adjust_fame_player_not_in_war_log_is_ignored():
@@ -464,10 +473,12 @@ def test_adjust_fame_player_not_in_war_log_is_ignored():
         excuse_params=params,
     )
 
-    handler.adjust_fame_with_excuses(current_war, war_log, war_progress=0.5)
+    adjusted_war, adjusted_log = handler.adjust_fame_with_excuses(
+        current_war, war_log, war_progress=0.5
+    )
 
-    assert current_war["#1"] == int(1600 * 0.5)
-    assert war_log.empty
+    assert adjusted_war["#1"] == int(1600 * 0.5)
+    assert adjusted_log.empty
 
 
 def get_updated_excuses(
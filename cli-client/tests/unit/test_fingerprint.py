@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from player_ranking.fingerprint import FingerprintStore, fingerprint_inputs
+from player_ranking.models.ranking_parameters import (
+    Excuses,
+    GoogleSheets,
+    PromotionRequirements,
+    RankingParameters,
+    RatingWeights,
+)
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+
+
+def create_clan(last_seen: datetime, trophies: int = 100) -> Clan:
+    clan = Clan()
+    clan.add(ClanMember("#1", "player1", "member", trophies, 50, 100, last_seen))
+    return clan
+
+
+@pytest.fixture
+def war_log() -> pd.DataFrame:
+    return pd.DataFrame({"2.3": [400.0], "1.2": [100]}, index=["#1"])
+
+
+@pytest.fixture
+def current_war() -> pd.Series:
+    return pd.Series({"#1": 100}, name="2.4")
+
+
+@pytest.fixture
+def excuses() -> pd.DataFrame:
+    return pd.DataFrame({"name": ["player1"], "2.4": [""]}, index=["#1"])
+
+
+def test_fingerprint_ignores_time_of_last_seen(war_log, current_war, excuses):
+    morning = create_clan(datetime(2026, 1, 26, 8, tzinfo=timezone.utc))
+    evening = create_clan(datetime(2026, 1, 26, 20, tzinfo=timezone.utc))
+    assert fingerprint_inputs(morning, war_log, current_war, excuses) == fingerprint_inputs(
+        evening, war_log, current_war, excuses
+    )
+
+
+def test_fingerprint_detects_changes(war_log, current_war, excuses):
+    clan = create_clan(datetime(2026, 1, 26, tzinfo=timezone.utc))
+    original = fingerprint_inputs(clan, war_log, current_war, excuses)
+
+    other_clan = create_clan(datetime(2026, 1, 26, tzinfo=timezone.utc), trophies=101)
+    assert fingerprint_inputs(other_clan, war_log, current_war, excuses) != original
+
+    changed_war = current_war.copy()
+    changed_war["#1"] = 200
+    assert fingerprint_inputs(clan, war_log, changed_war, excuses) != original
+
+    changed_excuses = excuses.copy()
+    changed_excuses.loc["#1", "2.4"] = "excused"
+    assert fingerprint_inputs(clan, war_log, current_war, changed_excuses) != original
+
+
+def get_params(**changes) -> RankingParameters:
+    params = RankingParameters(
+        clanTag="#ABCDEF",
+        ratingWeights=RatingWeights(0.1, 0.3, 0.2, 0.1, 0.1, 0.1, 0.1),
+        newPlayerWarRating=500,
+        promotionRequirements=PromotionRequirements(2500, 2),
+        excuses=Excuses("not in clan", "new player", "excused"),
+        googleSheets=GoogleSheets("rating", "excuses"),
+        ratingFile="player-ranking.csv",
+        ratingHistoryFile="player-ranking-history.csv",
+        ratingHistoryImage="player-ranking-history.png",
+    )
+    for name, value in changes.items():
+        setattr(params, name, value)
+    return params
+
+
+def test_fingerprint_detects_parameter_changes(war_log, current_war, excuses):
+    clan = create_clan(datetime(2026, 1, 26, tzinfo=timezone.utc))
+    original = fingerprint_inputs(clan, war_log, current_war, excuses, get_params())
+    assert fingerprint_inputs(clan, war_log, current_war, excuses, get_params()) == original
+
+    changed_weights = get_params(ratingWeights=RatingWeights(0.2, 0.2, 0.2, 0.1, 0.1, 0.1, 0.1))
+    assert fingerprint_inputs(clan, war_log, current_war, excuses, changed_weights) != original
+    ignored_wars = get_params(ignoreWars=["2.3"])
+    assert fingerprint_inputs(clan, war_log, current_war, excuses, ignored_wars) != original
+    thresholds = get_params(promotionRequirements=PromotionRequirements(2000, 2))
+    assert fingerprint_inputs(clan, war_log, current_war, excuses, thresholds) != original
+
+
+def test_fingerprint_detects_day_and_war_phase(war_log, current_war, excuses):
+    clan = create_clan(datetime(2026, 1, 26, tzinfo=timezone.utc))
+
+    def fingerprint(now: datetime) -> str:
+        return fingerprint_inputs(clan, war_log, current_war, excuses, get_params(), now)
+
+    # Thursday 22.01.2026, the battle days start at 10:00
+    training = fingerprint(datetime(2026, 1, 22, 8, tzinfo=timezone.utc))
+    assert fingerprint(datetime(2026, 1, 22, 9, tzinfo=timezone.utc)) == training
+    battle = fingerprint(datetime(2026, 1, 22, 11, tzinfo=timezone.utc))
+    assert battle != training
+    assert fingerprint(datetime(2026, 1, 23, 11, tzinfo=timezone.utc)) != battle
+
+
+def test_fingerprint_store(tmp_path):
+    store = FingerprintStore(tmp_path / "state", "#ABCDEF")
+    assert store.load() is None
+    assert store.has_changed("abc")
+    store.save("abc")
+    assert not store.has_changed("abc")
+    assert store.has_changed("def")
+    assert not FingerprintStore(tmp_path / "state", "#ABCDEF").has_changed("abc")
+    assert FingerprintStore(tmp_path / "state", "#OTHER").has_changed("abc")
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking import history_archive, history_wrapper
+from player_ranking.history_archive import MatrixArchive
+
+
+@pytest.fixture
+def history() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"1.0": [100.0, 200.0], "1.1": [np.nan, 300.0]},
+        index=["#1", "#2"],
+    )
+
+
+def test_write_and_read(tmp_path, history: pd.DataFrame):
+    MatrixArchive(tmp_path).write(history)
+
+    archive = MatrixArchive(tmp_path)
+    assert archive.tags == ["#1", "#2"]
+    assert archive.labels == ["1.0", "1.1"]
+    pd.testing.assert_frame_equal(archive.to_frame(), history)
+    pd.testing.assert_frame_equal(
+        archive.to_frame(["#2"], first_column=1), history.loc[["#2"], ["1.1"]]
+    )
+    pd.testing.assert_series_equal(archive.get_series("#2"), history.loc["#2"])
+    assert isinstance(archive.get_values(), np.memmap)
+
+
+def test_append(tmp_path, history: pd.DataFrame):
+    archive = MatrixArchive(tmp_path)
+    assert archive.append("1.0", history["1.0"])
+    assert archive.append("1.1", history["1.1"])
+    assert not archive.append("1.1", history["1.1"])
+    # a new player joined, player 1 left
+    assert archive.append("1.2", pd.Series({"#2": 400.0, "#3": 500.0}))
+
+    expected = history.copy()
+    expected["1.2"] = [np.nan, 400.0]
+    expected.loc["#3"] = [np.nan, np.nan, 500.0]
+    pd.testing.assert_frame_equal(MatrixArchive(tmp_path).to_frame(), expected)
+
+
+def test_append_grows_archive(tmp_path, monkeypatch, history: pd.DataFrame):
+    monkeypatch.setattr(history_archive, "INITIAL_ROWS", 2)
+    monkeypatch.setattr(history_archive, "INITIAL_COLUMNS", 2)
+    archive = MatrixArchive(tmp_path)
+    archive.write(history)
+
+    archive.append("1.2", pd.Series({"#3": 500.0}))
+    assert np.load(archive.get_values_path(), mmap_mode="r").shape == (4, 4)
+    assert archive.to_frame().loc["#3", "1.2"] == 500.0
+    assert np.isnan(archive.to_frame().loc["#1", "1.2"])
+
+
+def test_unreadable_index_is_ignored(tmp_path, history: pd.DataFrame):
+    MatrixArchive(tmp_path).write(history)
+    (tmp_path / history_archive.INDEX_FILE).write_text('{"tags": ["#1"')
+    archive = MatrixArchive(tmp_path)
+    assert not archive.exists()
+
+    archive.write(history)
+    pd.testing.assert_frame_equal(MatrixArchive(tmp_path).to_frame(), history)
+
+
+def test_write_keeps_values_and_index_consistent(tmp_path, history: pd.DataFrame):
+    MatrixArchive(tmp_path).write(history)
+    reader = MatrixArchive(tmp_path)
+
+    # rewriting the archive in a different order does not affect a reader of the previous index
+    writer = MatrixArchive(tmp_path)
+    writer.write(history.iloc[::-1, ::-1] * 2)
+    pd.testing.assert_frame_equal(reader.to_frame(), history)
+    pd.testing.assert_frame_equal(MatrixArchive(tmp_path).to_frame(), history.iloc[::-1, ::-1] * 2)
+
+    # only the current and the previous generation of values are kept
+    writer.write(history)
+    assert sorted(path.name for path in tmp_path.glob("*.npy")) == [
+        "values-000002.npy",
+        "values-000003.npy",
+    ]
+
+
+def test_read_archive_without_versioned_values(tmp_path, history: pd.DataFrame):
+    archive = MatrixArchive(tmp_path)
+    archive.write(history)
+    archive.get_values_path().rename(tmp_path / "values.npy")
+    (tmp_path / "index.json").write_text('{"tags": ["#1", "#2"], "labels": ["1.0", "1.1"]}')
+
+    archive = MatrixArchive(tmp_path)
+    pd.testing.assert_frame_equal(archive.to_frame(), history)
+    archive.write(history * 2)
+    assert sorted(path.name for path in tmp_path.glob("*.npy")) == [
+        "values-000001.npy",
+        "values.npy",
+    ]
+    pd.testing.assert_frame_equal(MatrixArchive(tmp_path).to_frame(), history * 2)
+
+
+def test_append_rating_history_keeps_archive_in_sync(tmp_path, monkeypatch):
+    timestamps = iter([datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 11)])
+
+    class FakeDatetime:
+        @staticmethod
+        def utcnow() -> datetime:
+            return next(timestamps)
+
+    monkeypatch.setattr(history_wrapper, "datetime", FakeDatetime)
+    history_path = tmp_path / "history.csv"
+    history_wrapper.append_rating_history(history_path, pd.Series({"#1": 100.4}, name="rating"))
+    history_wrapper.append_rating_history(
+        history_path, pd.Series({"#1": 200.0, "#2": 300.0}, name="rating")
+    )
+
+    csv = pd.read_csv(history_path, sep=";", index_col=0)
+    archive = history_wrapper.get_archive(history_path)
+    assert archive.labels == ["01.01.2026 10:00:00", "01.01.2026 11:00:00"]
+    # the archive stores all values as floats
+    pd.testing.assert_frame_equal(
+        history_wrapper.read_rating_history(history_path), csv, check_dtype=False
+    )
@@ -0,0 +1,55 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from player_ranking import instrumentation
+
+
+def test_run_report_records_spans_and_http_calls(tmp_path):
+    report = instrumentation.start_run("#ABCDEF")
+    with instrumentation.span("fetch_members"):
+        instrumentation.record_http("/clans/{tag}", duration=0.5, num_bytes=100)
+    instrumentation.record_http("/clans/{tag}", duration=0.25, num_bytes=50)
+    instrumentation.record_http("write_sheet_rating", duration=1, retries=2)
+    report.finish("evaluated")
+
+    assert instrumentation.get_current_report() is report
+    assert [s["name"] for s in report.spans] == ["fetch_members"]
+    assert report.http_calls["/clans/{tag}"] == {
+        "count": 2,
+        "duration": 0.75,
+        "bytes": 150,
+        "retries": 0,
+    }
+    assert report.http_calls["write_sheet_rating"]["retries"] == 2
+
+    report.write(tmp_path)
+    report.write(tmp_path)
+    lines = (tmp_path / instrumentation.RUN_REPORT_FILE).read_text().splitlines()
+    assert len(lines) == 2
+    parsed = json.loads(lines[0])
+    assert parsed["clanTag"] == "#ABCDEF"
+    assert parsed["status"] == "evaluated"
+
+
+def test_concurrent_runs_record_into_their_own_report():
+    barrier = threading.Barrier(2)
+
+    def evaluate(clan_tag: str) -> instrumentation.RunReport:
+        report = instrumentation.start_run(clan_tag)
+        barrier.wait(5)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            record = instrumentation.in_current_run(instrumentation.record_http)
+            list(executor.map(record, [f"/clans/{clan_tag}"] * 3, [0.1] * 3))
+        barrier.wait(5)
+        instrumentation.record_cached(clan_tag)
+        return report
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        reports = list(executor.map(evaluate, ["#A", "#B"]))
+
+    for report, clan_tag in zip(reports, ["#A", "#B"]):
+        assert report.clan_tag == clan_tag
+        assert list(report.http_calls) == [f"/clans/{clan_tag}"]
+        assert report.http_calls[f"/clans/{clan_tag}"]["count"] == 3
+        assert report.cached_calls == {clan_tag: 1}
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from player_ranking.leaderboard import FenwickTree, Leaderboard
+
+
+def get_rating(ratings: dict[str, float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"name": [f"player{tag[1:]}" for tag in ratings], "rating": list(ratings.values())},
+        index=pd.Index(list(ratings), name="tag"),
+    )
+
+
+@pytest.fixture
+def leaderboard() -> Leaderboard:
+    leaderboard = Leaderboard()
+    leaderboard.update("#A", get_rating({"#1": 900.0, "#2": 500.0, "#3": 100.0}))
+    leaderboard.update("#B", get_rating({"#4": 700.0, "#5": 500.0, "#6": None}))
+    return leaderboard
+
+
+def test_fenwick_tree():
+    tree = FenwickTree(10)
+    for position in [0, 3, 3, 9]:
+        tree.add(position, 1)
+    assert [tree.prefix_sum(i) for i in [0, 2, 3, 8, 9]] == [1, 1, 3, 3, 4]
+    tree.add(3, -1)
+    assert tree.prefix_sum(9) == 3
+
+
+def test_get_top(leaderboard: Leaderboard):
+    top = leaderboard.get_top(3)
+    assert [(entry.tag, entry.clan_tag) for entry in top] == [
+        ("#1", "#A"),
+        ("#4", "#B"),
+        ("#2", "#A"),
+    ]
+    assert len(leaderboard.get_top(10)) == len(leaderboard) == 5
+
+
+def test_get_rank(leaderboard: Leaderboard):
+    assert leaderboard.get_rank("#1")[0] == 1
+    assert leaderboard.get_rank("#4")[0] == 2
+    # equal ratings share a rank
+    assert leaderboard.get_rank("#2")[0] == leaderboard.get_rank("#5")[0] == 3
+    assert leaderboard.get_rank("#3")[0] == 5
+    assert leaderboard.get_rank("#6") is None
+
+
+def test_update_replaces_only_the_clan(leaderboard: Leaderboard):
+    leaderboard.update("#B", get_rating({"#4": 950.0, "#7": 50.0}))
+
+    assert [entry.tag for entry in leaderboard.get_top(10)] == ["#4", "#1", "#2", "#3", "#7"]
+    assert leaderboard.get_rank("#1")[0] == 2
+    assert leaderboard.get_rank("#5") is None
+    assert leaderboard.get_rank("#7")[0] == 5
+
+    leaderboard.remove("#A")
+    assert [entry.tag for entry in leaderboard.get_top(10)] == ["#4", "#7"]
+    assert leaderboard.get_rank("#7")[0] == 2
+
+
+def test_player_that_moved_is_listed_once(leaderboard: Leaderboard):
+    snapshot = dict(leaderboard._clans)
+    # player 2 left clan A for clan B
+    leaderboard.update("#B", get_rating({"#4": 700.0, "#2": 600.0}))
+    # the list of clan A is replaced, a snapshot that is being merged stays untouched
+    assert [entry.tag for entry in snapshot["#A"]] == ["#1", "#2", "#3"]
+    assert [entry.tag for entry in leaderboard.get_top(10)] == ["#1", "#4", "#2", "#3"]
+    assert len(leaderboard) == 4
+    assert leaderboard.get_rank("#2")[1].clan_tag == "#B"
+    assert leaderboard.get_rank("#3")[0] == 4
+
+    # the next evaluation of clan A no longer lists the player
+    leaderboard.update("#A", get_rating({"#1": 900.0, "#3": 100.0}))
+    assert len(leaderboard) == 4
+    rank, entry = leaderboard.get_rank("#2")
+    assert (rank, entry.clan_tag) == (3, "#B")
+
+    leaderboard.remove("#B")
+    assert [entry.tag for entry in leaderboard.get_top(10)] == ["#1", "#3"]
+    assert leaderboard.get_rank("#2") is None
+    assert leaderboard.get_rank("#3")[0] == 2
+
+
+def test_ratings_outside_of_the_range_are_clamped():
+    leaderboard = Leaderboard()
+    leaderboard.update("#A", get_rating({"#1": 1200.0, "#2": -5.0, "#3": 10.0}))
+    assert [leaderboard.get_rank(tag)[0] for tag in ["#1", "#3", "#2"]] == [1, 2, 3]
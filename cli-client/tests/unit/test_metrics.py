@@ -0,0 +1,52 @@
+import urllib.request
+
+from player_ranking.metrics import Counter, Histogram, Registry
+
+
+def test_counter():
+    counter = Counter("requests", "Number of requests.")
+    counter.inc(endpoint="/clans/{tag}")
+    counter.inc(2, endpoint="/clans/{tag}")
+    counter.inc(endpoint='say "hi"')
+    assert counter.get(endpoint="/clans/{tag}") == 3
+    assert counter.render() == [
+        "# HELP requests_total Number of requests.",
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="/clans/{tag}"} 3.0',
+        'requests_total{endpoint="say \\"hi\\""} 1.0',
+    ]
+
+
+def test_histogram():
+    histogram = Histogram("duration_seconds", "Duration.", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    assert histogram.get_count() == 3
+    assert histogram.render() == [
+        "# HELP duration_seconds Duration.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{le="0.1"} 1',
+        'duration_seconds_bucket{le="1.0"} 2',
+        'duration_seconds_bucket{le="+Inf"} 3',
+        "duration_seconds_sum 5.55",
+        "duration_seconds_count 3",
+    ]
+
+
+def test_registry_textfile_and_server(tmp_path):
+    registry = Registry()
+    counter = registry.register(Counter("runs", "Number of runs."))
+    counter.inc(status="evaluated")
+
+    registry.write_textfile(tmp_path / "metrics.prom")
+    assert (tmp_path / "metrics.prom").read_text() == registry.render()
+    assert list(tmp_path.iterdir()) == [tmp_path / "metrics.prom"]
+
+    server = registry.serve(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()
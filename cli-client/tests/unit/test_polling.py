@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from player_ranking.polling import (
+    PollingSchedule,
+    ResponseCache,
+    get_last_phase_change,
+    get_next_phase_change,
+)
+
+CURRENT_RACE = "/clans/{tag}/currentriverrace"
+RACE_LOG = "/clans/{tag}/riverracelog"
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "ts, expected",
+    [
+        # battle days started on Thursday
+        (utc(2025, 3, 22, 12), utc(2025, 3, 20, 10)),
+        # battle days ended on Monday
+        (utc(2025, 3, 25, 12), utc(2025, 3, 24, 10)),
+        # a new season started, the war of the previous season ended at the same time
+        (utc(2025, 4, 7, 10, 30), utc(2025, 4, 7, 10)),
+    ],
+)
+def test_get_last_phase_change(ts: datetime, expected: datetime):
+    assert get_last_phase_change(ts) == expected
+
+
+@pytest.mark.parametrize(
+    "ts, expected",
+    [
+        (utc(2025, 3, 20, 9), utc(2025, 3, 20, 10)),
+        (utc(2025, 3, 20, 10), utc(2025, 3, 24, 10)),
+        (utc(2025, 12, 27, 12), utc(2025, 12, 29, 10)),
+    ],
+)
+def test_get_next_phase_change(ts: datetime, expected: datetime):
+    assert get_next_phase_change(ts) == expected
+
+
+def test_get_interval():
+    schedule = PollingSchedule()
+    assert schedule.get_interval(CURRENT_RACE, utc(2025, 3, 22, 12)) == timedelta(0)
+    assert schedule.get_interval(CURRENT_RACE, utc(2025, 3, 25, 12)) == timedelta(hours=12)
+    # right after the end of the war
+    assert schedule.get_interval(CURRENT_RACE, utc(2025, 3, 24, 10, 30)) == timedelta(0)
+    assert schedule.get_interval("/clans/{tag}", utc(2025, 3, 25, 12)) == timedelta(0)
+
+
+def test_response_cache():
+    cache = ResponseCache()
+    cache.put(CURRENT_RACE, "/clans/%23A/currentriverrace", {"fame": 1}, utc(2025, 3, 25, 12))
+    assert cache.get(CURRENT_RACE, "/clans/%23A/currentriverrace", utc(2025, 3, 25, 20)) == {
+        "fame": 1
+    }
+    assert cache.get(CURRENT_RACE, "/clans/%23A/currentriverrace", utc(2025, 3, 26, 1)) is None
+    assert cache.get(CURRENT_RACE, "/clans/%23B/currentriverrace", utc(2025, 3, 25, 20)) is None
+
+    cache.put(RACE_LOG, "/clans/%23A/riverracelog", {"items": []}, utc(2025, 3, 23, 12))
+    assert cache.get(RACE_LOG, "/clans/%23A/riverracelog", utc(2025, 3, 23, 20)) == {"items": []}
+    # the war ended in between, even though the interval has not passed yet
+    assert cache.get(RACE_LOG, "/clans/%23A/riverracelog", utc(2025, 3, 24, 11, 30)) is None
+
+
+def test_response_cache_ignores_endpoints_without_interval():
+    cache = ResponseCache()
+    cache.put("/clans/{tag}", "/clans/%23A", {"memberList": []}, utc(2025, 3, 25, 12))
+    assert cache.get("/clans/{tag}", "/clans/%23A", utc(2025, 3, 25, 12)) is None
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.presence import PresenceTracker
+
+START = datetime(2026, 1, 1, 10, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def tracker(tmp_path) -> PresenceTracker:
+    tracker = PresenceTracker(tmp_path, "#ABC")
+    # player 1 is online every day for two hours, twice within the first hour
+    for day in range(14):
+        for ts in [timedelta(minutes=5), timedelta(minutes=20), timedelta(hours=1)]:
+            tracker.mark("#1", START + timedelta(days=day) + ts)
+    tracker.mark("#2", START)
+    return tracker
+
+
+def test_record(tmp_path):
+    clan = Clan()
+    clan.add(ClanMember("#1", "player1", "member", 100, 50, 100, START))
+    clan.add(ClanMember("#2", "player2", "member", 100, 50, 100, START + timedelta(hours=3)))
+    tracker = PresenceTracker(tmp_path, "#ABC")
+    tracker.record(clan)
+    # samples within the same hour do not change anything
+    tracker.record(clan)
+
+    assert tracker.epoch == datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+    assert tracker.bitsets == {"#1": 0b1, "#2": 0b1000}
+
+
+def test_get_active_hours_per_week(tracker: PresenceTracker):
+    # weeks end with the hour of now: 08.01. 11:00 - 15.01. 11:00, 01.01. 11:00 - 08.01. 11:00, ...
+    now = START + timedelta(days=14)
+    assert tracker.get_active_hours_per_week("#1", now, 3) == [13, 14, 1]
+    assert tracker.get_active_hours_per_week("#2", now, 3) == [0, 0, 1]
+    assert tracker.get_active_hours_per_week("#3", now, 3) == [0, 0, 0]
+
+
+def test_get_active_hours(tracker: PresenceTracker):
+    assert tracker.get_active_hours("#1", START, START + timedelta(days=1)) == 2
+    assert tracker.get_active_hours("#1", START - timedelta(days=7), START) == 0
+    assert tracker.get_active_hours("#1", START + timedelta(days=1), START) == 0
+
+
+def test_get_inactive_players(tracker: PresenceTracker):
+    now = START + timedelta(days=14)
+    assert tracker.get_last_active("#1") == datetime(2026, 1, 14, 11, tzinfo=timezone.utc)
+    assert tracker.get_last_active("#3") is None
+    assert tracker.get_inactive_players(["#1", "#2", "#3"], now, 72) == {
+        "#2": 14 * 24,
+        "#3": 14 * 24 + 1,
+    }
+    assert tracker.get_inactive_players(["#1"], now, 23) == {"#1": 23}
+
+
+def test_save_and_load(tmp_path, tracker: PresenceTracker):
+    tracker.save()
+    loaded = PresenceTracker(tmp_path, "#ABC")
+    assert loaded.epoch == tracker.epoch
+    assert loaded.bitsets == tracker.bitsets
+    # two weeks of hourly slots for a player fit into a few dozen bytes
+    assert (tmp_path / "presence-ABC.json").stat().st_size < 200
+
+
+def test_save_keeps_hours_saved_by_another_process(tmp_path):
+    sampler = PresenceTracker(tmp_path, "#ABC")
+    evaluation = PresenceTracker(tmp_path, "#ABC")
+    sampler.mark("#1", START + timedelta(hours=2))
+    sampler.save()
+    evaluation.mark("#1", START)
+    evaluation.mark("#2", START + timedelta(hours=1))
+    evaluation.save()
+
+    loaded = PresenceTracker(tmp_path, "#ABC")
+    assert loaded.epoch == datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+    assert loaded.bitsets == {"#1": 0b101, "#2": 0b10}
+    assert [path.name for path in tmp_path.iterdir()] == ["presence-ABC.json"]
+
+
+@pytest.mark.parametrize("content", ["", '{"epoch": "2026-01-01"', '{"players": {}}'])
+def test_unreadable_state_starts_over(tmp_path, content: str):
+    (tmp_path / "presence-ABC.json").write_text(content)
+    tracker = PresenceTracker(tmp_path, "#ABC")
+    assert tracker.epoch is None
+    tracker.mark("#1", START)
+    tracker.save()
+    assert PresenceTracker(tmp_path, "#ABC").bitsets == {"#1": 0b1}
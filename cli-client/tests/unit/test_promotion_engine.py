@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.models.ranking_parameters import PromotionRequirements
+from player_ranking.promotion_engine import PromotionEngine, RankPolicy
+from player_ranking.war_statistics import WarStatistics
+
+
+@pytest.fixture
+def clan() -> Clan:
+    clan = Clan()
+    clan.add(ClanMember("#1", "player1", "member", 100, 50, 100, datetime(2026, 1, 26)))
+    clan.add(ClanMember("#2", "player2", "member", 100, 50, 100, datetime(2026, 1, 26)))
+    clan.add(ClanMember("#3", "player3", "elder", 100, 50, 100, datetime(2026, 1, 26)))
+    clan.add(ClanMember("#4", "player4", "elder", 100, 50, 100, datetime(2026, 1, 26)))
+    clan.add(ClanMember("#5", "player5", "elder", 100, 50, 100, datetime(2026, 1, 26)))
+    return clan
+
+
+@pytest.fixture
+def war_log() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "2.1": [3000, 2000, 3500, 1000],
+            "2.0": [3000, np.nan, 3500, 1000],
+            "1.4": [2000, 3000, 2500, 2500],
+        },
+        index=["#1", "#2", "#3", "#4"],
+    )
+
+
+@pytest.fixture
+def engine() -> PromotionEngine:
+    return PromotionEngine(
+        [
+            RankPolicy("elder", "member", "Elder", PromotionRequirements(2500, 2)),
+            RankPolicy("coLeader", "elder", "Co-Leader", PromotionRequirements(3000, 2)),
+            RankPolicy("demotion", "elder", "Member", PromotionRequirements(2000, 2), True),
+        ]
+    )
+
+
+def get_war_statistics(engine: PromotionEngine, war_log: pd.DataFrame) -> WarStatistics:
+    war_statistics = WarStatistics(10, engine.thresholds)
+    war_statistics.update(war_log)
+    return war_statistics
+
+
+def test_count_wars_per_threshold(engine: PromotionEngine, clan: Clan, war_log: pd.DataFrame):
+    counts = engine.count_wars_per_threshold(clan, get_war_statistics(engine, war_log))
+    np.testing.assert_array_equal(engine.thresholds, [2000, 2500, 3000])
+    np.testing.assert_array_equal(counts, [[3, 2, 2], [2, 1, 1], [3, 3, 2], [1, 1, 0], [0, 0, 0]])
+
+
+def test_evaluate(engine: PromotionEngine, clan: Clan, war_log: pd.DataFrame):
+    results = engine.evaluate(clan, get_war_statistics(engine, war_log))
+    assert [m.tag for m in results.get("elder")] == ["#1"]
+    assert [m.tag for m in results.get("coLeader")] == ["#3"]
+    # player5 has no logged wars
+    assert [m.tag for m in results.get("demotion")] == ["#4", "#5"]
+    assert [p.name for p, _ in results.non_empty()] == ["elder", "coLeader", "demotion"]
+    pd.testing.assert_series_equal(
+        results.to_series(),
+        pd.Series(
+            {"#1": "Elder", "#3": "Co-Leader", "#4": "Member", "#5": "Member"},
+            name="recommendation",
+            dtype=object,
+        ),
+    )
+
+
+def test_count_wars_per_threshold_with_untracked_threshold(
+    engine: PromotionEngine, clan: Clan, war_log: pd.DataFrame
+):
+    war_statistics = WarStatistics(10, [2000, 2500])
+    war_statistics.update(war_log)
+    with pytest.raises(ValueError):
+        engine.count_wars_per_threshold(clan, war_statistics)
+
+
+def test_evaluate_without_pending_changes(clan: Clan, war_log: pd.DataFrame):
+    engine = PromotionEngine(
+        [RankPolicy("elder", "member", "Elder", PromotionRequirements(3600, 1))]
+    )
+    results = engine.evaluate(clan, get_war_statistics(engine, war_log))
+    assert not results
+    assert results.to_series().empty
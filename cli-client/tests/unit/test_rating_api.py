@@ -0,0 +1,251 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from player_ranking.history_archive import MatrixArchive
+from player_ranking.models.clan_member import ClanMember
+from player_ranking.models.ranking_parameters import PromotionRequirements
+from player_ranking.promotion_engine import PromotionResults, RankPolicy
+from player_ranking.rating_api import RatingStore, matches_etag
+
+
+@pytest.fixture
+def store(tmp_path) -> RatingStore:
+    rating = pd.DataFrame(
+        {
+            "name": [f"player{i}" for i in range(1, 31)],
+            "rating": [1000.0 - 10 * i for i in range(30)],
+            "recommendation": ["Elder"] + [None] * 29,
+        },
+        index=pd.Index([f"#{i}" for i in range(1, 31)], name="tag"),
+    )
+    policy = RankPolicy("elder", "member", "Elder", PromotionRequirements(2500, 2))
+    promotions = PromotionResults(
+        [policy],
+        {"elder": [ClanMember("#1", "player1", "member", 100, 50, 100, datetime(2026, 1, 1))]},
+    )
+    archive = MatrixArchive(tmp_path / "history.archive")
+    archive.write(
+        pd.DataFrame(
+            {"01.01.2026 10:00:00": [900.0, None], "02.01.2026 10:00:00": [1000.0, 500.0]},
+            index=["#1", "#2"],
+        )
+    )
+
+    store = RatingStore()
+    store.publish("#ABC", rating, promotions, archive.directory)
+    return store
+
+
+@pytest.fixture
+def base_url(store: RatingStore):
+    server = store.serve(0, host="127.0.0.1")
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def get(url: str, **headers):
+    return urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+
+
+def test_ranking_json_and_csv(base_url: str):
+    with get(f"{base_url}/clans/ABC/ranking") as response:
+        ranking = json.loads(response.read())
+        assert response.headers["Content-Type"] == "application/json"
+    assert ranking["clanTag"] == "#ABC"
+    assert ranking["players"][0] == {
+        "rank": 1,
+        "tag": "#1",
+        "name": "player1",
+        "rating": 1000.0,
+        "recommendation": "Elder",
+    }
+
+    with get(f"{base_url}/clans/ABC/ranking.csv") as csv_response:
+        lines = csv_response.read().decode().splitlines()
+    assert lines[0] == "rank;tag;name;rating;recommendation"
+    assert lines[1] == "1;#1;player1;1000.0;Elder"
+    with get(f"{base_url}/clans/ABC/ranking?format=csv") as csv_response:
+        assert csv_response.read().decode().splitlines() == lines
+
+
+def test_etag_and_gzip(base_url: str):
+    with get(f"{base_url}/clans/ABC/ranking") as response:
+        etag = response.headers["ETag"]
+        body = response.read()
+
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        get(f"{base_url}/clans/ABC/ranking", **{"If-None-Match": etag})
+    assert exc_info.value.code == 304
+
+    with get(f"{base_url}/clans/ABC/ranking", **{"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        gzip_etag = response.headers["ETag"]
+        assert gzip.decompress(response.read()) == body
+    assert gzip_etag != etag
+
+    # the validator of the identity body does not match the gzip body
+    with get(
+        f"{base_url}/clans/ABC/ranking", **{"Accept-Encoding": "gzip", "If-None-Match": etag}
+    ) as response:
+        assert response.status == 200
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        get(
+            f"{base_url}/clans/ABC/ranking",
+            **{"Accept-Encoding": "gzip", "If-None-Match": f'"other", W/{gzip_etag}'},
+        )
+    assert exc_info.value.code == 304
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"ab"', False),
+        ('"abcd"', False),
+        ('"xyz"', False),
+        ("", False),
+    ],
+)
+def test_matches_etag(if_none_match: str, matches: bool):
+    assert matches_etag(if_none_match, '"abc"') == matches
+
+
+def test_promotions_and_history(base_url: str):
+    with get(f"{base_url}/clans/ABC/promotions") as response:
+        promotions = json.loads(response.read())["promotions"]
+    assert promotions == [
+        {
+            "policy": "elder",
+            "target_rank": "Elder",
+            "demotion": False,
+            "tag": "#1",
+            "name": "player1",
+        }
+    ]
+
+    with get(f"{base_url}/clans/ABC/players/2/history") as response:
+        assert json.loads(response.read()) == {
+            "tag": "#2",
+            "history": [{"timestamp": "02.01.2026 10:00:00", "rating": 500.0}],
+        }
+    with get(f"{base_url}/clans/ABC/players/1/history.csv") as response:
+        assert response.read().decode().splitlines() == [
+            "timestamp;rating",
+            "01.01.2026 10:00:00;900.0",
+            "02.01.2026 10:00:00;1000.0",
+        ]
+
+
+def test_leaderboard(base_url: str, store: RatingStore):
+    store.publish(
+        "#XYZ",
+        pd.DataFrame({"name": ["other"], "rating": [995.0]}, index=pd.Index(["#100"], name="tag")),
+        PromotionResults([], {}),
+        store._history_archives["ABC"],
+    )
+
+    with get(f"{base_url}/leaderboard?limit=2") as response:
+        leaderboard = json.loads(response.read())
+    assert leaderboard["totalPlayers"] == 31
+    assert leaderboard["players"] == [
+        {"rank": 1, "rating": 1000.0, "tag": "#1", "name": "player1", "clan_tag": "#ABC"},
+        {"rank": 2, "rating": 995.0, "tag": "#100", "name": "other", "clan_tag": "#XYZ"},
+    ]
+    with get(f"{base_url}/leaderboard.csv") as response:
+        assert len(response.read().decode().splitlines()) == 32
+
+    with get(f"{base_url}/players/2/rank") as response:
+        assert json.loads(response.read()) == {
+            "rank": 3,
+            "rating": 990.0,
+            "tag": "#2",
+            "name": "player2",
+            "clan_tag": "#ABC",
+            "totalPlayers": 31,
+        }
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("/clans/XYZ/ranking", 404),
+        ("/clans/ABC/players/99/history", 404),
+        ("/clans/ABC/ranking?format=xml", 400),
+        ("/leaderboard?limit=0", 400),
+        ("/players/999/rank", 404),
+    ],
+)
+def test_errors(base_url: str, path: str, status: int):
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        get(f"{base_url}{path}")
+    assert exc_info.value.code == status
+
+
+def test_publish_replaces_results(store: RatingStore):
+    etag = store.get("/clans/ABC/ranking", "json").etag
+    store.publish(
+        "#ABC",
+        pd.DataFrame({"name": ["player2"], "rating": [900.0]}, index=pd.Index(["#2"], name="tag")),
+        PromotionResults([], {}),
+        store._history_archives["ABC"],
+    )
+    assert store.get("/clans/ABC/ranking", "json").etag != etag
+    assert json.loads(store.get("/clans", "json").body) == {"clans": ["#ABC"]}
+
+
+def test_publish_summary(store: RatingStore):
+    overall = pd.DataFrame({"rating": [500.0]}, index=["mean"])
+    breakdowns = {"role": {"member": pd.DataFrame({"rating": [400.0]}, index=["mean"])}}
+    store.publish(
+        "#ABC",
+        pd.DataFrame({"name": ["player2"], "rating": [900.0]}, index=pd.Index(["#2"], name="tag")),
+        PromotionResults([], {}),
+        store._history_archives["ABC"],
+        (overall, breakdowns),
+    )
+    summary = json.loads(store.get("/clans/ABC/summary", "json").body)
+    assert summary["overall"] == {"mean": {"rating": 500.0}}
+    assert summary["breakdowns"]["role"]["member"] == {"mean": {"rating": 400.0}}
+    assert store.get("/clans/ABC/summary", "csv").body.decode().splitlines() == [
+        "breakdown;group;statistic;rating",
+        "all;all;mean;500.0",
+        "role;member;mean;400.0",
+    ]
+
+
+def test_restore_published_results(store: RatingStore, tmp_path):
+    overall = pd.DataFrame({"rating": [500.0]}, index=["mean"])
+    store.publish(
+        "#ABC",
+        pd.DataFrame({"name": ["player2"], "rating": [900.0]}, index=pd.Index(["#2"], name="tag")),
+        PromotionResults([], {}),
+        store._history_archives["ABC"],
+        (overall, {}),
+        tmp_path / "state",
+    )
+
+    restored = RatingStore()
+    assert not restored.is_published("#ABC")
+    assert not restored.restore("#XYZ", tmp_path / "state", store._history_archives["ABC"])
+    assert restored.restore("#ABC", tmp_path / "state", store._history_archives["ABC"])
+    assert restored.is_published("#ABC")
+    for path in ["/clans/ABC/ranking", "/clans/ABC/promotions", "/clans/ABC/summary", "/clans"]:
+        for response_format in ["json", "csv"]:
+            assert restored.get(path, response_format).body == store.get(path, response_format).body
+    assert restored.get_rank("2", "json").body == store.get_rank("2", "json").body
+    assert restored.get("/clans/ABC/players/1/history", "json") is not None
+
+
+def test_restore_ignores_unreadable_results(tmp_path):
+    (tmp_path / "published-results-ABC.json.gz").write_text("not gzip")
+    assert not RatingStore().restore("#ABC", tmp_path, tmp_path / "history.archive")
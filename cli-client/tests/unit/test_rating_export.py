@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking.models.ranking_parameters import RatingWeights
+from player_ranking.rating_export import export_rating, get_run_metadata
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def ranking() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "name": ["player1", "player2"],
+            "rating": [800.0, 600.0],
+            "ladder": [1000.0, 0.0],
+            "current_war": [500.0, 700.0],
+            "war_history": [900.0, np.nan],
+            "avg_fame": [2900.0, np.nan],
+            "current_season": [1000.0, 0.0],
+            "previous_season": [1500.0, 500.0],
+            "level": [60, 50],
+            "net_donations": [10, -10],
+            "last_seen": ["0 days ago", "3 days ago"],
+            "recommendation": [None, "Elder"],
+        },
+        index=pd.Index(["#1", "#2"], name="tag"),
+    )
+
+
+@pytest.fixture
+def summary(ranking: pd.DataFrame) -> pd.DataFrame:
+    numeric = ranking.select_dtypes("number")
+    return pd.DataFrame([numeric.mean()], index=["mean"])
+
+
+def test_export_rating(tmp_path, ranking: pd.DataFrame, summary: pd.DataFrame):
+    weights = RatingWeights(0.1, 0.3, 0.2, 0.1, 0.1, 0.1, 0.1)
+    metadata = get_run_metadata("#ABC", "120.2", weights)
+    paths = export_rating(ranking, summary, ["arrow", "parquet"], tmp_path / "rating.csv", metadata)
+    assert paths == [tmp_path / "rating.arrow", tmp_path / "rating.parquet"]
+
+    with pa.memory_map(str(tmp_path / "rating.arrow")) as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+    parquet_table = pa.parquet.read_table(tmp_path / "rating.parquet")
+    assert arrow_table.equals(parquet_table)
+
+    assert arrow_table.schema.field("rank").type == pa.int32()
+    assert arrow_table.schema.field("level").type == pa.float64()
+    schema_metadata = arrow_table.schema.metadata
+    assert schema_metadata[b"clan_tag"] == b"#ABC"
+    assert schema_metadata[b"current_war"] == b"120.2"
+    assert json.loads(schema_metadata[b"rating_weights"])["warHistory"] == 0.3
+
+    rows = arrow_table.to_pylist()
+    assert [row["rank"] for row in rows] == [1, 2, None]
+    assert [row["summary"] for row in rows] == [None, None, "mean"]
+    assert [row["tag"] for row in rows] == ["#1", "#2", None]
+    assert [row["last_seen_days"] for row in rows] == [0, 3, None]
+    assert [row["recommendation"] for row in rows] == [None, "Elder", None]
+    assert rows[2]["rating"] == 700.0
+    # missing values are nulls, not NaN
+    assert rows[1]["war_history"] is None
+
+
+def test_export_rating_without_formats(tmp_path, ranking: pd.DataFrame, summary: pd.DataFrame):
+    assert export_rating(ranking, summary, [], tmp_path / "rating.csv", {}) == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_rating_marks_summary_rows_by_label(
+    tmp_path, ranking: pd.DataFrame, summary: pd.DataFrame
+):
+    # summary rows are never mistaken for players, whatever their label
+    summary.index = ["2"]
+    export_rating(ranking.iloc[:1], summary, ["parquet"], tmp_path / "rating.csv", {})
+    rows = pa.parquet.read_table(tmp_path / "rating.parquet").to_pylist()
+    assert [(row["rank"], row["summary"], row["tag"]) for row in rows] == [
+        (1, None, "#1"),
+        (None, "2", None),
+    ]
@@ -0,0 +1,32 @@
+import pytest
+
+from player_ranking.state_files import atomic_path, read_json, write_text
+
+
+def test_write_text_replaces_file(tmp_path):
+    path = tmp_path / "state" / "state.json"
+    write_text(path, "1")
+    write_text(path, "2")
+    assert path.read_text() == "2"
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
+
+
+def test_atomic_path_keeps_file_on_error(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("1")
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            tmp.write_text("2")
+            raise RuntimeError()
+    assert path.read_text() == "1"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+@pytest.mark.parametrize("content", ["", '{"a": 1', "[]"])
+def test_read_json_returns_default_for_unreadable_file(tmp_path, content: str):
+    path = tmp_path / "state.json"
+    assert read_json(path, {}) == {}
+    path.write_text(content)
+    assert read_json(path, {}) == {}
+    path.write_text('{"a": 1}')
+    assert read_json(path, {}) == {"a": 1}
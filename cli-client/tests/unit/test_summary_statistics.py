@@ -0,0 +1,102 @@
+import json
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking import summary_statistics
+from player_ranking.models.clan import Clan
+from player_ranking.models.clan_member import ClanMember
+
+
+@pytest.fixture
+def performance() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "name": ["player1", "player2", "player3", "player4"],
+            "rating": [800.0, 600.0, 400.0, 100.0],
+            "war_history": [900.0, np.nan, 300.0, np.nan],
+            "level": [60, 50, 40, 30],
+        },
+        index=pd.Index(["#1", "#2", "#3", "#4"], name="tag"),
+    )
+
+
+@pytest.fixture
+def clan() -> Clan:
+    clan = Clan()
+    roles = {"#1": "elder", "#2": "member", "#3": "member", "#4": "member"}
+    for tag, role in roles.items():
+        member = ClanMember(tag, f"player{tag[1:]}", role, 100, 50, 100, datetime(2026, 1, 1))
+        member.current_season_league_number = 7 if tag != "#4" else None
+        clan.add(member)
+    return clan
+
+
+def test_summarize_matches_pandas(performance: pd.DataFrame):
+    statistics = ["mean", "count", "min", "max", "p75", "p50", "p25", "p90"]
+    summary = summary_statistics.summarize(performance, statistics)
+
+    numeric = performance[["rating", "war_history", "level"]]
+    expected = pd.DataFrame(
+        [
+            numeric.mean(),
+            numeric.count().astype(float),
+            numeric.min().astype(float),
+            numeric.max().astype(float),
+            numeric.quantile(0.75),
+            numeric.quantile(0.5),
+            numeric.quantile(0.25),
+            numeric.quantile(0.9),
+        ],
+        index=statistics,
+    )
+    pd.testing.assert_frame_equal(summary, expected)
+
+
+def test_summarize_without_values(performance: pd.DataFrame):
+    summary = summary_statistics.summarize(performance.iloc[:0], ["mean", "count", "p50"])
+    assert summary.loc["count"].tolist() == [0, 0, 0]
+    assert summary.loc[["mean", "p50"]].isna().all().all()
+
+
+def test_get_summary(performance: pd.DataFrame, clan: Clan):
+    overall, breakdowns = summary_statistics.get_summary(performance, clan, ["mean", "count"])
+    assert overall.loc["mean", "rating"] == 475.0
+
+    by_role = breakdowns["role"]
+    assert list(by_role) == ["elder", "member"]
+    assert by_role["member"].loc["mean", "rating"] == pytest.approx(366.67, abs=0.01)
+    assert by_role["member"].loc["count", "war_history"] == 1
+    assert list(breakdowns["league"]) == ["7", "unknown"]
+    assert breakdowns["league"]["unknown"].loc["mean", "rating"] == 100.0
+
+    summary = summary_statistics.to_dict("#ABC", overall, breakdowns)
+    # serializable without NaN values
+    summary = json.loads(json.dumps(summary, allow_nan=False))
+    assert summary["statistics"] == ["mean", "count"]
+    assert summary["breakdowns"]["role"]["elder"]["mean"]["war_history"] == 900.0
+    assert summary["breakdowns"]["league"]["unknown"]["mean"]["war_history"] is None
+
+    frame = summary_statistics.to_frame(overall, breakdowns)
+    assert frame.columns.tolist()[:4] == ["breakdown", "group", "statistic", "rating"]
+    assert len(frame) == 2 * (1 + 2 + 2)
+
+
+def test_summarize_groups_with_member_missing_from_groups(performance: pd.DataFrame):
+    # player 4 joined after the members were fetched
+    groups = pd.Series({"#1": 7, "#2": 7, "#3": 8})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        summaries = summary_statistics.summarize_groups(performance, groups, ["count"])
+    # the group keys keep the integer leagues
+    assert list(summaries) == ["7", "8", "unknown"]
+    assert summaries["unknown"].loc["count", "rating"] == 1
+
+    # player 3 has no league yet
+    groups = pd.Series({"#1": 7, "#2": 7, "#3": None}, dtype=object)
+    summaries = summary_statistics.summarize_groups(performance, groups, ["count"])
+    assert list(summaries) == ["7", "unknown"]
+    assert summaries["unknown"].loc["count", "rating"] == 2
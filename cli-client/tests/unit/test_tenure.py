@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking.history_wrapper import get_archive
+from player_ranking.tenure import TenureTracker, compute_sightings, get_cohorts
+
+
+def write_history(path, columns: dict[str, list[float]]):
+    pd.DataFrame(columns, index=["#1", "#2", "#3"]).to_csv(path, sep=";", float_format="%.0f")
+
+
+@pytest.fixture
+def history() -> dict[str, list[float]]:
+    return {
+        "30.12.2025 10:00:00": [100, np.nan, np.nan],
+        "02.01.2026 10:00:00": [200, 300, np.nan],
+        "05.01.2026 10:00:00": [np.nan, 400, np.nan],
+    }
+
+
+def test_compute_sightings(history: dict[str, list[float]]):
+    df = pd.DataFrame(history, index=["#1", "#2", "#3"])
+    df.columns = pd.to_datetime(df.columns, format="%d.%m.%Y %H:%M:%S")
+    sightings = compute_sightings(df)
+
+    assert sightings.index.tolist() == ["#1", "#2"]
+    assert sightings["first_sighting"].tolist() == [
+        pd.Timestamp("2025-12-30 10:00"),
+        pd.Timestamp("2026-01-02 10:00"),
+    ]
+    assert sightings["last_sighting"].tolist() == [
+        pd.Timestamp("2026-01-02 10:00"),
+        pd.Timestamp("2026-01-05 10:00"),
+    ]
+
+
+def test_tracker_updates_incrementally(tmp_path, history: dict[str, list[float]]):
+    history_path = tmp_path / "history.csv"
+    write_history(history_path, history)
+    tracker = TenureTracker(tmp_path, "#ABC")
+    tracker.update(history_path)
+    tracker.save()
+
+    history["10.01.2026 10:00:00"] = [500, 600, 700]
+    write_history(history_path, history)
+    tracker = TenureTracker(tmp_path, "#ABC")
+    assert tracker.last_snapshot == pd.Timestamp("2026-01-05 10:00")
+    tracker.update(history_path)
+
+    members = tracker.get_current_members()
+    assert members.index.tolist() == ["#1", "#2", "#3"]
+    assert members["tenure_days"].tolist() == [11, 8, 0]
+    assert members["first_sighting"].tolist() == [
+        pd.Timestamp("2025-12-30 10:00"),
+        pd.Timestamp("2026-01-02 10:00"),
+        pd.Timestamp("2026-01-10 10:00"),
+    ]
+
+
+def test_tracker_without_new_snapshots(tmp_path, history: dict[str, list[float]]):
+    history_path = tmp_path / "history.csv"
+    write_history(history_path, history)
+    tracker = TenureTracker(tmp_path, "#ABC")
+    tracker.update(history_path)
+    sightings = tracker.sightings.copy()
+
+    tracker.update(history_path)
+    pd.testing.assert_frame_equal(tracker.sightings, sightings)
+    # player 1 left the clan
+    assert tracker.get_current_members().index.tolist() == ["#2"]
+
+
+def test_tracker_rebuilds_unreadable_state(tmp_path, history: dict[str, list[float]]):
+    history_path = tmp_path / "history.csv"
+    write_history(history_path, history)
+    (tmp_path / "tenure-ABC.json").write_text('{"lastSnapshot": null}')
+    tracker = TenureTracker(tmp_path, "#ABC")
+    assert tracker.last_snapshot is None
+
+    tracker.update(history_path)
+    assert tracker.get_current_members().index.tolist() == ["#2"]
+
+
+def test_get_cohorts():
+    first_sightings = pd.Series(pd.to_datetime(["2025-12-30", "2026-01-02", "2026-01-10"]))
+    cohorts = get_cohorts(first_sightings)
+    assert cohorts.index.astype(str).tolist() == ["2025-12", "2026-01"]
+    assert cohorts.tolist() == [1, 2]
+
+
+def test_tracker_reads_archive(tmp_path, history: dict[str, list[float]]):
+    history_path = tmp_path / "history.csv"
+    get_archive(history_path).write(pd.DataFrame(history, index=["#1", "#2", "#3"]))
+    tracker = TenureTracker(tmp_path, "#ABC")
+    tracker.update(history_path)
+    assert tracker.get_current_members().index.tolist() == ["#2"]
+
+    history["10.01.2026 10:00:00"] = [500, 600, 700]
+    get_archive(history_path).append(
+        "10.01.2026 10:00:00", pd.Series([500, 600, 700], index=["#1", "#2", "#3"])
+    )
+    tracker.update(history_path)
+    members = tracker.get_current_members()
+    assert members["tenure_days"].tolist() == [11, 8, 0]
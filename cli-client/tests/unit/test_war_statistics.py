@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_ranking.war_statistics import WarStatistics, WarStatisticsStore
+
+
+@pytest.fixture
+def war_log() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "2.1": [3000, 2000, np.nan],
+            "2.0": [3000, np.nan, np.nan],
+            "1.4": [2000, 3000, np.nan],
+        },
+        index=["#1", "#2", "#3"],
+    )
+
+
+def assert_matches_war_log(war_statistics: WarStatistics, war_log: pd.DataFrame):
+    means = war_log.mean(axis=1)
+    for tag in war_log.index:
+        np.testing.assert_equal(war_statistics.get_mean(tag), means[tag])
+    expected_counts = [
+        [(war_log.loc[tag] >= t).sum() for t in war_statistics.thresholds] for tag in war_log.index
+    ]
+    np.testing.assert_array_equal(
+        war_statistics.get_counts(war_log.index.tolist()), expected_counts
+    )
+
+
+def test_update(war_log: pd.DataFrame):
+    war_statistics = WarStatistics(10, [2500, 2000])
+    war_statistics.update(war_log)
+
+    assert war_statistics.thresholds == [2000, 2500]
+    assert war_statistics.wars == ["2.1", "2.0", "1.4"]
+    assert war_statistics.get_mean("#1") == pytest.approx(8000 / 3)
+    # player was in the clan, but did not participate
+    assert np.isnan(war_statistics.get_mean("#3"))
+    assert war_statistics.get_mean("#4") is None
+    np.testing.assert_array_equal(
+        war_statistics.get_counts(["#1", "#2", "#3", "#4"]), [[3, 2], [2, 1], [0, 0], [0, 0]]
+    )
+
+
+def test_update_applies_changes(war_log: pd.DataFrame):
+    war_statistics = WarStatistics(3, [2500])
+    war_statistics.update(war_log)
+
+    # a new war is added, the oldest leaves the window and an excuse removed a result
+    war_log = war_log.drop(columns="1.4").drop(index="#3")
+    war_log.insert(0, "2.2", [1000, 2800])
+    war_log.loc["#1", "2.0"] = np.nan
+    war_statistics.update(war_log)
+
+    assert war_statistics.wars == ["2.2", "2.1", "2.0"]
+    assert "#3" not in war_statistics.players
+    assert_matches_war_log(war_statistics, war_log)
+
+
+def test_update_keeps_wars_within_window(war_log: pd.DataFrame):
+    war_statistics = WarStatistics(4, [2500])
+    war_statistics.update(war_log)
+
+    # the API only returns the most recent wars
+    war_statistics.update(pd.DataFrame({"2.2": [1000, 1000, 1000]}, index=war_log.index))
+
+    assert war_statistics.wars == ["2.2", "2.1", "2.0", "1.4"]
+    assert war_statistics.get_mean("#1") == pytest.approx(9000 / 4)
+
+
+def test_update_is_idempotent(war_log: pd.DataFrame):
+    war_statistics = WarStatistics(10, [2500])
+    war_statistics.update(war_log)
+    war_statistics.update(war_log)
+    assert_matches_war_log(war_statistics, war_log)
+
+
+def test_store(tmp_path, war_log: pd.DataFrame):
+    store = WarStatisticsStore(tmp_path, "#ABC")
+    assert store.load(10, [2500]).players == {}
+
+    war_statistics = WarStatistics(10, np.array([2500]))
+    war_statistics.update(war_log)
+    store.save(war_statistics)
+    assert (tmp_path / "war-statistics-ABC.json").exists()
+
+    loaded = store.load(10, [2500])
+    assert loaded.to_dict() == war_statistics.to_dict()
+
+    # thresholds changed
+    loaded = store.load(10, [2000, 3000])
+    assert_matches_war_log(loaded, war_log)
+
+    # window reduced
+    loaded = store.load(2, [2500])
+    assert loaded.wars == ["2.1", "2.0"]
+    assert_matches_war_log(loaded, war_log[["2.1", "2.0"]])
+
+
+@pytest.mark.parametrize("content", ["", '{"wars": ["2.1"', '{"wars": []}', "[]"])
+def test_store_rebuilds_unreadable_statistics(tmp_path, war_log: pd.DataFrame, content: str):
+    store = WarStatisticsStore(tmp_path, "#ABC")
+    store.path.write_text(content)
+    war_statistics = store.load(10, [2500])
+    assert war_statistics.players == {}
+
+    war_statistics.update(war_log)
+    store.save(war_statistics)
+    assert store.load(10, [2500]).to_dict() == war_statistics.to_dict()
+    assert [path.name for path in tmp_path.iterdir()] == ["war-statistics-ABC.json"]